@@ -1,6 +1,6 @@
 # Audio input handler for microphone recording
 from colorama import init, Fore, Style
-from scipy.signal import butter, filtfilt, resample_poly
+from resampler import StreamingResampler
 import pyaudio
 import logging
 import numpy as np
@@ -33,6 +33,7 @@ class AudioInput:
         self.audio_format = audio_format
         self.channels = channels
         self.resample_to_target = resample_to_target
+        self._resamplers = {}
         self._logger = logging.getLogger("AudioInput")
         if not self._logger.handlers:
             handler = logging.StreamHandler()
@@ -173,20 +174,27 @@ class AudioInput:
 
     def lowpass_filter(self, signal_arr, cutoff_freq, sample_rate):
         """Apply Butterworth lowpass filter to signal."""
+        from scipy.signal import butter, filtfilt
         nyquist_rate = sample_rate / 2.0
         normal_cutoff = cutoff_freq / nyquist_rate
         b, a = butter(5, normal_cutoff, btype='low', analog=False)
         filtered_signal = filtfilt(b, a, signal_arr)
         return filtered_signal
 
-    def resample_audio(self, pcm_data, target_sample_rate, original_sample_rate):
-        """Resample audio data to target sample rate."""
-        if target_sample_rate < original_sample_rate:
-            pcm_filtered = self.lowpass_filter(pcm_data, target_sample_rate / 2, original_sample_rate)
-            resampled = resample_poly(pcm_filtered, target_sample_rate, original_sample_rate)
-        else:
-            resampled = resample_poly(pcm_data, target_sample_rate, original_sample_rate)
-        return resampled
+    def resample_audio(self, pcm_data, target_sample_rate, original_sample_rate, out=None):
+        """
+        Resample audio data to target sample rate.
+
+        Consecutive calls are treated as one continuous stream: the polyphase
+        filter for each rate pair is designed once and its state carries over
+        between chunks. Pass `out` to write into a preallocated buffer.
+        """
+        key = (int(original_sample_rate), int(target_sample_rate))
+        resampler = self._resamplers.get(key)
+        if resampler is None:
+            resampler = StreamingResampler(original_sample_rate, target_sample_rate)
+            self._resamplers[key] = resampler
+        return resampler.process(pcm_data, out=out)
 
     def read_chunk(self):
         """Read a chunk of audio data from the stream."""
@@ -0,0 +1,158 @@
+# Recycled shared-memory segments for handing utterance audio to another process
+from collections import namedtuple, OrderedDict
+from multiprocessing import shared_memory
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger("realtimestt")
+
+INIT_AUDIO_POOL_IDLE_SEGMENTS = 8
+MIN_SEGMENT_SAMPLES = 1 << 14  # about one second at 16 kHz
+
+# Small picklable handle that crosses the pipe instead of the audio itself
+AudioDescriptor = namedtuple("AudioDescriptor", ["name", "samples", "dtype"])
+
+
+class SharedAudioPool:
+    """
+    Owner side of a pool of shared-memory segments holding utterance audio.
+
+    `put` copies an array into a free segment and returns an
+    `AudioDescriptor`. The segment stays leased until `release` is called
+    with that descriptor, after which it is reused for the next utterance of
+    a similar length. Segment capacities are rounded up to powers of two, so
+    a handful of segments cover every utterance length.
+
+    Args:
+        max_idle (int): Released segments kept for reuse; further released
+            segments are unlinked.
+    """
+    def __init__(self, max_idle: int = INIT_AUDIO_POOL_IDLE_SEGMENTS):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = []
+        self._leased = {}
+        self.allocated = 0
+        self.reused = 0
+
+    @staticmethod
+    def _capacity(nbytes):
+        capacity = MIN_SEGMENT_SAMPLES * 4
+        while capacity < nbytes:
+            capacity *= 2
+        return capacity
+
+    def _acquire(self, nbytes):
+        with self._lock:
+            # Smallest idle segment that fits
+            candidates = [shm for shm in self._idle if shm.size >= nbytes]
+            if candidates:
+                shm = min(candidates, key=lambda segment: segment.size)
+                self._idle.remove(shm)
+                self.reused += 1
+            else:
+                shm = shared_memory.SharedMemory(create=True, size=self._capacity(nbytes))
+                self.allocated += 1
+            self._leased[shm.name] = shm
+        return shm
+
+    def put(self, audio):
+        """
+        Copy audio into a leased segment.
+
+        Args:
+            audio (np.ndarray): Audio samples of any dtype.
+
+        Returns:
+            AudioDescriptor: Handle to pass to `SharedAudioReader.view`.
+        """
+        audio = np.ascontiguousarray(audio).reshape(-1)
+        shm = self._acquire(max(audio.nbytes, 1))
+        target = np.ndarray(audio.shape, dtype=audio.dtype, buffer=shm.buf)
+        target[:] = audio
+        return AudioDescriptor(shm.name, len(audio), audio.dtype.str)
+
+    def release(self, descriptor: AudioDescriptor):
+        """Return a leased segment to the pool."""
+        with self._lock:
+            shm = self._leased.pop(descriptor.name, None)
+            if shm is None:
+                return
+            if len(self._idle) < self.max_idle:
+                self._idle.append(shm)
+                return
+        self._destroy(shm)
+
+    @staticmethod
+    def _destroy(shm):
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as error:
+            logger.debug(f"Error removing shared audio segment: {error}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "leased": len(self._leased),
+                "idle": len(self._idle),
+                "allocated": self.allocated,
+                "reused": self.reused,
+            }
+
+    def close(self):
+        """Unlink every segment, leased or idle."""
+        with self._lock:
+            segments = self._idle + list(self._leased.values())
+            self._idle = []
+            self._leased = {}
+        for shm in segments:
+            self._destroy(shm)
+
+
+class SharedAudioReader:
+    """
+    Consumer side: maps pool segments read-only by descriptor.
+
+    Segments are recycled by the pool, so each one is attached once and the
+    mapping is kept. Only the `max_mapped` most recently used mappings are
+    kept, since segments the pool has unlinked are never seen again.
+    """
+    def __init__(self, max_mapped: int = 2 * INIT_AUDIO_POOL_IDLE_SEGMENTS):
+        self.max_mapped = max_mapped
+        self._segments = OrderedDict()
+
+    def view(self, descriptor: AudioDescriptor):
+        """
+        Returns:
+            np.ndarray: Read-only view of the audio in the shared segment.
+                Only valid until the request is answered, since the owner
+                may reuse the segment afterwards.
+        """
+        shm = self._segments.get(descriptor.name)
+        if shm is None:
+            shm = shared_memory.SharedMemory(name=descriptor.name)
+            self._segments[descriptor.name] = shm
+            while len(self._segments) > self.max_mapped:
+                _, stale = self._segments.popitem(last=False)
+                self._detach(stale)
+        else:
+            self._segments.move_to_end(descriptor.name)
+        audio = np.ndarray((descriptor.samples,), dtype=np.dtype(descriptor.dtype), buffer=shm.buf)
+        audio.flags.writeable = False
+        return audio
+
+    @staticmethod
+    def _detach(shm):
+        try:
+            shm.close()
+        except Exception as error:
+            logger.debug(f"Error detaching shared audio segment: {error}")
+
+    def close(self):
+        for shm in self._segments.values():
+            self._detach(shm)
+        self._segments = OrderedDict()
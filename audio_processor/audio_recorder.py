@@ -23,32 +23,49 @@ Features:
   as possible.
 """
 
-from faster_whisper import WhisperModel, BatchedInferencePipeline
 from typing import Iterable, List, Optional, Union
-from openwakeword.model import Model
-import torch.multiprocessing as mp
-from scipy.signal import resample
+import multiprocessing as mp
 import signal as system_signal
 from ctypes import c_bool
-from scipy import signal
 from safepipe import SafePipe
-import soundfile as sf
-import faster_whisper
-import openwakeword
+from ring_buffer import SharedRingBuffer
+from resampler import StreamingResampler
+from utterance_buffer import UtteranceBuffer
+from vad_worker import VADWorker
+from vad_ingest import VADIngest, webrtc_frame_decisions
+from energy_gate import EnergyGate, INIT_ENERGY_GATE_MARGIN_DB
+from transcription_channel import TranscriptionChannel, REQUEST_CANCEL
+from transcription_protocol import RemoteTranscriptionChannel
+from audio_pool import SharedAudioPool, SharedAudioReader, AudioDescriptor
+from callback_dispatcher import (
+    CallbackDispatcher, POLICY_QUEUE, POLICY_DROP, POLICY_COALESCE,
+    INIT_CALLBACK_WORKERS, INIT_CALLBACK_QUEUE_SIZE,
+)
+from text_stabilizer import TextStabilizer, StabilizerUpdate
+from long_form import plan_chunks, stitch_texts
+from model_loading import StartupTimer, load_silero_vad
+from quality_policy import QualityPolicy, INIT_FINAL_LATENCY_TARGET
+from cadence import CadenceController, INIT_REALTIME_TARGET_LATENCY, INIT_REALTIME_CPU_SHARE
+from resource_plan import (
+    ResourcePlan, ComponentMeter, set_thread_affinity, pinned,
+    COMPONENT_READER, COMPONENT_VAD, COMPONENT_REALTIME, COMPONENT_MAIN, COMPONENT_RESAMPLING,
+)
+from local_agreement import LocalAgreementTranscript, INIT_REALTIME_WINDOW_SECONDS, PROMPT_MAX_CHARS
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from transcript_stream import TranscriptHub, EVENT_REALTIME, EVENT_STABILIZED
 import collections
 import numpy as np
-import pvporcupine
 import traceback
 import threading
-import webrtcvad
+import asyncio
 import datetime
 import platform
 import logging
 import struct
+import bisect
+import difflib
 import base64
 import queue
-import torch
-import halo
 import time
 import copy
 import os
@@ -83,6 +100,12 @@ TIME_SLEEP = 0.02
 SAMPLE_RATE = 16000
 BUFFER_SIZE = 512
 INT16_MAX_ABS_VALUE = 32768.0
+AUDIO_RING_MIN_SLOTS = 256
+FINAL_TRANSCRIPTION_MODES = ("full", "tail", "compare")
+INIT_TRANSCRIPTION_BATCH_WINDOW = 0.0
+INIT_MAX_BATCH_REQUESTS = 8
+INIT_LONG_FORM_THRESHOLD = 0.0
+INIT_LONG_FORM_WORKERS = max(1, (os.cpu_count() or 2) // 2)
 
 INIT_HANDLE_BUFFER_OVERFLOW = False
 if platform.system() != 'Darwin':
@@ -92,7 +115,10 @@ if platform.system() != 'Darwin':
 class TranscriptionWorker:
     def __init__(self, conn, stdout_pipe, model_path, download_root, compute_type, gpu_device_index, device,
                  ready_event, shutdown_event, interrupt_stop_event, beam_size, initial_prompt, suppress_tokens,
-                 batch_size, faster_whisper_vad_filter, normalize_audio):
+                 batch_size, faster_whisper_vad_filter, normalize_audio, batch_window=INIT_TRANSCRIPTION_BATCH_WINDOW,
+                 long_form_threshold=INIT_LONG_FORM_THRESHOLD, long_form_workers=INIT_LONG_FORM_WORKERS,
+                 cpu_threads=0, cpu_cores=None, latency_target=INIT_FINAL_LATENCY_TARGET,
+                 fallback_model_path=None, runs_as_thread=False):
         self.conn = conn
         self.stdout_pipe = stdout_pipe
         self.model_path = model_path
@@ -109,8 +135,31 @@ class TranscriptionWorker:
         self.batch_size = batch_size
         self.faster_whisper_vad_filter = faster_whisper_vad_filter
         self.normalize_audio = normalize_audio
+        self.batch_window = batch_window
+        self.long_form_threshold = long_form_threshold
+        self.long_form_workers = long_form_workers
+        self.cpu_threads = cpu_threads
+        self.cpu_cores = cpu_cores
+        self.long_form_pool = None
+        self.latency_target = latency_target
+        self.fallback_model_path = fallback_model_path
+        # A worker thread logs directly, a worker process through stdout_pipe
+        self.runs_as_thread = runs_as_thread
+        self.fallback_model = None
+        self.quality_policy = None
+        # Beam size of the batch being decoded, lowered by the quality policy
+        self.current_beam_size = beam_size
         self.queue = queue.Queue()
         self.text_normalizer = TextNormalizer()
+        self.audio_reader = SharedAudioReader()
+        self.cancelled_requests = set()
+        self.cancel_lock = threading.Lock()
+        self.requests_cancelled = 0
+        self.last_answered_id = 0
+        self.batches_run = 0
+        self.requests_served = 0
+        self.max_batch_size = 0
+        self.total_queue_delay = 0.0
 
     def custom_print(self, *args, **kwargs):
         message = ' '.join(map(str, args))
@@ -122,24 +171,340 @@ class TranscriptionWorker:
     def poll_connection(self):
         while not self.shutdown_event.is_set():
             try:
-                # Use a longer timeout to reduce polling frequency
-                if self.conn.poll(0.01):  # Increased from 0.01 to 0.5 seconds
-                    data = self.conn.recv()
-                    self.queue.put(data)
-                else:
-                    # Sleep only if no data, but use a shorter sleep
-                    time.sleep(TIME_SLEEP)
+                # Blocks in select until data arrives; the timeout only
+                # bounds how long shutdown takes to notice
+                if self.conn.poll(0.5):
+                    kind, request_id, data = self.conn.recv()
+                    if kind == REQUEST_CANCEL:
+                        with self.cancel_lock:
+                            # Late cancels for answered requests need no record
+                            if request_id > self.last_answered_id:
+                                self.cancelled_requests.add(request_id)
+                    else:
+                        # Keep the arrival time to report queueing delay
+                        self.queue.put((request_id, time.time(), data))
             except Exception as e:
                 logging.error(f"Error receiving data from connection: {e}", exc_info=True)
                 time.sleep(TIME_SLEEP)
 
-    def run(self):
-        if __name__ == "__main__":
-             system_signal.signal(system_signal.SIGINT, system_signal.SIG_IGN)
-             __builtins__['print'] = self.custom_print
+    def _collect_requests(self):
+        """
+        Gather the next batch of requests: blocks for the first one, then
+        takes whatever else arrives within `batch_window` seconds.
+        """
+        requests = [self.queue.get(timeout=0.1)]
+        deadline = time.time() + self.batch_window
+        while len(requests) < INIT_MAX_BATCH_REQUESTS:
+            remaining = deadline - time.time()
+            try:
+                if remaining > 0:
+                    requests.append(self.queue.get(timeout=remaining))
+                else:
+                    requests.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return requests
+
+    def _take_cancelled(self, request_id):
+        with self.cancel_lock:
+            if request_id in self.cancelled_requests:
+                self.cancelled_requests.discard(request_id)
+                self.requests_cancelled += 1
+                return True
+        return False
+
+    def _prepare_audio(self, audio):
+        # normalize audio to -0.95 dBFS
+        if self.normalize_audio:
+            peak = np.max(np.abs(audio))
+            if peak > 0:
+                audio = audio * (0.95 / peak)
+        return audio
+
+    def _transcribe_one(self, model, audio, language, use_prompt, options=None, long_form=True):
+        options = options or {}
+        if long_form and self.long_form_threshold > 0 and not options \
+                and len(audio) > self.long_form_threshold * SAMPLE_RATE:
+            return self._transcribe_long_form(model, audio, language, use_prompt)
+        prompt = None
+        if use_prompt:
+            prompt = self.initial_prompt if self.initial_prompt else None
+        if options.get("initial_prompt"):
+            prompt = options["initial_prompt"]
+        word_timestamps = bool(options.get("word_timestamps"))
+
+        if self.batch_size > 0:
+            segments, info = model.transcribe(
+                audio,
+                language=language if language else None,
+                beam_size=self.current_beam_size,
+                initial_prompt=prompt,
+                suppress_tokens=self.suppress_tokens,
+                batch_size=self.batch_size, 
+                vad_filter=self.faster_whisper_vad_filter,
+                word_timestamps=word_timestamps
+            )
+        else:
+            segments, info = model.transcribe(
+                audio,
+                language=language if language else None,
+                beam_size=self.current_beam_size,
+                initial_prompt=prompt,
+                suppress_tokens=self.suppress_tokens,
+                vad_filter=self.faster_whisper_vad_filter,
+                word_timestamps=word_timestamps
+            )
+        if word_timestamps:
+            words = [(word.start, word.end, word.word, word.probability)
+                     for seg in segments for word in (seg.words or [])]
+            return words, info
+        transcription = " ".join(seg.text for seg in segments).strip()
+        if options.get("text_prefix"):
+            # Normalized together, so numbers spanning the join are converted
+            transcription = (options["text_prefix"].strip() + " " + transcription).strip()
+        return self.text_normalizer.normalize(transcription), info
+
+    def _transcribe_long_form(self, model, audio, language, use_prompt):
+        """
+        Transcribe a long recording as chunks cut at silence boundaries.
+
+        With a BatchedInferencePipeline the chunks are decoded in one
+        batched call, otherwise concurrently on the model's parallel
+        workers. Chunk texts are joined with words repeated across
+        overlapping cuts removed.
+        """
+        start_t = time.time()
+        chunks = plan_chunks(audio)
+        if len(chunks) < 2:
+            return self._transcribe_one(model, audio, language, use_prompt, long_form=False)
+        audios = [audio[start:end] for start, end in chunks]
+        if self.batch_size > 0:
+            # Chunks of one recording share its language
+            results = self._transcribe_batch(model, audios, language, use_prompt, detect_each=False)
+        else:
+            results = list(self.long_form_pool.map(
+                lambda chunk: self._transcribe_one(model, chunk, language, use_prompt, long_form=False),
+                audios))
+        elapsed = time.time() - start_t
+        duration = len(audio) / SAMPLE_RATE
+        logging.debug(f"Long-form transcription of {duration:.1f}s in {len(chunks)} chunks took "
+                      f"{elapsed:.2f}s ({duration / elapsed:.1f}x realtime)")
+        return stitch_texts([text for text, _ in results], chunks), results[0][1]
+
+    def _transcribe_batch(self, model, audios, language, use_prompt, detect_each=True):
+        """
+        Transcribe several utterances with BatchedInferencePipeline calls.
+
+        The pipeline detects the language once per call, from the start of
+        its audio. Without a fixed language each utterance's language is
+        detected first and one call runs per detected language, so every
+        utterance is decoded in, and reports, its own language. With
+        `detect_each` False the first utterance's language is used for all.
+        """
+        prompt = None
+        if use_prompt:
+            prompt = self.initial_prompt if self.initial_prompt else None
+        if language:
+            return self._decode_batch(model, audios, language, prompt)
+
+        whisper_model = getattr(model, "model", model)
+        if detect_each:
+            detected = [whisper_model.detect_language(audio)[:2] for audio in audios]
+        else:
+            detected = [whisper_model.detect_language(audios[0])[:2]] * len(audios)
+        results = [None] * len(audios)
+        for code in dict.fromkeys(code for code, _ in detected):
+            indices = [i for i, (found, _) in enumerate(detected) if found == code]
+            decoded = self._decode_batch(model, [audios[i] for i in indices], code, prompt)
+            for i, (text, info) in zip(indices, decoded):
+                results[i] = (text, self._with_language(info, *detected[i]))
+        return results
+
+    @staticmethod
+    def _with_language(info, language, probability):
+        """Copy of a TranscriptionInfo reporting the detected language."""
+        if hasattr(info, "_replace"):
+            return info._replace(language=language, language_probability=probability)
+        info = copy.copy(info)
+        info.language = language
+        info.language_probability = probability
+        return info
+
+    def _decode_batch(self, model, audios, language, prompt):
+        """
+        Decode utterances of one language with one BatchedInferencePipeline
+        call.
+
+        The utterances are concatenated and passed as clip timestamps
+        (in samples, at most 30 s each), so the pipeline decodes all of them
+        in shared batches. Segments are mapped back to their utterance by
+        position in the concatenated audio.
+        """
+        max_clip = 30 * SAMPLE_RATE
+        offsets = []
+        clips = []
+        position = 0
+        for audio in audios:
+            offsets.append(position)
+            for clip_start in range(0, len(audio), max_clip):
+                clip_end = min(clip_start + max_clip, len(audio))
+                clips.append({"start": position + clip_start, "end": position + clip_end})
+            position += len(audio)
+
+        segments, info = model.transcribe(
+            np.concatenate(audios),
+            language=language,
+            beam_size=self.current_beam_size,
+            initial_prompt=prompt,
+            suppress_tokens=self.suppress_tokens,
+            batch_size=self.batch_size,
+            vad_filter=False,
+            clip_timestamps=clips,
+        )
+
+        texts = [[] for _ in audios]
+        for seg in segments:
+            midpoint = (seg.start + seg.end) / 2 * SAMPLE_RATE
+            index = max(bisect.bisect_right(offsets, midpoint) - 1, 0)
+            texts[index].append(seg.text)
+
+        return [
+            (self.text_normalizer.normalize(" ".join(parts).strip()), info)
+            for parts in texts
+        ]
+
+    def _apply_quality_policy(self, model, requests):
+        """Beam size and model for the next batch, from the latency policy."""
+        now = time.time()
+        oldest_wait = now - min(received_at for _, received_at, _ in requests)
+        decision = self.quality_policy.choose(self.queue.qsize(), oldest_wait, now)
+        if decision is not None:
+            def describe(level):
+                return f"beam {level.beam_size}" + (f" on {self.fallback_model_path}" if level.fallback else "")
+            message = (f"Transcription quality {describe(decision.previous)} -> "
+                       f"{describe(decision.level)}: {decision.reason}")
+            if self.runs_as_thread:
+                logging.info(message)
+            else:
+                # Logged at INFO by whoever reads the worker's stdout pipe
+                self.custom_print(message)
+        level = self.quality_policy.level
+        self.current_beam_size = level.beam_size
+        return self.fallback_model if level.fallback else model
+
+    def _process_requests(self, model, requests):
+        """
+        Run a batch of requests and send each response tagged with its
+        request id. Requests cancelled by the parent are skipped.
+        """
+        active = []
+        for request in requests:
+            if self._take_cancelled(request[0]):
+                self.conn.send((request[0], 'cancelled', None))
+            else:
+                active.append(request)
+        requests = active
+        if not requests:
+            return
+        if self.quality_policy is not None:
+            model = self._apply_quality_policy(model, requests)
+        start_t = time.time()
+        responses = {}
+        groups = {}
+        for request_id, received_at, (audio, language, use_prompt, *extra) in requests:
+            options = extra[0] if extra else {}
+            if isinstance(audio, AudioDescriptor):
+                # Read-only view of the parent's shared segment, valid
+                # until this request is answered
+                audio = self.audio_reader.view(audio)
+            if audio is None or audio.size == 0:
+                logging.error("Received None audio for transcription")
+                responses[request_id] = ('error', "Received None audio for transcription")
+                continue
+            key = (language, use_prompt, tuple(sorted(options.items())))
+            groups.setdefault(key, []).append(
+                (request_id, self._prepare_audio(audio)))
+
+        for (language, use_prompt, options), group in groups.items():
+            logging.debug(f"Transcribing {len(group)} request(s) with language {language}")
+            request_ids = [request_id for request_id, _ in group]
+            audios = [audio for _, audio in group]
+            options = dict(options)
+            try:
+                # Requests with their own decoding options run one by one
+                if self.batch_size > 0 and len(group) > 1 and not options:
+                    results = self._transcribe_batch(model, audios, language, use_prompt)
+                else:
+                    results = [self._transcribe_one(model, audio, language, use_prompt, options)
+                               for audio in audios]
+                for request_id, result in zip(request_ids, results):
+                    responses[request_id] = ('success', result)
+            except Exception as e:
+                logging.error(f"General error in transcription: {e}", exc_info=True)
+                for request_id in request_ids:
+                    responses[request_id] = ('error', str(e))
+
+        elapsed = time.time() - start_t
+        queue_delay = max(start_t - received_at for _, received_at, _ in requests)
+        self.batches_run += 1
+        self.requests_served += len(requests)
+        self.max_batch_size = max(self.max_batch_size, len(requests))
+        self.total_queue_delay += sum(start_t - received_at for _, received_at, _ in requests)
+        logging.debug(f"Transcribed batch of {len(requests)} request(s) in {elapsed:.4f}s, "
+                      f"max queueing delay {queue_delay * 1000:.1f}ms, "
+                      f"average batch size {self.requests_served / self.batches_run:.2f}")
+
+        for request_id, _, _ in requests:
+            if self._take_cancelled(request_id):
+                self.conn.send((request_id, 'cancelled', None))
+                continue
+            status, result = responses[request_id]
+            if status == 'success':
+                logging.debug(f"Final text detected with main model: {result[0]}")
+            self.conn.send((request_id, status, result))
+
+        if self.quality_policy is not None:
+            answered = time.time()
+            self.quality_policy.record(
+                [answered - received_at for _, received_at, _ in requests], elapsed)
+
+        with self.cancel_lock:
+            self.last_answered_id = max(self.last_answered_id, requests[-1][0])
+            self.cancelled_requests = {
+                request_id for request_id in self.cancelled_requests
+                if request_id > self.last_answered_id
+            }
+
+    def load_models(self):
+        """
+        Load the main model, its long-form replicas or batched pipeline and
+        the fallback model, and warm the main model up. Runs on the thread
+        or process that will transcribe; also used by the benchmarks.
+
+        Returns:
+            The main model.
+        """
+        # The model libraries are only imported in the process that runs the model
+        import faster_whisper
+        import soundfile as sf
 
         logging.info(f"Initializing faster_whisper main transcription model {self.model_path}")
 
+        # Threads created from here on, the model's included, inherit the pinning
+        set_thread_affinity(self.cpu_cores)
+
+        model_options = {}
+        if self.cpu_threads:
+            model_options["cpu_threads"] = self.cpu_threads
+        if self.long_form_threshold > 0 and self.batch_size == 0:
+            # Model replicas that decode long-form chunks concurrently,
+            # sharing the cores between them
+            model_options = dict(
+                num_workers=self.long_form_workers,
+                cpu_threads=max(1, (self.cpu_threads or os.cpu_count() or 1) // self.long_form_workers),
+            )
+            self.long_form_pool = ThreadPoolExecutor(self.long_form_workers)
+
         try:
             model = faster_whisper.WhisperModel(
                 model_size_or_path=self.model_path,
@@ -147,10 +512,11 @@ class TranscriptionWorker:
                 compute_type=self.compute_type,
                 device_index=self.gpu_device_index,
                 download_root=self.download_root,
+                **model_options,
             )
             # Create a short dummy audio array, for example 1 second of silence at 16 kHz
             if self.batch_size > 0:
-                model = BatchedInferencePipeline(model=model)
+                model = faster_whisper.BatchedInferencePipeline(model=model)
 
             # Run a warm-up transcription
             current_dir = os.path.dirname(os.path.realpath(__file__))
@@ -164,6 +530,34 @@ class TranscriptionWorker:
             logging.exception(f"Error initializing main faster_whisper transcription model: {e}")
             raise
 
+        if self.latency_target > 0:
+            if self.fallback_model_path:
+                try:
+                    self.fallback_model = faster_whisper.WhisperModel(
+                        model_size_or_path=self.fallback_model_path,
+                        device=self.device,
+                        compute_type=self.compute_type,
+                        device_index=self.gpu_device_index,
+                        download_root=self.download_root,
+                        **({"cpu_threads": self.cpu_threads} if self.cpu_threads else {}),
+                    )
+                    if self.batch_size > 0:
+                        self.fallback_model = faster_whisper.BatchedInferencePipeline(model=self.fallback_model)
+                except Exception as e:
+                    logging.exception(f"Error initializing fallback model {self.fallback_model_path}, "
+                                      f"degrading beam size only: {e}")
+                    self.fallback_model = None
+            self.quality_policy = QualityPolicy(
+                self.beam_size, self.latency_target, fallback=self.fallback_model is not None)
+
+        return model
+
+    def run(self):
+        if __name__ == "__main__":
+             system_signal.signal(system_signal.SIGINT, system_signal.SIG_IGN)
+             __builtins__['print'] = self.custom_print
+
+        model = self.load_models()
         self.ready_event.set()
         logging.debug("Faster_whisper main speech to text transcription model initialized successfully")
 
@@ -174,53 +568,8 @@ class TranscriptionWorker:
         try:
             while not self.shutdown_event.is_set():
                 try:
-                    audio, language, use_prompt = self.queue.get(timeout=0.1)
-                    try:
-                        logging.debug(f"Transcribing audio with language {language}")
-                        start_t = time.time()
-
-                        # normalize audio to -0.95 dBFS
-                        if audio is not None and audio .size > 0:
-                            if self.normalize_audio:
-                                peak = np.max(np.abs(audio))
-                                if peak > 0:
-                                    audio = (audio / peak) * 0.95
-                        else:
-                            logging.error("Received None audio for transcription")
-                            self.conn.send(('error', "Received None audio for transcription"))
-                            continue
-
-                        prompt = None
-                        if use_prompt:
-                            prompt = self.initial_prompt if self.initial_prompt else None
-
-                        if self.batch_size > 0:
-                            segments, info = model.transcribe(
-                                audio,
-                                language=language if language else None,
-                                beam_size=self.beam_size,
-                                initial_prompt=prompt,
-                                suppress_tokens=self.suppress_tokens,
-                                batch_size=self.batch_size, 
-                                vad_filter=self.faster_whisper_vad_filter
-                            )
-                        else:
-                            segments, info = model.transcribe(
-                                audio,
-                                language=language if language else None,
-                                beam_size=self.beam_size,
-                                initial_prompt=prompt,
-                                suppress_tokens=self.suppress_tokens,
-                                vad_filter=self.faster_whisper_vad_filter
-                            )
-                        elapsed = time.time() - start_t
-                        transcription = " ".join(seg.text for seg in segments).strip()
-                        transcription = self.text_normalizer.normalize(transcription)
-                        logging.debug(f"Final text detected with main model: {transcription} in {elapsed:.4f}s")
-                        self.conn.send(('success', (transcription, info)))
-                    except Exception as e:
-                        logging.error(f"General error in transcription: {e}", exc_info=True)
-                        self.conn.send(('error', str(e)))
+                    requests = self._collect_requests()
+                    self._process_requests(model, requests)
                 except queue.Empty:
                     continue
                 except KeyboardInterrupt:
@@ -231,6 +580,11 @@ class TranscriptionWorker:
                     logging.error(f"General error in processing queue item: {e}", exc_info=True)
         finally:
             __builtins__['print'] = print  # Restore the original print function
+            if self.long_form_pool:
+                self.long_form_pool.shutdown(wait=False)
+            if self.quality_policy is not None:
+                logging.info(f"Transcription quality policy: {self.quality_policy.stats()}")
+            self.audio_reader.close()
             self.conn.close()
             self.stdout_pipe.close()
             self.shutdown_event.set()  # Ensure the polling thread will stop
@@ -276,11 +630,13 @@ class AudioToTextRecorder:
                  init_realtime_after_seconds=INIT_REALTIME_INITIAL_PAUSE,
                  on_realtime_transcription_update=None,
                  on_realtime_transcription_stabilized=None,
+                 on_realtime_transcription_delta=None,
                  realtime_batch_size: int = 16,
 
                  # Voice activation parameters
                  silero_sensitivity: float = INIT_SILERO_SENSITIVITY,
                  silero_use_onnx: bool = False,
+                 silero_model_dir: str = None,
                  silero_deactivity_detection: bool = False,
                  webrtc_sensitivity: int = INIT_WEBRTC_SENSITIVITY,
                  post_speech_silence_duration: float = (
@@ -335,7 +691,24 @@ class AudioToTextRecorder:
                  faster_whisper_vad_filter: bool = True,
                  normalize_audio: bool = False,
                  start_callback_in_new_thread: bool = False,
+                 callback_workers: int = INIT_CALLBACK_WORKERS,
+                 callback_queue_size: int = INIT_CALLBACK_QUEUE_SIZE,
                  fixed_interval: float = 0.0,
+                 use_energy_gate: bool = False,
+                 energy_gate_margin_db: float = INIT_ENERGY_GATE_MARGIN_DB,
+                 transcription_batch_window: float = INIT_TRANSCRIPTION_BATCH_WINDOW,
+                 realtime_streaming: bool = False,
+                 realtime_window_seconds: float = INIT_REALTIME_WINDOW_SECONDS,
+                 final_transcription_mode: str = "full",
+                 transcription_server: str = None,
+                 long_form_threshold: float = INIT_LONG_FORM_THRESHOLD,
+                 long_form_workers: int = INIT_LONG_FORM_WORKERS,
+                 resource_plan=None,
+                 realtime_model_process: bool = False,
+                 adaptive_realtime_cadence: bool = False,
+                 realtime_target_latency: float = INIT_REALTIME_TARGET_LATENCY,
+                 realtime_cpu_share: float = INIT_REALTIME_CPU_SHARE,
+                 final_latency_target: float = INIT_FINAL_LATENCY_TARGET,
                  ):
         """
         Initializes an audio recorder and  transcription
@@ -417,6 +790,12 @@ class AudioToTextRecorder:
             triggered when the transcribed text stabilizes in quality. The
             stabilized text is generally more accurate but may arrive with a
             slight delay compared to the regular real-time updates.
+        - on_realtime_transcription_delta = A callback function that is
+            triggered with a StabilizerUpdate after every real-time
+            transcription. It carries only the text written to the stable
+            span (stable_delta at position stable_start, with stable_reset
+            set when part of the span was replaced) and the current unstable
+            text, instead of full strings.
         - realtime_batch_size (int, default=16): Batch size for the real-time
             transcription model.
         - silero_sensitivity (float, default=SILERO_SENSITIVITY): Sensitivity
@@ -426,6 +805,10 @@ class AudioToTextRecorder:
             pre-trained model from Silero in the ONNX (Open Neural Network
             Exchange) format instead of the PyTorch format. This is
             recommended for faster performance.
+        - silero_model_dir (str, default=None): Local checkout of the
+            silero-vad repository to load the model from. Without it the
+            model comes from the silero_vad package or the torch hub cache
+            if either is present, and is downloaded only as a last resort.
         - silero_deactivity_detection (bool, default=False): Enables the Silero
             model for end-of-speech detection. More robust against background
             noise. Utilizes additional GPU resources but improves accuracy in
@@ -569,9 +952,101 @@ class AudioToTextRecorder:
             normalize the audio to a specific range before processing. This can
             help improve the quality of the transcription.
         - start_callback_in_new_thread (bool, default=False): If set to True,
-            the callback functions will be executed in a
-            new thread. This can help improve performance by allowing the
-            callback to run concurrently with other operations.
+            the callback functions will be executed on a small pool of
+            callback threads. This can help improve performance by allowing
+            the callback to run concurrently with other operations.
+            Invocations of the same callback keep their order. If a consumer
+            falls behind, pending on_recorded_chunk calls beyond
+            callback_queue_size are dropped (oldest first) and pending
+            realtime update and stabilized calls are replaced by the newest.
+        - callback_workers (int, default=4): Number of callback threads used
+            with start_callback_in_new_thread.
+        - callback_queue_size (int, default=32): Pending on_recorded_chunk
+            calls kept before the oldest ones are dropped.
+        - use_energy_gate (bool, default=False): If set to True, a cheap RMS
+            and zero-crossing check with an adaptive noise floor runs before
+            voice activity detection. Chunks that are clearly silence skip
+            the WebRTC and Silero models entirely, which lowers idle CPU
+            usage of always-on listeners.
+        - energy_gate_margin_db (float, default=6.0): How far above the
+            tracked noise floor (in dB) a chunk may be and still count as
+            silence for the energy gate.
+        - transcription_batch_window (float, default=0.0): Time in seconds
+            the transcription worker waits after a request arrives to collect
+            further pending requests. Collected requests are transcribed
+            together in one batch when batch_size is greater than 0.
+            With 0, only requests that are already waiting are batched.
+        - realtime_streaming (bool, default=False): If set to True, realtime
+            transcription decodes only the audio after the committed text
+            instead of the whole recording on every pass. Words that two
+            consecutive passes agree on are committed and feed
+            realtime_stabilized_safetext and the stabilized callback.
+        - realtime_window_seconds (float, default=15.0): Length of the
+            decoded window in streaming mode before it is moved up to the
+            last committed word.
+        - final_transcription_mode (str, default="full"): How the final
+            transcription is produced when realtime_streaming is active.
+            "full" decodes the whole utterance with the main model. "tail"
+            keeps the committed realtime text up to the first word the
+            realtime model was unsure about and decodes only the audio after
+            it with the main model. "compare" runs both, logs their latency
+            and word agreement, and returns the full decode.
+        - transcription_server (str, default=None): Address of a shared
+            transcription server started with transcription_server.py,
+            as "unix:/path/to/socket" or "tcp:host:port". If set, this
+            recorder only captures audio and detects voice activity: no
+            transcription worker or model is started locally, and final,
+            early and realtime transcriptions are all sent to the server,
+            whose model and batching are shared with other recorders.
+            The model options of this recorder are then ignored.
+        - long_form_threshold (float, default=0.0): Recordings longer than
+            this many seconds are transcribed in long-form mode: they are
+            cut into chunks of up to 30 s at silence boundaries found by the
+            WebRTC VAD, and the chunks are decoded in parallel, in one
+            batched call if batch_size is greater than 0, otherwise on
+            long_form_workers model replicas. Words repeated across chunks
+            cut inside speech are removed. 0 disables long-form mode.
+        - long_form_workers (int, default=half the CPU cores): Model
+            replicas used for long-form mode when batch_size is 0. The CPU
+            threads of the main model are divided between them.
+        - resource_plan (str, dict or ResourcePlan, default=None): CPU
+            thread budget of the reader, Silero VAD, realtime model and main
+            model. None keeps every library's default thread pool, which
+            oversubscribes the cores on CPU. "auto" gives the reader and
+            Silero one core and splits the others between the realtime and
+            main model. A dict maps component names ("reader", "silero_vad",
+            "realtime_model", "main_model") to {"threads": n, "cores": [...]};
+            components with cores are pinned to them (Linux only). The
+            achieved real-time factor of every component is available from
+            resource_report().
+        - realtime_model_process (bool, default=False): Runs the realtime
+            model in its own worker process, fed through a pipe and shared
+            memory like the main model, instead of on the realtime thread
+            of this process. Realtime decodes then never hold this
+            interpreter's GIL, so the recording loop, the VAD threads and
+            callbacks keep running while a pass is decoded. Ignored when
+            use_main_model_for_realtime is set.
+        - adaptive_realtime_cadence (bool, default=False): Adapts the pause
+            between realtime passes to the measured decode speed, with
+            realtime_processing_pause as the shortest pause. Fast decoding
+            waits up to realtime_target_latency instead of re-decoding
+            nearly unchanged audio; slow decoding waits long enough to keep
+            decoding within realtime_cpu_share of the time instead of
+            running passes back to back. The chosen pause and the observed
+            real-time factor are in realtime_cadence.stats() either way.
+        - realtime_target_latency (float, default=0.5): Seconds from new
+            audio to the partial that contains it, pause plus decode, that
+            the adaptive cadence aims for.
+        - realtime_cpu_share (float, default=0.5): Largest fraction of the
+            time the adaptive cadence lets realtime decoding take.
+        - final_latency_target (float, default=0.0): Seconds a transcription
+            may take in the worker, queueing included. When recent latencies
+            or the queue depth predict a miss, the worker halves beam_size
+            step by step down to 1, then decodes with the
+            realtime_model_type model if it differs from the main model
+            (loaded in the worker for this). It steps back up once the queue
+            stays empty and latencies are well below the target. Every
+            change is logged with its reason. 0 disables the policy.
 
         Raises:
             Exception: Errors related to initializing transcription
@@ -613,7 +1088,16 @@ class AudioToTextRecorder:
         self.on_recorded_chunk = on_recorded_chunk
         self.on_transcription_start = on_transcription_start
         self.enable_realtime_transcription = enable_realtime_transcription
-        self.use_main_model_for_realtime = use_main_model_for_realtime
+        # A shared server also serves realtime requests
+        self.use_main_model_for_realtime = use_main_model_for_realtime or bool(transcription_server)
+        self.resource_plan = ResourcePlan.from_option(
+            resource_plan,
+            realtime=enable_realtime_transcription and not self.use_main_model_for_realtime)
+        self.component_meter = ComponentMeter()
+        self.realtime_model_process = (
+            realtime_model_process and enable_realtime_transcription
+            and not self.use_main_model_for_realtime)
+        self.transcription_server = transcription_server
         self.main_model_type = model
         if not download_root:
             download_root = None
@@ -621,12 +1105,19 @@ class AudioToTextRecorder:
         self.realtime_model_type = realtime_model_type
         self.realtime_processing_pause = realtime_processing_pause
         self.init_realtime_after_seconds = init_realtime_after_seconds
+        self.realtime_cadence = CadenceController(
+            realtime_processing_pause,
+            target_latency=realtime_target_latency,
+            cpu_share=realtime_cpu_share,
+            adaptive=adaptive_realtime_cadence,
+        )
         self.on_realtime_transcription_update = (
             on_realtime_transcription_update
         )
         self.on_realtime_transcription_stabilized = (
             on_realtime_transcription_stabilized
         )
+        self.on_realtime_transcription_delta = on_realtime_transcription_delta
         self.debug_mode = debug_mode
         self.handle_buffer_overflow = handle_buffer_overflow
         self.beam_size = beam_size
@@ -636,8 +1127,12 @@ class AudioToTextRecorder:
         self.realtime_batch_size = realtime_batch_size
 
         self.level = level
-        self.audio_queue = mp.Queue()
         self.buffer_size = buffer_size
+        self.feed_resampler = None
+        self.audio_queue = SharedRingBuffer(
+            slot_samples=self.buffer_size,
+            slots=max(2 * self.allowed_latency_limit, AUDIO_RING_MIN_SLOTS)
+        )
         self.sample_rate = sample_rate
         self.recording_start_time = 0
         self.recording_stop_time = 0
@@ -645,7 +1140,8 @@ class AudioToTextRecorder:
         self.last_recording_stop_time = 0
         self.wake_word_detect_time = 0
         self.silero_check_time = 0
-        self.silero_working = False
+        self.last_chunk_seq = -1
+        self.silero_result_floor = 0
         self.speech_end_silence_start = 0
         self.silero_sensitivity = silero_sensitivity
         self.silero_deactivity_detection = silero_deactivity_detection
@@ -654,7 +1150,7 @@ class AudioToTextRecorder:
         self.halo = None
         self.state = "inactive"
         self.wakeword_detected = False
-        self.text_storage = []
+        self.text_stabilizer = TextStabilizer()
         self.realtime_stabilized_text = ""
         self.realtime_stabilized_safetext = ""
         self.is_webrtc_speech_active = False
@@ -666,6 +1162,9 @@ class AudioToTextRecorder:
         self.stream = None
         self.start_recording_event = threading.Event()
         self.stop_recording_event = threading.Event()
+        # Notified whenever recording state changes, so waiting threads wake
+        # up right away instead of polling
+        self.state_condition = threading.Condition()
         self.backdate_stop_seconds = 0.0
         self.backdate_resume_seconds = 0.0
         self.last_transcription_bytes = None
@@ -680,7 +1179,7 @@ class AudioToTextRecorder:
         self.detected_realtime_language_probability = 0
         self.transcription_lock = threading.Lock()
         self.shutdown_lock = threading.Lock()
-        self.transcribe_count = 0
+        self.early_transcription_future = None
         self.print_transcription_time = print_transcription_time
         self.early_transcription_on_silence = early_transcription_on_silence
         self.use_extended_logging = use_extended_logging
@@ -688,7 +1187,22 @@ class AudioToTextRecorder:
         self.normalize_audio = normalize_audio
         self.awaiting_speech_end = False
         self.start_callback_in_new_thread = start_callback_in_new_thread
+        self.callback_dispatcher = CallbackDispatcher(
+            max_workers=callback_workers, max_pending=callback_queue_size)
+        self.transcript_hub = TranscriptHub(self)
         self.fixed_interval = fixed_interval
+        self.energy_gate = (
+            EnergyGate(margin_db=energy_gate_margin_db) if use_energy_gate else None
+        )
+        self.transcription_batch_window = transcription_batch_window
+        self.long_form_threshold = long_form_threshold
+        self.long_form_workers = long_form_workers
+        self.realtime_streaming = realtime_streaming
+        if final_transcription_mode not in FINAL_TRANSCRIPTION_MODES:
+            raise ValueError(f"final_transcription_mode must be one of {FINAL_TRANSCRIPTION_MODES}")
+        self.final_transcription_mode = final_transcription_mode
+        self.realtime_agreement = LocalAgreementTranscript(
+            SAMPLE_RATE, window_seconds=realtime_window_seconds)
 
         # ----------------------------------------------------------------------------
         # Named logger configuration
@@ -730,6 +1244,8 @@ class AudioToTextRecorder:
             logger.info(f"Start method has already been set. Details: {e}")
 
         logger.info("Starting RealTimeSTT")
+        logger.info(f"CPU resource plan: {self.resource_plan.describe()}")
+        startup = StartupTimer()
 
         if use_extended_logging:
             logger.info("RealtimeSTT was called with these parameters:")
@@ -740,33 +1256,104 @@ class AudioToTextRecorder:
         self.was_interrupted = mp.Event()
         self.main_transcription_ready_event = mp.Event()
 
-        self.parent_transcription_pipe, child_transcription_pipe = SafePipe()
-        self.parent_stdout_pipe, child_stdout_pipe = SafePipe()
-
         # Set device for model
-        self.device = "cuda" if self.device == "cuda" and torch.cuda.is_available() else "cpu"
-
-        self.transcript_process = self._start_thread(
-            target=AudioToTextRecorder._transcription_worker,
-            args=(
-                child_transcription_pipe,
-                child_stdout_pipe,
-                self.main_model_type,
-                self.download_root,
-                self.compute_type,
-                self.gpu_device_index,
-                self.device,
-                self.main_transcription_ready_event,
-                self.shutdown_event,
-                self.interrupt_stop_event,
-                self.beam_size,
-                self.initial_prompt,
-                self.suppress_tokens,
-                self.batch_size,
-                self.faster_whisper_vad_filter,
-                self.normalize_audio,
+        if self.device == "cuda":
+            import torch
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+        if self.transcription_server:
+            logger.info(f"Using shared transcription server {self.transcription_server}")
+            self.transcription_channel = RemoteTranscriptionChannel(self.transcription_server)
+            self.parent_transcription_pipe = None
+            self.parent_stdout_pipe = None
+            self.audio_pool = None
+            self.transcript_process = None
+            self.main_transcription_ready_event.set()
+        else:
+            self.parent_transcription_pipe, child_transcription_pipe = SafePipe()
+            self.audio_pool = SharedAudioPool()
+            self.transcription_channel = TranscriptionChannel(
+                self.parent_transcription_pipe, audio_pool=self.audio_pool)
+            self.parent_stdout_pipe, child_stdout_pipe = SafePipe()
+
+            self.transcript_process = self._start_thread(
+                target=AudioToTextRecorder._transcription_worker,
+                args=(
+                    child_transcription_pipe,
+                    child_stdout_pipe,
+                    self.main_model_type,
+                    self.download_root,
+                    self.compute_type,
+                    self.gpu_device_index,
+                    self.device,
+                    self.main_transcription_ready_event,
+                    self.shutdown_event,
+                    self.interrupt_stop_event,
+                    self.beam_size,
+                    self.initial_prompt,
+                    self.suppress_tokens,
+                    self.batch_size,
+                    self.faster_whisper_vad_filter,
+                    self.normalize_audio,
+                    self.transcription_batch_window,
+                    self.long_form_threshold,
+                    self.long_form_workers,
+                    self.resource_plan.threads(COMPONENT_MAIN),
+                    self.resource_plan.cores(COMPONENT_MAIN),
+                    final_latency_target,
+                    realtime_model_type if realtime_model_type != self.main_model_type else None,
+                    # _start_thread runs the worker as a thread on Linux
+                    platform.system() == 'Linux',
+                )
             )
-        )
+            startup.submit("main_model", self.main_transcription_ready_event.wait)
+
+        # Realtime passes go through a transcription channel when the main
+        # model or a realtime worker process decodes them
+        self.realtime_channel = self.transcription_channel if self.use_main_model_for_realtime else None
+        self.realtime_process = None
+        self.realtime_audio_pool = None
+        self.parent_realtime_pipe = None
+        self.parent_realtime_stdout_pipe = None
+        if self.realtime_model_process:
+            self.parent_realtime_pipe, child_realtime_pipe = SafePipe()
+            self.parent_realtime_stdout_pipe, child_realtime_stdout_pipe = SafePipe()
+            self.realtime_audio_pool = SharedAudioPool()
+            self.realtime_channel = TranscriptionChannel(
+                self.parent_realtime_pipe, audio_pool=self.realtime_audio_pool)
+            self.realtime_model_ready_event = mp.Event()
+
+            # Always a process, also on Linux where the main worker is a
+            # thread: the point is a separate interpreter
+            self.realtime_process = mp.Process(
+                target=AudioToTextRecorder._transcription_worker,
+                args=(
+                    child_realtime_pipe,
+                    child_realtime_stdout_pipe,
+                    self.realtime_model_type,
+                    self.download_root,
+                    self.compute_type,
+                    self.gpu_device_index,
+                    self.device,
+                    self.realtime_model_ready_event,
+                    self.shutdown_event,
+                    self.interrupt_stop_event,
+                    self.beam_size_realtime,
+                    self.initial_prompt_realtime,
+                    self.suppress_tokens,
+                    self.realtime_batch_size,
+                    self.faster_whisper_vad_filter,
+                    self.normalize_audio,
+                    INIT_TRANSCRIPTION_BATCH_WINDOW,
+                    0.0,
+                    INIT_LONG_FORM_WORKERS,
+                    self.resource_plan.threads(COMPONENT_REALTIME),
+                    self.resource_plan.cores(COMPONENT_REALTIME),
+                )
+            )
+            self.realtime_process.start()
+            startup.submit("realtime_model", self._wait_worker_ready,
+                           self.realtime_model_ready_event, self.realtime_process)
 
         # Start audio data reading process
         if self.use_microphone.value:
@@ -784,164 +1371,56 @@ class AudioToTextRecorder:
                     self.input_device_index,
                     self.shutdown_event,
                     self.interrupt_stop_event,
-                    self.use_microphone
+                    self.use_microphone,
+                    self.resource_plan.cores(COMPONENT_READER),
                 )
             )
 
-        # Initialize the realtime transcription model
-        if self.enable_realtime_transcription and not self.use_main_model_for_realtime:
+        # The remaining models load concurrently with each other and with
+        # the main model in the transcription worker
+        if self.enable_realtime_transcription and self.realtime_channel is None:
+            startup.submit("realtime_model", self._init_realtime_model)
+
+        if wake_words or wakeword_backend in {'oww', 'openwakeword', 'openwakewords', 'pvp', 'pvporcupine'}:
+            startup.submit("wake_words", self._init_wake_word_detection, wake_words, wakeword_backend,
+                           wake_words_sensitivity, openwakeword_model_paths,
+                           openwakeword_inference_framework)
+
+        silero_future = startup.submit("silero_vad", self._init_silero_vad, silero_use_onnx, silero_model_dir)
+
+        with startup.measure("webrtc_vad"):
+            # Setup voice activity detection model WebRTC
             try:
-                logger.info("Initializing faster_whisper realtime "
-                             f"transcription model {self.realtime_model_type}, "
-                             f"default device: {self.device}, "
-                             f"compute type: {self.compute_type}, "
-                             f"device index: {self.gpu_device_index}, "
-                             f"download root: {self.download_root}"
+                logger.info("Initializing WebRTC voice with "
+                             f"Sensitivity {webrtc_sensitivity}"
                              )
-                self.realtime_model_type = faster_whisper.WhisperModel(
-                    model_size_or_path=self.realtime_model_type,
-                    device=self.device,
-                    compute_type=self.compute_type,
-                    device_index=self.gpu_device_index,
-                    download_root=self.download_root,
-                )
-                if self.realtime_batch_size > 0:
-                    self.realtime_model_type = BatchedInferencePipeline(model=self.realtime_model_type)
+                import webrtcvad
+                self.webrtc_vad_model = webrtcvad.Vad()
+                self.webrtc_vad_model.set_mode(webrtc_sensitivity)
 
-                # Run a warm-up transcription
-                current_dir = os.path.dirname(os.path.realpath(__file__))
-                warmup_audio_path = os.path.join(
-                    current_dir, "warmup_audio.wav"
-                )
-                warmup_audio_data, _ = sf.read(warmup_audio_path, dtype="float32")
-                segments, info = self.realtime_model_type.transcribe(warmup_audio_data, language="en", beam_size=1)
-                model_warmup_transcription = " ".join(segment.text for segment in segments)
             except Exception as e:
-                logger.exception("Error initializing faster_whisper "
-                                  f"realtime transcription model: {e}"
+                logger.exception("Error initializing WebRTC voice "
+                                  f"activity detection engine: {e}"
                                   )
                 raise
 
-            logger.debug("Faster_whisper realtime speech to text "
-                          "transcription model initialized successfully")
-
-        # Setup wake word detection
-        if wake_words or wakeword_backend in {'oww', 'openwakeword', 'openwakewords', 'pvp', 'pvporcupine'}:
-            self.wakeword_backend = wakeword_backend
-
-            self.wake_words_list = [
-                word.strip() for word in wake_words.lower().split(',')
-            ]
-            self.wake_words_sensitivity = wake_words_sensitivity
-            self.wake_words_sensitivities = [
-                float(wake_words_sensitivity)
-                for _ in range(len(self.wake_words_list))
-            ]
-
-            if wake_words and self.wakeword_backend in {'pvp', 'pvporcupine'}:
-
-                try:
-                    self.porcupine = pvporcupine.create(
-                        keywords=self.wake_words_list,
-                        sensitivities=self.wake_words_sensitivities
-                    )
-                    self.buffer_size = self.porcupine.frame_length
-                    self.sample_rate = self.porcupine.sample_rate
-
-                except Exception as e:
-                    logger.exception(
-                        "Error initializing porcupine "
-                        f"wake word detection engine: {e}. "
-                        f"Wakewords: {self.wake_words_list}."
-                    )
-                    raise
-
-                logger.debug(
-                    "Porcupine wake word detection engine initialized successfully"
-                )
-
-            elif wake_words and self.wakeword_backend in {'oww', 'openwakeword', 'openwakewords'}:
-                    
-                openwakeword.utils.download_models()
-
-                try:
-                    if openwakeword_model_paths:
-                        model_paths = openwakeword_model_paths.split(',')
-                        self.owwModel = Model(
-                            wakeword_models=model_paths,
-                            inference_framework=openwakeword_inference_framework
-                        )
-                        logger.info(
-                            "Successfully loaded wakeword model(s): "
-                            f"{openwakeword_model_paths}"
-                        )
-                    else:
-                        self.owwModel = Model(
-                            inference_framework=openwakeword_inference_framework)
-                    
-                    self.oww_n_models = len(self.owwModel.models.keys())
-                    if not self.oww_n_models:
-                        logger.error(
-                            "No wake word models loaded."
-                        )
-
-                    for model_key in self.owwModel.models.keys():
-                        logger.info(
-                            "Successfully loaded openwakeword model: "
-                            f"{model_key}"
-                        )
-
-                except Exception as e:
-                    logger.exception(
-                        "Error initializing openwakeword "
-                        f"wake word detection engine: {e}"
-                    )
-                    raise
-
-                logger.debug(
-                    "Open wake word detection engine initialized successfully"
-                )
-            
-            else:
-                logger.exception(f"Wakeword engine {self.wakeword_backend} unknown/unsupported or wake_words not specified. Please specify one of: pvporcupine, openwakeword.")
-
-
-        # Setup voice activity detection model WebRTC
-        try:
-            logger.info("Initializing WebRTC voice with "
-                         f"Sensitivity {webrtc_sensitivity}"
-                         )
-            self.webrtc_vad_model = webrtcvad.Vad()
-            self.webrtc_vad_model.set_mode(webrtc_sensitivity)
-
-        except Exception as e:
-            logger.exception("Error initializing WebRTC voice "
-                              f"activity detection engine: {e}"
-                              )
-            raise
+            logger.debug("WebRTC VAD voice activity detection "
+                          "engine initialized successfully"
+                          )
 
-        logger.debug("WebRTC VAD voice activity detection "
-                      "engine initialized successfully"
-                      )
+        startup.wait("realtime_model", "wake_words", "silero_vad")
+        startup.details["silero_vad"] = silero_future.result()
 
-        # Setup voice activity detection model Silero VAD
-        try:
-            self.silero_vad_model, _ = torch.hub.load(
-                repo_or_dir="snakers4/silero-vad",
-                model="silero_vad",
-                verbose=False,
-                onnx=silero_use_onnx
-            )
+        # Every chunk is converted to 16 kHz once for both VAD models
+        self.vad_ingest = VADIngest(self.sample_rate)
 
-        except Exception as e:
-            logger.exception(f"Error initializing Silero VAD "
-                              f"voice activity detection engine: {e}"
-                              )
-            raise
-
-        logger.debug("Silero VAD voice activity detection "
-                      "engine initialized successfully"
-                      )
+        # Persistent Silero inference thread, fed by _check_voice_activity
+        self.silero_worker = VADWorker(
+            infer_batch=self._silero_infer_batch,
+            on_result=self._on_silero_result,
+            name="SileroVADWorker",
+            on_start=lambda: set_thread_affinity(self.resource_plan.cores(COMPONENT_VAD)),
+        )
 
         self.audio_buffer = collections.deque(
             maxlen=int((self.sample_rate // self.buffer_size) *
@@ -951,8 +1430,8 @@ class AudioToTextRecorder:
             maxlen=int((self.sample_rate // self.buffer_size) *
                        0.3)
         )
-        self.frames = []
-        self.last_frames = []
+        self.frames = UtteranceBuffer(self.sample_rate)
+        self.last_frames = UtteranceBuffer(self.sample_rate)
 
         # Recording control flags
         self.is_recording = False
@@ -973,12 +1452,17 @@ class AudioToTextRecorder:
         # Wait for transcription models to start
         logger.debug('Waiting for main transcription model to start')
         self.main_transcription_ready_event.wait()
+        startup.wait()
         logger.debug('Main transcription model ready')
 
-        self.stdout_thread = threading.Thread(target=self._read_stdout)
-        self.stdout_thread.daemon = True
-        self.stdout_thread.start()
+        # Worker output is delivered by the pipe's selector thread
+        if self.parent_stdout_pipe:
+            self.parent_stdout_pipe.set_receive_handler(self._on_stdout_message)
+        if self.parent_realtime_stdout_pipe:
+            self.parent_realtime_stdout_pipe.set_receive_handler(self._on_stdout_message)
 
+        self.startup_timings = dict(startup.timings)
+        logger.info(f"Startup timing: {startup.report()}")
         logger.debug('RealtimeSTT initialization completed successfully')
                    
     def _start_thread(self, target=None, args=()):
@@ -986,8 +1470,8 @@ class AudioToTextRecorder:
         Implement a consistent threading model across the library.
 
         This method is used to start any thread in this library. It uses the
-        standard threading. Thread for Linux and for all others uses the pytorch
-        MultiProcessing library 'Process'.
+        standard threading. Thread for Linux and for all others uses the
+        multiprocessing library 'Process'.
         Args:
             target (callable object): is the callable object to be invoked by
               the run() method. Defaults to None, meaning nothing is called.
@@ -1004,33 +1488,209 @@ class AudioToTextRecorder:
             thread.start()
             return thread
 
-    def _read_stdout(self):
-        while not self.shutdown_event.is_set():
+    @staticmethod
+    def _wait_worker_ready(ready_event, process):
+        """Wait until a worker process has loaded its model, or has died."""
+        while not ready_event.wait(timeout=0.1):
+            if not process.is_alive():
+                raise RuntimeError(f"Transcription worker exited with code {process.exitcode} "
+                                   "before its model was ready")
+
+    def _init_realtime_model(self):
+        """Load and warm up the in-process realtime transcription model."""
+        import faster_whisper
+        import soundfile as sf
+
+        try:
+            logger.info("Initializing faster_whisper realtime "
+                         f"transcription model {self.realtime_model_type}, "
+                         f"default device: {self.device}, "
+                         f"compute type: {self.compute_type}, "
+                         f"device index: {self.gpu_device_index}, "
+                         f"download root: {self.download_root}"
+                         )
+            model_options = {}
+            if self.resource_plan.threads(COMPONENT_REALTIME):
+                model_options["cpu_threads"] = self.resource_plan.threads(COMPONENT_REALTIME)
+            # The model's threads inherit the pinning of the loading thread
+            with pinned(self.resource_plan.cores(COMPONENT_REALTIME)):
+                self.realtime_model_type = faster_whisper.WhisperModel(
+                    model_size_or_path=self.realtime_model_type,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    device_index=self.gpu_device_index,
+                    download_root=self.download_root,
+                    **model_options,
+                )
+            if self.realtime_batch_size > 0:
+                self.realtime_model_type = faster_whisper.BatchedInferencePipeline(model=self.realtime_model_type)
+
+            # Run a warm-up transcription
+            current_dir = os.path.dirname(os.path.realpath(__file__))
+            warmup_audio_path = os.path.join(
+                current_dir, "warmup_audio.wav"
+            )
+            warmup_audio_data, _ = sf.read(warmup_audio_path, dtype="float32")
+            segments, info = self.realtime_model_type.transcribe(warmup_audio_data, language="en", beam_size=1)
+            model_warmup_transcription = " ".join(segment.text for segment in segments)
+        except Exception as e:
+            logger.exception("Error initializing faster_whisper "
+                              f"realtime transcription model: {e}"
+                              )
+            raise
+
+        logger.debug("Faster_whisper realtime speech to text "
+                      "transcription model initialized successfully")
+
+    def _init_wake_word_detection(self, wake_words, wakeword_backend, wake_words_sensitivity,
+                                  openwakeword_model_paths, openwakeword_inference_framework):
+        """Set up the Porcupine or openWakeWord wake word engine."""
+        self.wakeword_backend = wakeword_backend
+
+        self.wake_words_list = [
+            word.strip() for word in wake_words.lower().split(',')
+        ]
+        self.wake_words_sensitivity = wake_words_sensitivity
+        self.wake_words_sensitivities = [
+            float(wake_words_sensitivity)
+            for _ in range(len(self.wake_words_list))
+        ]
+
+        if wake_words and self.wakeword_backend in {'pvp', 'pvporcupine'}:
+
+            import pvporcupine
+
             try:
-                if self.parent_stdout_pipe.poll(0.1):
-                    logger.debug("Receive from stdout pipe")
-                    message = self.parent_stdout_pipe.recv()
-                    logger.info(message)
-            except (BrokenPipeError, EOFError, OSError):
-                # The pipe probably has been closed, so we ignore the error
-                pass
-            except KeyboardInterrupt:  # handle manual interruption (Ctrl+C)
-                logger.info("KeyboardInterrupt in read from stdout detected, exiting...")
-                break
+                self.porcupine = pvporcupine.create(
+                    keywords=self.wake_words_list,
+                    sensitivities=self.wake_words_sensitivities
+                )
+                self.buffer_size = self.porcupine.frame_length
+                self.sample_rate = self.porcupine.sample_rate
+
+            except Exception as e:
+                logger.exception(
+                    "Error initializing porcupine "
+                    f"wake word detection engine: {e}. "
+                    f"Wakewords: {self.wake_words_list}."
+                )
+                raise
+
+            logger.debug(
+                "Porcupine wake word detection engine initialized successfully"
+            )
+
+        elif wake_words and self.wakeword_backend in {'oww', 'openwakeword', 'openwakewords'}:
+            import openwakeword
+            from openwakeword.model import Model
+
+            openwakeword.utils.download_models()
+
+            try:
+                if openwakeword_model_paths:
+                    model_paths = openwakeword_model_paths.split(',')
+                    self.owwModel = Model(
+                        wakeword_models=model_paths,
+                        inference_framework=openwakeword_inference_framework
+                    )
+                    logger.info(
+                        "Successfully loaded wakeword model(s): "
+                        f"{openwakeword_model_paths}"
+                    )
+                else:
+                    self.owwModel = Model(
+                        inference_framework=openwakeword_inference_framework)
+
+                self.oww_n_models = len(self.owwModel.models.keys())
+                if not self.oww_n_models:
+                    logger.error(
+                        "No wake word models loaded."
+                    )
+
+                for model_key in self.owwModel.models.keys():
+                    logger.info(
+                        "Successfully loaded openwakeword model: "
+                        f"{model_key}"
+                    )
+
             except Exception as e:
-                logger.error(f"Unexpected error in read from stdout: {e}", exc_info=True)
-                logger.error(traceback.format_exc())  # Log the full traceback here
-                break 
-            time.sleep(0.1)
+                logger.exception(
+                    "Error initializing openwakeword "
+                    f"wake word detection engine: {e}"
+                )
+                raise
+
+            logger.debug(
+                "Open wake word detection engine initialized successfully"
+            )
+
+        else:
+            logger.exception(f"Wakeword engine {self.wakeword_backend} unknown/unsupported or wake_words not specified. Please specify one of: pvporcupine, openwakeword.")
+
+    def _init_silero_vad(self, use_onnx, model_dir):
+        """Load Silero VAD, offline when a local copy exists; returns its source."""
+        try:
+            self.silero_vad_model, source = load_silero_vad(use_onnx=use_onnx, model_dir=model_dir)
+            if self.resource_plan.threads(COMPONENT_VAD):
+                # Silero is the only torch model in this process
+                import torch
+                torch.set_num_threads(self.resource_plan.threads(COMPONENT_VAD))
+
+        except Exception as e:
+            logger.exception(f"Error initializing Silero VAD "
+                              f"voice activity detection engine: {e}"
+                              )
+            raise
+
+        logger.debug(f"Silero VAD voice activity detection "
+                      f"engine initialized successfully from {source}"
+                      )
+        return source
+
+    def resource_report(self):
+        """
+        Thread plan and achieved real-time factor of every component.
+
+        The real-time factor is processing seconds per second of audio.
+        Realtime and main model figures are measured in the recorder, so
+        they include the wait for the transcription worker.
+
+        Returns:
+            dict: {"plan": {component: {"threads", "cores"}},
+                   "components": {component: {"calls", "processing_seconds",
+                   "audio_seconds", "rtf"}}}
+        """
+        return {
+            "plan": {component: allocation._asdict()
+                     for component, allocation in self.resource_plan.allocations.items()},
+            "components": self.component_meter.report(),
+        }
+
+    def _on_stdout_message(self, message):
+        if isinstance(message, Exception):
+            # The pipe probably has been closed, so we ignore the error
+            return
+        logger.debug("Receive from stdout pipe")
+        logger.info(message)
 
     def _transcription_worker(*args, **kwargs):
         worker = TranscriptionWorker(*args, **kwargs)
         worker.run()
 
+    def _callback_policy(self, cb):
+        """Delivery policy for callbacks dispatched to callback threads."""
+        if cb == self.on_recorded_chunk:
+            return POLICY_DROP
+        if cb == self.on_realtime_transcription_update or \
+                cb == self.on_realtime_transcription_stabilized:
+            # Every update carries the full text, only the newest matters
+            return POLICY_COALESCE
+        return POLICY_QUEUE
+
     def _run_callback(self, cb, *args, **kwargs):
         if self.start_callback_in_new_thread:
-            # Run the callback in a new thread to avoid blocking the main thread
-            threading.Thread(target=cb, args=args, kwargs=kwargs, daemon=True).start()
+            # Run the callback on the callback threads to avoid blocking the main thread
+            self.callback_dispatcher.submit(cb, *args, policy=self._callback_policy(cb), **kwargs)
         else:
             # Run the callback in the main thread to avoid threading issues
             cb(*args, **kwargs)
@@ -1043,7 +1703,8 @@ class AudioToTextRecorder:
         input_device_index,
         shutdown_event,
         interrupt_stop_event,
-        use_microphone
+        use_microphone,
+        cpu_cores=None,
     ):
         """
         Worker method that handles the audio recording process.
@@ -1056,24 +1717,26 @@ class AudioToTextRecorder:
         - Gracefully terminating the recording process when a shutdown event is set.
 
         Args:
-            audio_queue (queue.Queue): A queue where recorded audio data is placed.
+            audio_queue (SharedRingBuffer): Shared-memory ring buffer where recorded audio data is placed.
             target_sample_rate (int): The desired sample rate for the output audio (for Silero VAD).
             buffer_size (int): The number of samples expected by the Silero VAD model.
             input_device_index (int): The index of the audio input device.
             shutdown_event (threading.Event): An event that, when set, signals this worker method to terminate.
             interrupt_stop_event (threading.Event): An event to signal keyboard interrupt.
             use_microphone (multiprocessing.Value): A shared value indicating whether to use the microphone.
+            cpu_cores (list of int, optional): Cores to pin this worker to.
 
         Raises:
             Exception: If there is an error while initializing the audio recording.
         """
         import pyaudio
         import numpy as np
-        from scipy import signal
 
         if __name__ == '__main__':
             system_signal.signal(system_signal.SIGINT, system_signal.SIG_IGN)
 
+        set_thread_affinity(cpu_cores)
+
         def get_highest_sample_rate(audio_interface, device_index):
             """Get the highest supported sample rate for the specified device."""
             try:
@@ -1197,32 +1860,31 @@ class AudioToTextRecorder:
                     time.sleep(3)  # Wait before retrying
                     continue
 
+        resampler = None
+        resampled_chunk = None
+
         def preprocess_audio(chunk, original_sample_rate, target_sample_rate):
             """Preprocess audio chunk similar to feed_audio method."""
-            if isinstance(chunk, np.ndarray):
-                # Handle stereo to mono conversion if necessary
-                if chunk.ndim == 2:
-                    chunk = np.mean(chunk, axis=1)
-
-                # Resample to target_sample_rate if necessary
-                if original_sample_rate != target_sample_rate:
-                    logger.debug(f"Resampling from {original_sample_rate} Hz to {target_sample_rate} Hz.")
-                    num_samples = int(len(chunk) * target_sample_rate / original_sample_rate)
-                    chunk = signal.resample(chunk, num_samples)
-
-                chunk = chunk.astype(np.int16)
-            else:
+            nonlocal resampler, resampled_chunk
+            if not isinstance(chunk, np.ndarray):
                 # If chunk is bytes, convert to numpy array
                 chunk = np.frombuffer(chunk, dtype=np.int16)
+            elif chunk.ndim == 2:
+                # Handle stereo to mono conversion if necessary
+                chunk = np.mean(chunk, axis=1)
 
-                # Resample if necessary
-                if original_sample_rate != target_sample_rate:
-                    logger.debug(f"Resampling from {original_sample_rate} Hz to {target_sample_rate} Hz.")
-                    num_samples = int(len(chunk) * target_sample_rate / original_sample_rate)
-                    chunk = signal.resample(chunk, num_samples)
-                    chunk = chunk.astype(np.int16)
+            if original_sample_rate == target_sample_rate:
+                return chunk.astype(np.int16, copy=False).tobytes()
 
-            return chunk.tobytes()
+            # Resample with one streaming filter per device rate; it is
+            # recreated only when the stream is reopened at another rate
+            if resampler is None or resampler.input_rate != original_sample_rate:
+                logger.debug(f"Resampling from {original_sample_rate} Hz to {target_sample_rate} Hz.")
+                resampler = StreamingResampler(original_sample_rate, target_sample_rate)
+            output_length = resampler.output_length(len(chunk))
+            if resampled_chunk is None or len(resampled_chunk) < output_length:
+                resampled_chunk = np.empty(output_length + 1, dtype=np.int16)
+            return resampler.process(chunk, out=resampled_chunk).tobytes()
 
         audio_interface = None
         stream = None
@@ -1315,7 +1977,7 @@ class AudioToTextRecorder:
                             else:
                                 time_since_last_buffer_message = time.time()
 
-                            audio_queue.put(to_process)
+                            audio_queue.write(to_process)
 
                 except OSError as e:
                     if e.errno == pyaudio.paInputOverflowed:
@@ -1368,7 +2030,7 @@ class AudioToTextRecorder:
         finally:
             # After recording stops, feed any remaining audio data
             if buffer:
-                audio_queue.put(bytes(buffer))
+                audio_queue.write(bytes(buffer))
 
             try:
                 if stream:
@@ -1390,6 +2052,7 @@ class AudioToTextRecorder:
         self.start_recording_on_voice_activity = False
         self.stop_recording_on_voice_deactivity = False
         self.interrupt_stop_event.set()
+        self._notify_state_change()
         if self.state != "inactive": # if inactive, was_interrupted will never be set
             self.was_interrupted.wait()
             self._set_state("transcribing")
@@ -1398,6 +2061,28 @@ class AudioToTextRecorder:
             self.stop()
 
 
+    def _notify_state_change(self):
+        with self.state_condition:
+            self.state_condition.notify_all()
+
+    def _wait_state(self, predicate, timeout=None, interruptible=True):
+        """
+        Blocks until `predicate()` is true, the recorder is interrupted (if
+        `interruptible`) or `timeout` passes. interrupt_stop_event can also
+        be set from another process, which cannot notify; it is rechecked at
+        least every second.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self.state_condition:
+            while not predicate():
+                if interruptible and self.interrupt_stop_event.is_set():
+                    return False
+                remaining = 1.0 if deadline is None else min(deadline - time.time(), 1.0)
+                if remaining <= 0:
+                    return False
+                self.state_condition.wait(remaining)
+            return True
+
     def wait_audio(self):
         """
         Waits for the start and completion of the audio recording process.
@@ -1425,9 +2110,7 @@ class AudioToTextRecorder:
 
                 # Wait until recording starts
                 logger.debug('Waiting for recording start')
-                while not self.interrupt_stop_event.is_set():
-                    if self.start_recording_event.wait(timeout=0.02):
-                        break
+                self._wait_state(self.start_recording_event.is_set)
 
             # If recording is ongoing, wait for voice inactivity
             # to finish recording.
@@ -1436,59 +2119,39 @@ class AudioToTextRecorder:
 
                 # Wait until recording stops
                 logger.debug('Waiting for recording stop')
-                while not self.interrupt_stop_event.is_set():
-                    if (self.stop_recording_event.wait(timeout=0.02)):
-                        break
+                self._wait_state(self.stop_recording_event.is_set)
 
             frames = self.frames
             if len(frames) == 0:
                 frames = self.last_frames
 
-            # Calculate samples needed for backdating resume
-            samples_to_keep = int(self.sample_rate * self.backdate_resume_seconds)
-
-            # First convert all current frames to audio array
-            full_audio_array = np.frombuffer(b''.join(frames), dtype=np.int16)
-            full_audio = full_audio_array.astype(np.float32) / INT16_MAX_ABS_VALUE
-
-            # Calculate how many samples we need to keep for backdating resume
-            if samples_to_keep > 0:
-                samples_to_keep = min(samples_to_keep, len(full_audio))
-                # Keep the last N samples for backdating resume
-                frames_to_read_audio = full_audio[-samples_to_keep:]
-
-                # Convert the audio back to int16 bytes for frames
-                frames_to_read_int16 = (frames_to_read_audio * INT16_MAX_ABS_VALUE).astype(np.int16)
-                frame_bytes = frames_to_read_int16.tobytes()
-
-                # Split into appropriate frame sizes (assuming standard frame size)
-                FRAME_SIZE = 2048  # Typical frame size
-                frames_to_read = []
-                for i in range(0, len(frame_bytes), FRAME_SIZE):
-                    frame = frame_bytes[i:i + FRAME_SIZE]
-                    if frame:  # Only add non-empty frames
-                        frames_to_read.append(frame)
-            else:
-                frames_to_read = []
+            # Zero-copy view of the whole utterance as float32
+            full_audio = frames.audio()
 
             # Process backdate stop seconds
             samples_to_remove = int(self.sample_rate * self.backdate_stop_seconds)
 
             if samples_to_remove > 0:
                 if samples_to_remove < len(full_audio):
-                    self.audio = full_audio[:-samples_to_remove]
+                    self.audio = full_audio[:-samples_to_remove].copy()
                     logger.debug(f"Removed {samples_to_remove} samples "
                         f"({samples_to_remove/self.sample_rate:.3f}s) from end of audio")
                 else:
                     self.audio = np.array([], dtype=np.float32)
                     logger.debug("Cleared audio (samples_to_remove >= audio length)")
             else:
-                self.audio = full_audio
+                self.audio = full_audio.copy()
                 logger.debug(f"No samples removed, final audio length: {len(self.audio)}")
 
-            self.frames.clear()
+            # Keep the last N samples for backdating resume
+            samples_to_keep = int(self.sample_rate * self.backdate_resume_seconds)
+            if frames is self.frames:
+                self.frames.keep_last(max(samples_to_keep, 0))
+            else:
+                self.frames.clear()
+                if samples_to_keep > 0:
+                    self.frames.append(frames.pcm()[-samples_to_keep:])
             self.last_frames.clear()
-            self.frames.extend(frames_to_read)
 
             # Reset backdating parameters
             self.backdate_stop_seconds = 0.0
@@ -1516,22 +2179,58 @@ class AudioToTextRecorder:
                 return ""
 
             try:
-                if self.transcribe_count == 0:
-                    logger.debug("Adding transcription request, no early transcription started")
+                future = self.early_transcription_future
+                self.early_transcription_future = None
+                tail_future = None
+                if future is None or future.cancelled():
                     start_time = time.time()  # Start timing
-                    self.parent_transcription_pipe.send((audio_bytes, self.language, use_prompt))
-                    self.transcribe_count += 1
-
-                while self.transcribe_count > 0:
-                    logger.debug(F"Receive from parent_transcription_pipe after sendiung transcription request, transcribe_count: {self.transcribe_count}")
-                    if not self.parent_transcription_pipe.poll(0.1): # check if transcription done
-                        if self.interrupt_stop_event.is_set(): # check if interrupted
-                            self.was_interrupted.set()
-                            self._set_state("inactive")
-                            return "" # return empty string if interrupted
-                        continue
-                    status, result = self.parent_transcription_pipe.recv()
-                    self.transcribe_count -= 1
+                    tail = self._committed_realtime_tail(audio_bytes)
+                    if tail is not None:
+                        committed_text, tail_audio, prompt = tail
+                        logger.debug(f"Decoding {len(tail_audio) / SAMPLE_RATE:.2f}s tail "
+                                     f"after committed realtime text: {committed_text}")
+                        # The worker joins the raw committed text and the tail
+                        # and normalizes them as one text
+                        options = {"text_prefix": committed_text}
+                        if prompt:
+                            options["initial_prompt"] = prompt
+                        tail_future = self.transcription_channel.submit(
+                            tail_audio, self.language, use_prompt, kind="final-tail", **options)
+                    if tail is None or self.final_transcription_mode == "compare":
+                        logger.debug("Adding transcription request, no early transcription started")
+                        future = self.transcription_channel.submit(
+                            audio_bytes, self.language, use_prompt, kind="final")
+                else:
+                    logger.debug(f"Using early transcription request {future.request_id}")
+
+                if tail_future is not None:
+                    tail_status, tail_result = self._wait_transcription(tail_future)
+                    if tail_status is None:
+                        if future is not None:
+                            future.cancel()
+                        self.was_interrupted.set()
+                        self._set_state("inactive")
+                        return "" # return empty string if interrupted
+                    tail_time = time.time() - start_time
+                    if tail_status != 'success' and future is None:
+                        logger.warning(f"Tail transcription failed ({tail_result}), "
+                                       "decoding the full utterance")
+                        tail_future = None
+                        future = self.transcription_channel.submit(
+                            audio_bytes, self.language, use_prompt, kind="final")
+
+                if future is None:
+                    status, result = tail_status, tail_result
+                else:
+                    status, result = self._wait_transcription(future)
+                    if status is None:
+                        self.was_interrupted.set()
+                        self._set_state("inactive")
+                        return "" # return empty string if interrupted
+                    if tail_future is not None:
+                        self._log_final_comparison(
+                            tail_status, tail_result, tail_time,
+                            status, result, time.time() - start_time)
 
                 self.allowed_to_early_transcribe = True
                 self._set_state("inactive")
@@ -1546,6 +2245,9 @@ class AudioToTextRecorder:
                     transcription_time = end_time - start_time
 
                     if start_time:
+                        # Measured at the recorder, so it includes queueing in the worker
+                        self.component_meter.record(COMPONENT_MAIN, transcription_time,
+                                                    len(audio_bytes) / SAMPLE_RATE)
                         if self.print_transcription_time:
                             print(f"Model {self.main_model_type} completed transcription in {transcription_time:.2f} seconds")
                         else:
@@ -1559,6 +2261,57 @@ class AudioToTextRecorder:
                 raise e
 
 
+    def _wait_transcription(self, future):
+        """
+        Waits for a transcription future.
+
+        Returns:
+            tuple: (status, result) with status 'success' or 'error', or
+            (None, None) if the recorder was interrupted while waiting.
+        """
+        while True:
+            try:
+                return 'success', future.result(timeout=0.1)
+            except FutureTimeoutError:
+                if self.interrupt_stop_event.is_set(): # check if interrupted
+                    future.cancel()
+                    return None, None
+            except CancelledError:
+                return 'error', "Transcription request was cancelled"
+            except Exception as e:
+                return 'error', str(e)
+
+    def _committed_realtime_tail(self, audio):
+        """
+        Splits the utterance at the end of the confident committed realtime
+        text when the final transcription mode allows it.
+
+        Returns:
+            tuple: (committed text, tail audio, decoder prompt), or None if
+            the whole utterance has to be decoded.
+        """
+        if self.final_transcription_mode == "full" or not self.realtime_streaming:
+            return None
+        agreement = self.realtime_agreement
+        split = agreement.confident_samples
+        if not agreement.confident_text.strip() or split <= 0 or split >= len(audio):
+            return None
+        prompt = agreement.confident_text[-PROMPT_MAX_CHARS:].strip()
+        return agreement.confident_text, audio[split:], prompt
+
+    def _log_final_comparison(self, tail_status, tail_result, tail_time,
+                              full_status, full_result, full_time):
+        if tail_status != 'success' or full_status != 'success':
+            logger.info(f"Final transcription comparison incomplete: "
+                        f"tail {tail_status}, full {full_status}")
+            return
+        tail_words = tail_result[0].lower().split()
+        full_words = full_result[0].lower().split()
+        agreement = difflib.SequenceMatcher(None, tail_words, full_words).ratio()
+        logger.info(f"Final transcription comparison: tail decode {tail_time:.3f}s, "
+                    f"full decode {full_time:.3f}s, word agreement {agreement:.1%}\n"
+                    f"  tail: {tail_result[0]}\n  full: {full_result[0]}")
+
     def transcribe(self):
         """
         Transcribes audio captured by this class instance using the
@@ -1674,11 +2427,61 @@ class AudioToTextRecorder:
             return ""
 
         if on_transcription_finished:
-            threading.Thread(target=on_transcription_finished,
-                            args=(self.transcribe(),)).start()
+            self.callback_dispatcher.submit(on_transcription_finished, self.transcribe())
         else:
             return self.transcribe()
 
+    async def stream(self, partials: bool = True):
+        """
+        Asynchronously iterates over transcripts as they are produced.
+
+        Usage:
+            async for event in recorder.stream():
+                print(event.kind, event.timestamp, event.text)
+
+        A single background thread per recorder runs the `text()` loop while
+        at least one stream is open, so any number of consumers on any
+        number of event loops can share it. Do not call `text()` yourself
+        while streams are open, since both would wait for the same
+        utterances.
+
+        Args:
+            partials (bool): Also yield realtime and stabilized partial
+              transcriptions, not only final ones. Partials are skipped if
+              the consumer falls behind; finals are never skipped.
+
+        Yields:
+            TranscriptEvent: (kind, text, timestamp) with kind "realtime",
+              "stabilized" or "final" and timestamp in `time.time()` seconds.
+              The iteration ends when the recorder shuts down.
+        """
+        loop = asyncio.get_running_loop()
+        subscription = self.transcript_hub.subscribe(loop, partials=partials)
+        try:
+            while True:
+                event = await subscription.queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            self.transcript_hub.unsubscribe(subscription)
+
+    async def text_async(self):
+        """
+        Awaitable counterpart of `text()`: waits for the next final
+        transcription without blocking the event loop.
+
+        Returns:
+            str: The transcription, or "" if the recorder shut down.
+        """
+        loop = asyncio.get_running_loop()
+        subscription = self.transcript_hub.subscribe(loop, partials=False)
+        try:
+            event = await subscription.queue.get()
+        finally:
+            self.transcript_hub.unsubscribe(subscription)
+        return event.text if event is not None else ""
+
 
     def format_number(self, num):
         # Convert the number to a string
@@ -1705,21 +2508,24 @@ class AudioToTextRecorder:
 
         logger.info("recording started")
         self._set_state("recording")
-        self.text_storage = []
+        self.text_stabilizer.reset()
         self.realtime_stabilized_text = ""
         self.realtime_stabilized_safetext = ""
+        self.realtime_agreement.reset()
         self.wakeword_detected = False
         self.wake_word_detect_time = 0
-        self.frames = []
+        self.frames.clear()
         if frames:
-            self.frames = frames
+            self.frames.extend(frames)
         self.is_recording = True
 
         self.recording_start_time = time.time()
         self.is_silero_speech_active = False
         self.is_webrtc_speech_active = False
+        self.silero_result_floor = self.last_chunk_seq + 1
         self.stop_recording_event.clear()
         self.start_recording_event.set()
+        self._notify_state_change()
 
         if self.on_recording_start:
             self._run_callback(self.on_recording_start)
@@ -1751,16 +2557,18 @@ class AudioToTextRecorder:
             return self
 
         logger.info("recording stopped")
-        self.last_frames = copy.deepcopy(self.frames)
+        self.last_frames = self.frames.copy()
         self.backdate_stop_seconds = backdate_stop_seconds
         self.backdate_resume_seconds = backdate_resume_seconds
         self.is_recording = False
         self.recording_stop_time = time.time()
         self.is_silero_speech_active = False
         self.is_webrtc_speech_active = False
+        self.silero_result_floor = self.last_chunk_seq + 1
         self.silero_check_time = 0
         self.start_recording_event.clear()
         self.stop_recording_event.set()
+        self._notify_state_change()
 
         self.last_recording_start_time = self.recording_start_time
         self.last_recording_stop_time = self.recording_stop_time
@@ -1785,7 +2593,7 @@ class AudioToTextRecorder:
         """
         Feed an audio chunk into the processing pipeline. Chunks are
         accumulated until the buffer size is reached, and then the accumulated
-        data is fed into the audio_queue.
+        data is written into the audio ring buffer.
         """
         # Check if the buffer attribute exists, if not, initialize it
         if not hasattr(self, 'buffer'):
@@ -1797,10 +2605,13 @@ class AudioToTextRecorder:
             if chunk.ndim == 2:
                 chunk = np.mean(chunk, axis=1)
 
-            # Resample to 16000 Hz if necessary
+            # Resample to 16000 Hz if necessary, keeping filter state
+            # between consecutive feeds of the same stream
             if original_sample_rate != 16000:
-                num_samples = int(len(chunk) * 16000 / original_sample_rate)
-                chunk = resample(chunk, num_samples)
+                if self.feed_resampler is None or \
+                        self.feed_resampler.input_rate != original_sample_rate:
+                    self.feed_resampler = StreamingResampler(original_sample_rate, 16000)
+                chunk = self.feed_resampler.process(chunk)
 
             # Ensure data type is int16
             chunk = chunk.astype(np.int16)
@@ -1819,7 +2630,7 @@ class AudioToTextRecorder:
             self.buffer = self.buffer[buf_size:]
 
             # Feed the extracted data to the audio_queue
-            self.audio_queue.put(to_process)
+            self.audio_queue.write(to_process)
 
     def set_microphone(self, microphone_on=True):
         """
@@ -1848,6 +2659,11 @@ class AudioToTextRecorder:
             self.shutdown_event.set()
             self.is_recording = False
             self.is_running = False
+            self._notify_state_change()
+
+            logger.info(f"Component real-time factors: {self.component_meter.report()}")
+            if self.enable_realtime_transcription:
+                logger.info(f"Realtime cadence: {self.realtime_cadence.stats()}")
 
             logger.debug('Finishing recording thread')
             if self.recording_thread:
@@ -1865,21 +2681,56 @@ class AudioToTextRecorder:
                                     )
                     self.reader_process.terminate()
 
-            logger.debug('Terminating transcription process')
-            self.transcript_process.join(timeout=10)
+            if self.transcript_process:
+                logger.debug('Terminating transcription process')
+                self.transcript_process.join(timeout=10)
 
-            if self.transcript_process.is_alive():
-                logger.warning("Transcript process did not terminate "
-                                "in time. Terminating forcefully."
-                                )
-                self.transcript_process.terminate()
+                if self.transcript_process.is_alive():
+                    logger.warning("Transcript process did not terminate "
+                                    "in time. Terminating forcefully."
+                                    )
+                    self.transcript_process.terminate()
 
-            self.parent_transcription_pipe.close()
+            self.transcription_channel.close()
+            logger.debug(f"Transcription channel stats: {self.transcription_channel.stats()}")
+            if self.audio_pool:
+                logger.debug(f"Shared audio pool stats: {self.audio_pool.stats()}")
+                self.audio_pool.close()
+            if self.parent_transcription_pipe:
+                self.parent_transcription_pipe.close()
 
             logger.debug('Finishing realtime thread')
             if self.realtime_thread:
                 self.realtime_thread.join()
 
+            if self.realtime_process:
+                logger.debug('Terminating realtime transcription process')
+                self.realtime_process.join(timeout=10)
+
+                if self.realtime_process.is_alive():
+                    logger.warning("Realtime transcription process did not terminate "
+                                    "in time. Terminating forcefully."
+                                    )
+                    self.realtime_process.terminate()
+
+                self.realtime_channel.close()
+                logger.debug(f"Realtime channel stats: {self.realtime_channel.stats()}")
+                self.realtime_audio_pool.close()
+                self.parent_realtime_pipe.close()
+
+            self.silero_worker.stop()
+            logger.debug(f"Silero VAD worker stats: {self.silero_worker.stats()}")
+            self.callback_dispatcher.shutdown()
+            self.transcript_hub.close()
+            logger.debug(f"Callback dispatcher stats: {self.callback_dispatcher.stats()}")
+            if self.energy_gate:
+                logger.debug(f"Energy gate stats: {self.energy_gate.stats()}")
+
+            ring_stats = self.audio_queue.stats()
+            if ring_stats["overruns"] or ring_stats["dropped"]:
+                logger.info(f"Audio ring buffer lost chunks: {ring_stats}")
+            self.audio_queue.close()
+
             if self.enable_realtime_transcription:
                 if self.realtime_model_type:
                     del self.realtime_model_type
@@ -1922,10 +2773,8 @@ class AudioToTextRecorder:
                 try:
                     # if self.use_extended_logging:
                     #     logger.debug('Debug: Trying to get data from audio queue')
-                    try:
-                        data = self.audio_queue.get(timeout=0.01)
-                        self.last_words_buffer.append(data)
-                    except queue.Empty:
+                    item = self.audio_queue.read(timeout=0.01)
+                    if item is None:
                         # if self.use_extended_logging:
                         #     logger.debug('Debug: Queue is empty, checking if still running')
                         if not self.is_running:
@@ -1935,6 +2784,23 @@ class AudioToTextRecorder:
                         # if self.use_extended_logging:
                         #     logger.debug('Debug: Continuing to next iteration')
                         continue
+                    seq, chunk = item
+                    self.last_chunk_seq = seq
+                    data = chunk.tobytes()
+                    # Convert to 16 kHz once; WebRTC and Silero share the result
+                    ingest_start = time.perf_counter()
+                    vad_chunk = self.vad_ingest.process(seq, data)
+                    self.component_meter.record(COMPONENT_RESAMPLING, time.perf_counter() - ingest_start,
+                                                len(vad_chunk.pcm) / SAMPLE_RATE)
+                    # Obvious silence skips the VAD models entirely
+                    gated_silence = (
+                        self.energy_gate is not None
+                        and self.energy_gate.is_silence(
+                            vad_chunk.pcm,
+                            speech=self.is_recording or self.is_silero_speech_active
+                            or self.is_webrtc_speech_active)
+                    )
+                    self.last_words_buffer.append(data)
 
                     if self.use_extended_logging:
                         logger.debug('Debug: Checking for on_recorded_chunk callback')
@@ -1949,26 +2815,24 @@ class AudioToTextRecorder:
                         if self.use_extended_logging:
                             logger.debug('Debug: Handling buffer overflow')
                         # Handle queue overflow
-                        if (self.audio_queue.qsize() >
-                                self.allowed_latency_limit):
+                        pending = self.audio_queue.pending()
+                        if pending > self.allowed_latency_limit:
                             if self.use_extended_logging:
                                 logger.debug('Debug: Queue size exceeds limit, logging warnings')
                             logger.warning("Audio queue size exceeds "
                                             "latency limit. Current size: "
-                                            f"{self.audio_queue.qsize()}. "
+                                            f"{pending}. "
                                             "Discarding old audio chunks."
                                             )
 
-                        if self.use_extended_logging:
-                            logger.debug('Debug: Discarding old chunks if necessary')
-                        while (self.audio_queue.qsize() >
-                                self.allowed_latency_limit):
-
-                            data = self.audio_queue.get()
+                            if self.use_extended_logging:
+                                logger.debug('Debug: Discarding old chunks')
+                            self.audio_queue.discard(keep=self.allowed_latency_limit)
 
                 except BrokenPipeError:
                     logger.error("BrokenPipeError _recording_worker", exc_info=True)
                     self.is_running = False
+                    self._notify_state_change()
                     break
 
                 if self.use_extended_logging:
@@ -2101,17 +2965,19 @@ class AudioToTextRecorder:
                                 logger.debug('Debug: Adding buffered audio to frames')
                             # Add the buffered audio
                             # to the recording frames
-                            self.frames.extend(list(self.audio_buffer))
+                            self.frames.extend(self.audio_buffer)
                             self.audio_buffer.clear()
 
                             if self.use_extended_logging:
                                 logger.debug('Debug: Resetting Silero VAD model states')
-                            self.silero_vad_model.reset_states()
+                            with self.silero_worker.model_lock:
+                                self.silero_vad_model.reset_states()
+                        elif gated_silence:
+                            self.is_webrtc_speech_active = False
                         else:
                             if self.use_extended_logging:
                                 logger.debug('Debug: Checking voice activity')
-                            data_copy = data[:]
-                            self._check_voice_activity(data_copy)
+                            self._check_voice_activity(vad_chunk)
 
                     if self.use_extended_logging:
                         logger.debug('Debug: Resetting speech_end_silence_start')
@@ -2131,19 +2997,7 @@ class AudioToTextRecorder:
                         if self.use_extended_logging:
                             logger.debug('Debug: Removing wakeword samples')
                         # Remove samples from the beginning of self.frames
-                        samples_removed = 0
-                        while wakeword_samples_to_remove > 0 and self.frames:
-                            frame = self.frames[0]
-                            frame_samples = len(frame) // 2  # Assuming 16-bit audio
-                            if wakeword_samples_to_remove >= frame_samples:
-                                self.frames.pop(0)
-                                samples_removed += frame_samples
-                                wakeword_samples_to_remove -= frame_samples
-                            else:
-                                self.frames[0] = frame[wakeword_samples_to_remove * 2:]
-                                samples_removed += wakeword_samples_to_remove
-                                samples_to_remove = 0
-                        
+                        self.frames.trim_start(wakeword_samples_to_remove)
                         wakeword_samples_to_remove = 0
 
                     if self.use_extended_logging:
@@ -2155,10 +3009,13 @@ class AudioToTextRecorder:
                         
                         if self.fixed_interval > 0:
                             is_speech = (time.time() - self.recording_start_time) < self.fixed_interval
+                        elif gated_silence:
+                            is_speech = False
+                            self.is_webrtc_speech_active = False
                         else:
                             is_speech = (
-                                self._is_silero_speech(data) if self.silero_deactivity_detection
-                                else self._is_webrtc_speech(data, True)
+                                self._is_silero_speech(vad_chunk) if self.silero_deactivity_detection
+                                else self._is_webrtc_speech(vad_chunk, True)
                             )
 
                         if self.use_extended_logging:
@@ -2182,6 +3039,7 @@ class AudioToTextRecorder:
 
                                 self.speech_end_silence_start = time.time()
                                 self.awaiting_speech_end = True
+                                self._notify_state_change()
                                 if self.on_turn_detection_start:
                                     if self.use_extended_logging:
                                         logger.debug('Debug: Calling on_turn_detection_start')
@@ -2195,19 +3053,19 @@ class AudioToTextRecorder:
                                 self.allowed_to_early_transcribe:
                                     if self.use_extended_logging:
                                         logger.debug("Debug:Adding early transcription request")
-                                    self.transcribe_count += 1
-                                    audio_array = np.frombuffer(b''.join(self.frames), dtype=np.int16)
-                                    audio = audio_array.astype(np.float32) / INT16_MAX_ABS_VALUE
+                                    audio = self.frames.audio()
 
                                     if self.use_extended_logging:
-                                        logger.debug("Debug: early transcription request pipe send")
-                                    self.parent_transcription_pipe.send((audio, self.language, True))
+                                        logger.debug("Debug: early transcription request submit")
+                                    self.early_transcription_future = self.transcription_channel.submit(
+                                        audio, self.language, True, kind="early")
                                     if self.use_extended_logging:
-                                        logger.debug("Debug: early transcription request pipe send return")
+                                        logger.debug("Debug: early transcription request submit return")
                                     self.allowed_to_early_transcribe = False
 
                         else:
                             self.awaiting_speech_end = False
+                            self._notify_state_change()
                             if self.use_extended_logging:
                                 logger.debug('Debug: Handling speech detection')
                             if self.speech_end_silence_start:
@@ -2221,6 +3079,11 @@ class AudioToTextRecorder:
                                             logger.debug('Debug: Calling on_turn_detection_stop')
                                         self._run_callback(self.on_turn_detection_stop)
 
+                                # Speech resumed, so an early transcription
+                                # no longer covers the utterance
+                                if self.early_transcription_future is not None:
+                                    self.early_transcription_future.cancel()
+                                    self.early_transcription_future = None
                                 self.allowed_to_early_transcribe = True
 
                         if self.use_extended_logging:
@@ -2267,6 +3130,7 @@ class AudioToTextRecorder:
                                 failed_stop_attempt = True
 
                             self.awaiting_speech_end = False
+                            self._notify_state_change()
 
                 if self.use_extended_logging:
                     logger.debug('Debug: Checking if recording stopped')
@@ -2351,57 +3215,62 @@ class AudioToTextRecorder:
 
                 if self.is_recording:
 
-                    # MODIFIED SLEEP LOGIC:
                     # Wait until realtime_processing_pause has elapsed,
-                    # but check often so we can respond to changes quickly.
-                    while (
-                        time.time() - last_transcription_time
-                    ) < self.realtime_processing_pause:
-                        time.sleep(0.001)
-                        if not self.is_running or not self.is_recording:
-                            break
+                    # waking up early if recording stops.
+                    self._wait_state(
+                        lambda: not self.is_running or not self.is_recording,
+                        timeout=self.realtime_cadence.pause - (time.time() - last_transcription_time),
+                        interruptible=False)
 
                     if self.awaiting_speech_end:
-                        time.sleep(0.001)
+                        self._wait_state(
+                            lambda: not self.awaiting_speech_end or not self.is_recording or not self.is_running,
+                            interruptible=False)
                         continue
 
                     # Update transcription time
                     last_transcription_time = time.time()
 
-                    # Convert the buffer frames to a NumPy array
-                    audio_array = np.frombuffer(
-                        b''.join(self.frames),
-                        dtype=np.int16
-                        )
+                    # Zero-copy float32 view of the recorded frames,
+                    # already normalized to a [-1, 1] range
+                    audio_array = self.frames.audio()
+
+                    # In streaming mode only the window after the
+                    # committed text is decoded
+                    window_start = 0
+                    options = {}
+                    if self.realtime_streaming:
+                        window_start = min(self.realtime_agreement.window_start, len(audio_array))
+                        audio_array = audio_array[window_start:]
+                        if len(audio_array) == 0:
+                            continue
+                        options["word_timestamps"] = True
+                        if self.realtime_agreement.prompt():
+                            options["initial_prompt"] = self.realtime_agreement.prompt()
 
                     logger.debug(f"Current realtime buffer size: {len(audio_array)}")
+                    decode_start = time.perf_counter()
+                    decode_seconds = len(audio_array) / SAMPLE_RATE
 
-                    # Normalize the array to a [-1, 1] range
-                    audio_array = audio_array.astype(np.float32) / \
-                        INT16_MAX_ABS_VALUE
-
-                    if self.use_main_model_for_realtime:
-                        with self.transcription_lock:
-                            try:
-                                self.parent_transcription_pipe.send((audio_array, self.language, True))
-                                if self.parent_transcription_pipe.poll(timeout=5):  # Wait for 5 seconds
-                                    logger.debug("Receive from realtime worker after transcription request to main model")
-                                    status, result = self.parent_transcription_pipe.recv()
-                                    if status == 'success':
-                                        segments, info = result
-                                        self.detected_realtime_language = info.language if info.language_probability > 0 else None
-                                        self.detected_realtime_language_probability = info.language_probability
-                                        realtime_text = segments
-                                        logger.debug(f"Realtime text detected with main model: {realtime_text}")
-                                    else:
-                                        logger.error(f"Realtime transcription error: {result}")
-                                        continue
-                                else:
-                                    logger.warning("Realtime transcription timed out")
-                                    continue
-                            except Exception as e:
-                                logger.error(f"Error in realtime transcription: {str(e)}", exc_info=True)
-                                continue
+                    if self.realtime_channel is not None:
+                        future = self.realtime_channel.submit(
+                            audio_array, self.language, True, kind="realtime", **options)
+                        try:
+                            segments, info = future.result(timeout=5)  # Wait for 5 seconds
+                            logger.debug("Receive from realtime worker after transcription request")
+                            self.detected_realtime_language = info.language if info.language_probability > 0 else None
+                            self.detected_realtime_language_probability = info.language_probability
+                            realtime_text = segments
+                            self._record_realtime_pass(decode_start, decode_seconds)
+                            logger.debug(f"Realtime text detected by transcription worker: {realtime_text}")
+                        except FutureTimeoutError:
+                            # Stale by the time it would arrive; drop it
+                            future.cancel()
+                            logger.warning("Realtime transcription timed out")
+                            continue
+                        except Exception as e:
+                            logger.error(f"Realtime transcription error: {str(e)}")
+                            continue
                     else:
                         # Perform transcription and assemble the text
                         if self.normalize_audio:
@@ -2411,33 +3280,58 @@ class AudioToTextRecorder:
                                 if peak > 0:
                                     audio_array = (audio_array / peak) * 0.95
 
+                        initial_prompt = options.get("initial_prompt", self.initial_prompt_realtime)
+                        word_timestamps = options.get("word_timestamps", False)
                         if self.realtime_batch_size > 0:
                             segments, info = self.realtime_model_type.transcribe(
                                 audio_array,
                                 language=self.language if self.language else None,
                                 beam_size=self.beam_size_realtime,
-                                initial_prompt=self.initial_prompt_realtime,
+                                initial_prompt=initial_prompt,
                                 suppress_tokens=self.suppress_tokens,
                                 batch_size=self.realtime_batch_size,
-                                vad_filter=self.faster_whisper_vad_filter
+                                vad_filter=self.faster_whisper_vad_filter,
+                                word_timestamps=word_timestamps
                             )
                         else:
                             segments, info = self.realtime_model_type.transcribe(
                                 audio_array,
                                 language=self.language if self.language else None,
                                 beam_size=self.beam_size_realtime,
-                                initial_prompt=self.initial_prompt_realtime,
+                                initial_prompt=initial_prompt,
                                 suppress_tokens=self.suppress_tokens,
-                                vad_filter=self.faster_whisper_vad_filter
+                                vad_filter=self.faster_whisper_vad_filter,
+                                word_timestamps=word_timestamps
                             )
 
                         self.detected_realtime_language = info.language if info.language_probability > 0 else None
                         self.detected_realtime_language_probability = info.language_probability
-                        realtime_text = " ".join(
-                            seg.text for seg in segments
-                        )
+                        if word_timestamps:
+                            segments = [(word.start, word.end, word.word, word.probability)
+                                        for seg in segments for word in (seg.words or [])]
+                            realtime_text = segments
+                        else:
+                            realtime_text = " ".join(
+                                seg.text for seg in segments
+                            )
+                        self._record_realtime_pass(decode_start, decode_seconds)
                         logger.debug(f"Realtime text detected: {realtime_text}")
 
+                    if self.realtime_streaming:
+                        # realtime_text holds the words of the window here
+                        committed = self.realtime_agreement.update(
+                            realtime_text,
+                            window_start / SAMPLE_RATE,
+                            len(audio_array) / SAMPLE_RATE)
+                        if committed:
+                            logger.debug(f"Realtime committed up to {self.realtime_agreement.committed_end:.2f}s: "
+                                         f"{self.realtime_agreement.committed_text}")
+                        realtime_text = self.realtime_agreement.text
+                        committed_delta = "".join(word.text for word in committed)
+                        realtime_delta = StabilizerUpdate(
+                            committed_delta, False, self.realtime_agreement.unstable_text, realtime_text,
+                            len(self.realtime_agreement.committed_text) - len(committed_delta))
+
                     # double check recording state
                     # because it could have changed mid-transcription
                     if self.is_recording and time.time() - \
@@ -2447,94 +3341,98 @@ class AudioToTextRecorder:
                         self.realtime_transcription_text = \
                             self.realtime_transcription_text.strip()
 
-                        self.text_storage.append(
-                            self.realtime_transcription_text
-                            )
-
-                        # Take the last two texts in storage, if they exist
-                        if len(self.text_storage) >= 2:
-                            last_two_texts = self.text_storage[-2:]
-
-                            # Find the longest common prefix
-                            # between the two texts
-                            prefix = os.path.commonprefix(
-                                [last_two_texts[0], last_two_texts[1]]
-                                )
-
-                            # This prefix is the text that was transcripted
-                            # two times in the same way
-                            # Store as "safely detected text"
-                            if len(prefix) >= \
-                                    len(self.realtime_stabilized_safetext):
-
-                                # Only store when longer than the previous
-                                # as additional security
-                                self.realtime_stabilized_safetext = prefix
-
-                        # Find parts of the stabilized text
-                        # in the freshly transcripted text
-                        matching_pos = self._find_tail_match_in_text(
-                            self.realtime_stabilized_safetext,
-                            self.realtime_transcription_text
-                            )
-
-                        if matching_pos < 0:
-                            # pick which text to send
+                        if self.realtime_streaming:
+                            # Committed text is final; the remaining words
+                            # are still open to revision
+                            self.realtime_stabilized_safetext = self.realtime_agreement.committed_text.strip()
                             text_to_send = (
                                 self.realtime_stabilized_safetext
                                 if self.realtime_stabilized_safetext
                                 else self.realtime_transcription_text
                             )
-                            # preprocess once
-                            processed = self._preprocess_output(text_to_send, True)
-                            # invoke on its own thread
-                            self._run_callback(self._on_realtime_transcription_stabilized, processed)
+                            self._on_realtime_transcription_stabilized(self._preprocess_output(text_to_send, True))
+                            self._on_realtime_transcription_update(self._preprocess_output(self.realtime_transcription_text, True))
+                            self._on_realtime_transcription_delta(realtime_delta)
+                            continue
 
-                        else:
-                            # We found parts of the stabilized text
-                            # in the transcripted text
-                            # We now take the stabilized text
-                            # and add only the freshly transcripted part to it
-                            output_text = self.realtime_stabilized_safetext + \
-                                self.realtime_transcription_text[matching_pos:]
-
-                            # This yields us the "left" text part as stabilized
-                            # AND at the same time delivers fresh detected
-                            # parts on the first run without the need for
-                            # two transcriptions
-                            self._run_callback(self._on_realtime_transcription_stabilized, self._preprocess_output(output_text, True))
+                        update = self.text_stabilizer.update(
+                            self.realtime_transcription_text)
+
+                        # Text transcribed the same way twice in a row,
+                        # stored as "safely detected text"
+                        self.realtime_stabilized_safetext = update.text[:self.text_stabilizer.stable_length]
+
+                        # The stabilized text plus freshly transcribed parts.
+                        # This delivers fresh detected parts on the first run
+                        # without the need for two transcriptions
+                        self._on_realtime_transcription_stabilized(self._preprocess_output(update.text, True))
+                        self._on_realtime_transcription_delta(update)
 
                         # Invoke the callback with the transcribed text
-                        self._run_callback(self._on_realtime_transcription_update, self._preprocess_output(self.realtime_transcription_text,True))
+                        self._on_realtime_transcription_update(self._preprocess_output(self.realtime_transcription_text,True))
 
-                # If not recording, sleep briefly before checking again
+                # If not recording, wait until recording starts
                 else:
-                    time.sleep(TIME_SLEEP)
+                    self.realtime_cadence.reset()
+                    self._wait_state(
+                        lambda: self.is_recording or not self.is_running,
+                        interruptible=False)
 
         except Exception as e:
             logger.error(f"Unhandled exeption in _realtime_worker: {e}", exc_info=True)
             raise
 
-    def _is_silero_speech(self, chunk):
+    def _record_realtime_pass(self, decode_start, window_seconds):
+        """Meter a finished realtime pass and let the cadence adapt to it."""
+        decode_seconds = time.perf_counter() - decode_start
+        self.component_meter.record(COMPONENT_REALTIME, decode_seconds, window_seconds)
+        pause = self.realtime_cadence.record(decode_seconds, window_seconds, decode_start)
+        if self.use_extended_logging:
+            logger.debug(f"Realtime pass decoded {window_seconds:.2f}s in {decode_seconds:.3f}s, "
+                         f"next pause {pause:.3f}s")
+
+    def _silero_infer_batch(self, chunks):
         """
-        Returns true if speech is detected in the provided audio data
+        Returns Silero speech probabilities for consecutive audio chunks.
+
+        The chunks are converted in one go and evaluated in stream order
+        under a single no_grad context. Silero carries recurrent state from
+        chunk to chunk, so they cannot be evaluated as independent rows of
+        one batch tensor.
 
         Args:
-            data (bytes): raw bytes of audio data (1024 raw bytes with
-            16000 sample rate and 16 bits per sample)
-        """
-        if self.sample_rate != 16000:
-            pcm_data = np.frombuffer(chunk, dtype=np.int16)
-            data_16000 = signal.resample_poly(
-                pcm_data, 16000, self.sample_rate)
-            chunk = data_16000.astype(np.int16).tobytes()
-
-        self.silero_working = True
-        audio_chunk = np.frombuffer(chunk, dtype=np.int16)
-        audio_chunk = audio_chunk.astype(np.float32) / INT16_MAX_ABS_VALUE
-        vad_prob = self.silero_vad_model(
-            torch.from_numpy(audio_chunk),
-            SAMPLE_RATE).item()
+            chunks (list of np.ndarray): int16 audio at 16000 Hz, as
+            produced by the VAD ingest stage
+        """
+        import torch
+
+        start = time.perf_counter()
+        lengths = [len(pcm_data) for pcm_data in chunks]
+        audio = np.concatenate(chunks).astype(np.float32) / INT16_MAX_ABS_VALUE
+        audio_tensor = torch.from_numpy(audio)
+
+        probabilities = []
+        offset = 0
+        with torch.no_grad():
+            for length in lengths:
+                vad_prob = self.silero_vad_model(
+                    audio_tensor[offset:offset + length],
+                    SAMPLE_RATE).item()
+                probabilities.append(vad_prob)
+                offset += length
+        self.component_meter.record(COMPONENT_VAD, time.perf_counter() - start, offset / SAMPLE_RATE)
+        return probabilities
+
+    def _on_silero_result(self, result):
+        """
+        Receives results from the Silero worker thread. Results for chunks
+        recorded before the last start() or stop() are ignored.
+        """
+        if result.seq < self.silero_result_floor:
+            return
+        self._update_silero_state(result.probability)
+
+    def _update_silero_state(self, vad_prob):
         is_silero_speech_active = vad_prob > (1 - self.silero_sensitivity)
         if is_silero_speech_active:
             if not self.is_silero_speech_active and self.use_extended_logging:
@@ -2542,84 +3440,72 @@ class AudioToTextRecorder:
         elif self.is_silero_speech_active and self.use_extended_logging:
             logger.info(f"{bcolors.WARNING}Silero VAD detected silence{bcolors.ENDC}")
         self.is_silero_speech_active = is_silero_speech_active
-        self.silero_working = False
         return is_silero_speech_active
 
+    def _is_silero_speech(self, chunk):
+        """
+        Returns true if speech is detected in the provided audio data.
+        Runs synchronously in the calling thread.
+
+        Args:
+            chunk (VADChunk): 16 kHz audio chunk from the VAD ingest stage
+        """
+        vad_prob = self.silero_worker.infer_now(chunk.pcm)
+        return self._update_silero_state(vad_prob)
+
     def _is_webrtc_speech(self, chunk, all_frames_must_be_true=False):
         """
         Returns true if speech is detected in the provided audio data
 
         Args:
-            data (bytes): raw bytes of audio data (1024 raw bytes with
-            16000 sample rate and 16 bits per sample)
-        """
-        speech_str = f"{bcolors.OKGREEN}WebRTC VAD detected speech{bcolors.ENDC}"
-        silence_str = f"{bcolors.WARNING}WebRTC VAD detected silence{bcolors.ENDC}"
-        if self.sample_rate != 16000:
-            pcm_data = np.frombuffer(chunk, dtype=np.int16)
-            data_16000 = signal.resample_poly(
-                pcm_data, 16000, self.sample_rate)
-            chunk = data_16000.astype(np.int16).tobytes()
-
-        # Number of audio frames per millisecond
-        frame_length = int(16000 * 0.01)  # for 10ms frame
-        num_frames = int(len(chunk) / (2 * frame_length))
-        speech_frames = 0
-
-        for i in range(num_frames):
-            start_byte = i * frame_length * 2
-            end_byte = start_byte + frame_length * 2
-            frame = chunk[start_byte:end_byte]
-            if self.webrtc_vad_model.is_speech(frame, 16000):
-                speech_frames += 1
-                if not all_frames_must_be_true:
-                    if self.debug_mode:
-                        logger.info(f"Speech detected in frame {i + 1}"
-                              f" of {num_frames}")
-                    if not self.is_webrtc_speech_active and self.use_extended_logging:
-                        logger.info(speech_str)
-                    self.is_webrtc_speech_active = True
-                    return True
+            chunk (VADChunk): 16 kHz audio chunk from the VAD ingest stage
+            all_frames_must_be_true (bool): Require speech in every 10 ms
+              frame instead of in any frame
+        """
+        decisions = webrtc_frame_decisions(
+            self.webrtc_vad_model, chunk,
+            stop_at_first=not all_frames_must_be_true)
+        num_frames = chunk.num_frames
+
         if all_frames_must_be_true:
-            if self.debug_mode and speech_frames == num_frames:
-                logger.info(f"Speech detected in {speech_frames} of "
-                      f"{num_frames} frames")
-            elif self.debug_mode:
-                logger.info(f"Speech not detected in all {num_frames} frames")
-            speech_detected = speech_frames == num_frames
-            if speech_detected and not self.is_webrtc_speech_active and self.use_extended_logging:
-                logger.info(speech_str)
-            elif not speech_detected and self.is_webrtc_speech_active and self.use_extended_logging:
-                logger.info(silence_str)
-            self.is_webrtc_speech_active = speech_detected
-            return speech_detected
+            speech_detected = num_frames > 0 and all(decisions)
         else:
-            if self.debug_mode:
+            # Decisions stop at the first speech frame
+            speech_detected = bool(decisions) and decisions[-1]
+
+        if self.debug_mode:
+            speech_frames = sum(decisions)
+            if all_frames_must_be_true:
+                logger.info(f"Speech detected in {speech_frames} of "
+                            f"{num_frames} frames")
+            elif speech_detected:
+                logger.info(f"Speech detected in frame {len(decisions)}"
+                            f" of {num_frames}")
+            else:
                 logger.info(f"Speech not detected in any of {num_frames} frames")
-            if self.is_webrtc_speech_active and self.use_extended_logging:
-                logger.info(silence_str)
-            self.is_webrtc_speech_active = False
-            return False
 
-    def _check_voice_activity(self, data):
+        if self.use_extended_logging:
+            if speech_detected and not self.is_webrtc_speech_active:
+                logger.info(f"{bcolors.OKGREEN}WebRTC VAD detected speech{bcolors.ENDC}")
+            elif not speech_detected and self.is_webrtc_speech_active:
+                logger.info(f"{bcolors.WARNING}WebRTC VAD detected silence{bcolors.ENDC}")
+        self.is_webrtc_speech_active = speech_detected
+        return speech_detected
+
+    def _check_voice_activity(self, chunk):
         """
         Initiate check if voice is active based on the provided data.
 
         Args:
-            data: The audio data to be checked for voice activity.
+            chunk (VADChunk): 16 kHz audio chunk to be checked for voice
+              activity, tagged with its sequence number.
         """
-        self._is_webrtc_speech(data)
+        self._is_webrtc_speech(chunk)
 
         # First quick performing check for voice activity using WebRTC
         if self.is_webrtc_speech_active:
-
-            if not self.silero_working:
-                self.silero_working = True
-
-                # Run the intensive check in a separate thread
-                threading.Thread(
-                    target=self._is_silero_speech,
-                    args=(data,)).start()
+            # Hand the intensive check to the persistent Silero worker
+            self.silero_worker.submit(chunk.seq, chunk.pcm)
 
     def clear_audio_queue(self):
         """
@@ -2627,13 +3513,7 @@ class AudioToTextRecorder:
         fragments get processed e.g. after waking up the recorder.
         """
         self.audio_buffer.clear()
-        try:
-            while True:
-                self.audio_queue.get_nowait()
-        except:
-            # PyTorch's mp.Queue doesn't have a specific Empty exception
-            # so we catch any exception that might occur when the queue is empty
-            pass
+        self.audio_queue.clear()
 
     def _is_voice_active(self):
         """
@@ -2711,6 +3591,7 @@ class AudioToTextRecorder:
         if self.spinner:
             # If the Halo spinner doesn't exist, create and start it
             if self.halo is None:
+                import halo
                 self.halo = halo.Halo(text=text)
                 self.halo.start()
             # If the Halo spinner already exists, just update the text
@@ -2744,51 +3625,6 @@ class AudioToTextRecorder:
 
         return text
 
-    def _find_tail_match_in_text(self, text1, text2, length_of_match=10):
-        """
-        Find the position where the last 'n' characters of text1
-        match with a substring in text2.
-
-        This method takes two texts, extracts the last 'n' characters from
-        text1 (where 'n' is determined by the variable 'length_of_match'), and
-        searches for an occurrence of this substring in text2, starting from
-        the end of text2 and moving towards the beginning.
-
-        Parameters:
-        - text1 (str): The text containing the substring that we want to find
-          in text2.
-        - text2 (str): The text in which we want to find the matching
-          substring.
-        - length_of_match(int): The length of the matching string that we are
-          looking for
-
-        Returns:
-        int: The position (0-based index) in text2 where the matching
-          substring starts. If no match is found or either of the texts is
-          too short, returns -1.
-        """
-
-        # Check if either of the texts is too short
-        if len(text1) < length_of_match or len(text2) < length_of_match:
-            return -1
-
-        # The end portion of the first text that we want to compare
-        target_substring = text1[-length_of_match:]
-
-        # Loop through text2 from right to left
-        for i in range(len(text2) - length_of_match + 1):
-            # Extract the substring from text2
-            # to compare with the target_substring
-            current_substring = text2[len(text2) - i - length_of_match:
-                                      len(text2) - i]
-
-            # Compare the current_substring with the target_substring
-            if current_substring == target_substring:
-                # Position in text2 where the match starts
-                return len(text2) - i
-
-        return -1
-
     def _on_realtime_transcription_stabilized(self, text):
         """
         Callback method invoked when the real-time transcription stabilizes.
@@ -2804,10 +3640,24 @@ class AudioToTextRecorder:
         Args:
             text (str): The stabilized transcription text.
         """
-        if self.on_realtime_transcription_stabilized:
-            if self.is_recording:
+        if self.is_recording:
+            if self.transcript_hub.has_partial_subscribers:
+                self.transcript_hub.publish(EVENT_STABILIZED, text)
+            if self.on_realtime_transcription_stabilized:
                 self._run_callback(self.on_realtime_transcription_stabilized, text)
 
+    def _on_realtime_transcription_delta(self, update):
+        """
+        Notifies the delta listener about the stable and unstable spans of
+        the latest real-time transcription, if recording is still ongoing.
+
+        Args:
+            update (StabilizerUpdate): The changes since the last update.
+        """
+        if self.on_realtime_transcription_delta:
+            if self.is_recording:
+                self._run_callback(self.on_realtime_transcription_delta, update)
+
     def _on_realtime_transcription_update(self, text):
         """
         Callback method invoked when there's an update in the real-time
@@ -2822,8 +3672,10 @@ class AudioToTextRecorder:
         Args:
             text (str): The updated transcription text.
         """
-        if self.on_realtime_transcription_update:
-            if self.is_recording:
+        if self.is_recording:
+            if self.transcript_hub.has_partial_subscribers:
+                self.transcript_hub.publish(EVENT_REALTIME, text)
+            if self.on_realtime_transcription_update:
                 self._run_callback(self.on_realtime_transcription_update, text)
 
     def __enter__(self):
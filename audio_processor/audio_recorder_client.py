@@ -30,6 +30,15 @@ class AudioToTextRecorderClient:
         """Retrieve transcribed text."""
         return self.recorder.text(timeout=timeout)
 
+    async def text_async(self):
+        """Await the next transcribed text without blocking the event loop."""
+        return await self.recorder.text_async()
+
+    async def stream(self, partials: bool = True):
+        """Asynchronously iterate over realtime and final transcripts."""
+        async for event in self.recorder.stream(partials=partials):
+            yield event
+
     def shutdown(self):
         """Stop the recorder and clean up resources."""
         self.recorder.shutdown()
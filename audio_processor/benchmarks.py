@@ -0,0 +1,803 @@
+# Micro-benchmarks for the audio processing pipeline
+# Usage: python benchmarks.py <name> [--seconds N]
+import argparse
+import time
+import os
+import numpy as np
+
+DEVICE_CHUNK_SIZE = 1024
+TARGET_RATE = 16000
+BEST_OF = 5
+
+
+def _synthetic_pcm(sample_rate, seconds, seed=0):
+    """Speech-like test signal: a few tones plus noise, as int16."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    tones = sum(np.sin(2 * np.pi * f * t) for f in (180, 440, 1200, 3100))
+    pcm = 4000 * tones + 800 * rng.standard_normal(len(t))
+    return np.clip(pcm, -32768, 32767).astype(np.int16)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _report(name, chunks, elapsed, audio_seconds):
+    print(f"  {name:<28} {chunks / elapsed:>10.0f} chunks/s  "
+          f"{audio_seconds / elapsed:>8.1f}x realtime")
+
+
+def bench_resampler(seconds):
+    """Per-chunk butter/filtfilt/resample_poly vs the streaming resampler."""
+    from scipy.signal import butter, filtfilt, resample_poly, resample
+    from resampler import StreamingResampler
+
+    def legacy_audio_input(chunk, rate):
+        b, a = butter(5, (TARGET_RATE / 2) / (rate / 2.0), btype='low', analog=False)
+        filtered = filtfilt(b, a, chunk)
+        return resample_poly(filtered, TARGET_RATE, rate)
+
+    def legacy_data_worker(chunk, rate):
+        num_samples = int(len(chunk) * TARGET_RATE / rate)
+        return resample(chunk, num_samples).astype(np.int16)
+
+    for rate in (44100, 48000):
+        pcm = _synthetic_pcm(rate, seconds)
+        chunks = [pcm[i:i + DEVICE_CHUNK_SIZE] for i in range(0, len(pcm), DEVICE_CHUNK_SIZE)]
+        print(f"{rate} Hz -> {TARGET_RATE} Hz, {len(chunks)} chunks of {DEVICE_CHUNK_SIZE} samples")
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            legacy_audio_input(chunk, rate)
+        _report("AudioInput (filtfilt+poly)", len(chunks), time.perf_counter() - start, seconds)
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            legacy_data_worker(chunk, rate)
+        _report("data worker (FFT resample)", len(chunks), time.perf_counter() - start, seconds)
+
+        resampler = StreamingResampler(rate, TARGET_RATE)
+        out = np.empty(resampler.output_length(DEVICE_CHUNK_SIZE) + 1, dtype=np.int16)
+        start = time.perf_counter()
+        for chunk in chunks:
+            resampler.process(chunk, out=out)
+        _report("StreamingResampler", len(chunks), time.perf_counter() - start, seconds)
+
+
+def bench_webrtc_vad(seconds):
+    """Per-call resampling + frame slicing vs the single-pass VAD ingest."""
+    from scipy.signal import resample_poly
+    import webrtcvad
+    from vad_ingest import VADIngest, webrtc_frame_decisions
+
+    vad_model = webrtcvad.Vad(3)
+    chunk_size = 512
+
+    def legacy_webrtc(chunk, sample_rate):
+        if sample_rate != TARGET_RATE:
+            pcm_data = np.frombuffer(chunk, dtype=np.int16)
+            chunk = resample_poly(pcm_data, TARGET_RATE, sample_rate).astype(np.int16).tobytes()
+        frame_length = int(TARGET_RATE * 0.01)
+        num_frames = int(len(chunk) / (2 * frame_length))
+        speech_frames = 0
+        for i in range(num_frames):
+            start_byte = i * frame_length * 2
+            frame = chunk[start_byte:start_byte + frame_length * 2]
+            if vad_model.is_speech(frame, TARGET_RATE):
+                speech_frames += 1
+        return speech_frames == num_frames
+
+    def legacy_silero_input(chunk, sample_rate):
+        pcm_data = np.frombuffer(chunk, dtype=np.int16)
+        if sample_rate != TARGET_RATE:
+            pcm_data = resample_poly(pcm_data, TARGET_RATE, sample_rate).astype(np.int16)
+        return pcm_data.astype(np.float32) / 32768.0
+
+    for rate in (TARGET_RATE, 48000):
+        pcm = _synthetic_pcm(rate, seconds)
+        rate_chunk = chunk_size * rate // TARGET_RATE
+        chunks = [pcm[i:i + rate_chunk] for i in range(0, len(pcm) - rate_chunk + 1, rate_chunk)]
+        byte_chunks = [chunk.tobytes() for chunk in chunks]
+        print(f"{rate} Hz recorder rate, {len(chunks)} chunks (single core)")
+
+        def legacy_pass():
+            for chunk in byte_chunks:
+                legacy_webrtc(chunk, rate)
+                legacy_silero_input(chunk, rate)
+
+        def ingest_pass():
+            # The recorder hands the ingest the bytes it keeps for its buffers
+            ingest = VADIngest(rate)
+            for seq, chunk in enumerate(byte_chunks):
+                vad_chunk = ingest.process(seq, chunk)
+                all(webrtc_frame_decisions(vad_model, vad_chunk))
+                vad_chunk.pcm.astype(np.float32) / 32768.0
+
+        # Best of several passes, single passes are too short to be stable
+        for name, run in (("legacy per-call convert", legacy_pass), ("single-pass ingest", ingest_pass)):
+            elapsed = min(_timed(run) for _ in range(BEST_OF))
+            _report(name, len(chunks), elapsed, seconds)
+
+
+def _handoff_echo(conn):
+    """Child process: receive utterances and answer with their peak."""
+    from audio_pool import SharedAudioReader, AudioDescriptor
+    reader = SharedAudioReader()
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        audio = reader.view(message) if isinstance(message, AudioDescriptor) else message
+        conn.send(float(np.max(np.abs(audio))))
+    reader.close()
+
+
+def bench_audio_handoff(seconds):
+    """Pickled float32 arrays vs shared-memory descriptors over a process pipe."""
+    import multiprocessing as mp
+    from audio_pool import SharedAudioPool
+
+    repeats = 20
+    ctx = mp.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe()
+    child = ctx.Process(target=_handoff_echo, args=(child_conn,), daemon=True)
+    child.start()
+    pool = SharedAudioPool()
+
+    def round_trip(make_message, audio, release=None):
+        # One warm-up round so segment allocation is not timed
+        parent_conn.send(make_message(audio))
+        parent_conn.recv()
+        if release:
+            release()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            parent_conn.send(make_message(audio))
+            parent_conn.recv()
+            if release:
+                release()
+        return (time.perf_counter() - start) / repeats
+
+    leased = []
+
+    def pooled(audio):
+        descriptor = pool.put(audio)
+        leased.append(descriptor)
+        return descriptor
+
+    def release_all():
+        while leased:
+            pool.release(leased.pop())
+
+    try:
+        for utterance_seconds in (5, 30, 120):
+            audio = _synthetic_pcm(TARGET_RATE, utterance_seconds).astype(np.float32) / 32768.0
+            megabytes = audio.nbytes / 1e6
+            print(f"{utterance_seconds:>3} s utterance ({megabytes:.1f} MB float32), {repeats} round trips")
+            for name, make_message, release in (
+                ("pickled array", lambda a: a, None),
+                ("shared memory pool", pooled, release_all),
+            ):
+                elapsed = round_trip(make_message, audio, release)
+                print(f"  {name:<28} {elapsed * 1000:>8.2f} ms/request  "
+                      f"{megabytes / elapsed:>8.0f} MB/s")
+    finally:
+        parent_conn.send(None)
+        child.join(timeout=5)
+        pool.close()
+
+
+def _realtime_session(seconds, pause=0.1, utterance_seconds=12.0, seed=0):
+    """
+    Successive realtime transcriptions of a session: text grows with speech
+    within each utterance while the last words keep changing.
+    Yields (utterance_index, text).
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog",
+                  "seven", "hundred", "speech", "model", "realtime", "stable", "text"]
+    passes_per_utterance = int(utterance_seconds / pause)
+    for utterance in range(int(seconds / utterance_seconds)):
+        words = []
+        for step in range(passes_per_utterance):
+            # about 2.5 words per second of speech
+            while len(words) < 2.5 * (step + 1) * pause:
+                words.append(vocabulary[rng.integers(len(vocabulary))])
+            tail = [vocabulary[rng.integers(len(vocabulary))] for _ in range(2)]
+            yield utterance, " ".join(words[:-2] + tail) if len(words) > 2 else " ".join(words)
+
+
+def bench_stabilizer(seconds):
+    """
+    One continuous hour-long utterance: TextStabilizer cost per update and
+    the memory it retains must stay flat as the transcription grows, and
+    its deltas must rebuild the stable span.
+    """
+    import tracemalloc
+    import copy
+    from text_stabilizer import TextStabilizer
+
+    session_seconds = 3600
+    window = 3000
+    sample_updates = 200
+    rounds = 4 * BEST_OF
+    max_rise = 0.1
+
+    def session():
+        return _realtime_session(session_seconds, utterance_seconds=session_seconds)
+
+    # At the start of every window the stabilizer and its next updates are
+    # kept; they are replayed afterwards, interleaved across windows so the
+    # host's drift affects all windows alike, without tracing
+    stabilizer = TextStabilizer()
+    samples = []
+    revising = []
+    for count, (_, text) in enumerate(session()):
+        if count % window == 0:
+            samples.append((copy.copy(stabilizer), []))
+            revising.append(0)
+        sampled = len(samples[-1][1]) < sample_updates
+        if sampled:
+            samples[-1][1].append(text)
+        # Updates revising the stable span return a new text
+        revised = stabilizer.update(text).text is not text
+        revising[-1] += sampled and revised
+
+    def replay(state, texts):
+        replica = copy.copy(state)
+        for text in texts:
+            replica.update(text)
+
+    def copy_texts(texts):
+        # What an update revising the stable span must do: build the whole
+        # text anew, a slice and a join
+        for text in texts:
+            "".join((text[:len(text) // 2], "", text[len(text) // 2:]))
+
+    costs = [float("inf")] * len(samples)
+    copy_costs = [float("inf")] * len(samples)
+    for _ in range(rounds):
+        for index, (state, texts) in enumerate(samples):
+            costs[index] = min(costs[index], _timed(lambda: replay(state, texts)) / len(texts))
+            copy_costs[index] = min(copy_costs[index], _timed(lambda: copy_texts(texts)) / len(texts))
+    lengths = [len(texts[-1]) for _, texts in samples]
+    samples = None
+
+    # Retained memory and delta consistency in a traced pass
+    stabilizer = TextStabilizer()
+    retained = tracemalloc.Filter(True, "*text_stabilizer.py")
+    rebuilt = []
+    consistent = True
+    memories = []
+    tracemalloc.start()
+    for count, (_, text) in enumerate(session(), 1):
+        update = stabilizer.update(text)
+        del rebuilt[update.stable_start:]
+        rebuilt.extend(update.stable_delta)
+        tail = stabilizer.stable_tail
+        consistent = consistent and len(rebuilt) == stabilizer.stable_length \
+            and "".join(rebuilt[len(rebuilt) - len(tail):]) == tail
+        if count % window == 0:
+            # Only what the stabilizer keeps, not the update the caller holds
+            update = None
+            snapshot = tracemalloc.take_snapshot().filter_traces([retained])
+            memories.append(sum(stat.size for stat in snapshot.statistics("filename")))
+    tracemalloc.stop()
+
+    print(f"{session_seconds} s utterance, {count} updates, {len(text) / 1024:.0f} KiB final transcription")
+    for index, (cost, memory, length) in enumerate(zip(costs, memories, lengths)):
+        print(f"  updates {index * window:>6}-{(index + 1) * window:<6} {length:>7d} chars "
+              f"{cost * 1e6:>7.1f} us/update  {memory / 1024:>6.1f} KiB retained")
+
+    # The only work growing with the text is the copy building `text` when
+    # an update revises the stable span. Without it, the cost must stay
+    # flat: least-squares line through all windows.
+    own_costs = [cost - revisions / sample_updates * copied
+                 for cost, revisions, copied in zip(costs, revising, copy_costs)]
+    slope, intercept = np.polyfit(lengths, own_costs, 1)
+    rise = slope * (lengths[-1] - lengths[0]) / (slope * lengths[0] + intercept)
+    print(f"  {sum(revising) / (len(revising) * sample_updates):.0%} of updates revise the stable span "
+          f"and copy the text, {own_costs[0] * 1e6:.1f} us -> {own_costs[-1] * 1e6:.1f} us/update without it")
+    print(f"  fitted cost rise over the session {rise:>+6.1%} (limit {max_rise:.0%})")
+    checks = (
+        ("per-update cost flat apart from the text copy", rise < max_rise),
+        ("retained memory stays flat", memories[-1] < memories[0] + 1024),
+        ("deltas rebuild the stable span", consistent),
+    )
+    ok = True
+    for name, passed in checks:
+        print(f"  {'PASS' if passed else 'FAIL'}: {name}")
+        ok = ok and passed
+    return ok
+
+
+def _simulate_final_queue(policy, arrivals, service_times):
+    """
+    Virtual-time transcription worker answering one request per batch.
+    Returns the latency of every request and the level index of each batch.
+    """
+    clock = 0.0
+    pending = []
+    arrivals = list(arrivals)
+    latencies = []
+    levels = []
+    while arrivals or pending:
+        while arrivals and arrivals[0] <= clock:
+            pending.append(arrivals.pop(0))
+        if not pending:
+            clock = arrivals[0]
+            continue
+        received = pending.pop(0)
+        index = 0
+        if policy is not None:
+            policy.choose(len(pending), clock - received, clock)
+            index = policy.index
+        clock += service_times[index]
+        latencies.append(clock - received)
+        levels.append(index)
+        if policy is not None:
+            policy.record([clock - received], service_times[index])
+    return latencies, levels
+
+
+def bench_quality_policy(seconds):
+    """
+    Latency-driven quality policy on a simulated worker: a burst of finals
+    arrives faster than beam 5 can serve them, then traffic calms down.
+    """
+    from quality_policy import QualityPolicy, quality_levels
+
+    target = 1.5
+    levels = quality_levels(5, fallback=True)
+    # Decode seconds per request: beam 5, 2, 1, then the fallback model
+    service_times = [0.8, 0.5, 0.35, 0.15]
+    burst = [i * 0.3 for i in range(40)]
+    calm = [burst[-1] + 5 + i * 2.0 for i in range(10)]
+    arrivals = burst + calm
+
+    fixed, _ = _simulate_final_queue(None, arrivals, service_times)
+    policy = QualityPolicy(5, target, fallback=True)
+    adaptive, used = _simulate_final_queue(policy, arrivals, service_times)
+
+    def p95(values):
+        return sorted(values)[int(len(values) * 0.95) - 1]
+
+    print(f"{len(burst)} finals at {1 / 0.3:.1f}/s, then {len(calm)} at 0.5/s, target {target} s")
+    print(f"  {'fixed beam 5':<24} p95 latency {p95(fixed):>6.2f} s  max {max(fixed):>6.2f} s")
+    print(f"  {'quality policy':<24} p95 latency {p95(adaptive):>6.2f} s  max {max(adaptive):>6.2f} s")
+    for decision in policy.decisions:
+        print(f"  {decision.time:>6.2f}s beam {decision.previous.beam_size}"
+              f"{'+fallback' if decision.previous.fallback else ''} -> beam {decision.level.beam_size}"
+              f"{'+fallback' if decision.level.fallback else ''}: {decision.reason}")
+    checks = (
+        ("burst latency bounded by degrading", p95(adaptive) < p95(fixed) / 2),
+        ("fallback model used under load", max(used) == len(levels) - 1),
+        ("full quality restored after the burst", used[-1] == 0),
+        ("every decision has a reason", all(decision.reason for decision in policy.decisions)),
+    )
+    ok = True
+    for name, passed in checks:
+        print(f"  {'PASS' if passed else 'FAIL'}: {name}")
+        ok = ok and passed
+    return ok
+
+
+def bench_callback_dispatcher(seconds):
+    """
+    Callbacks created per call, as `lambda: on_text(text)` would be: lanes
+    must not pile up, while counters and per-callback order are kept.
+    """
+    from callback_dispatcher import CallbackDispatcher
+
+    calls = int(seconds * 1000)
+    dispatcher = CallbackDispatcher(max_workers=4)
+    seen = []
+    largest = 0
+    start = time.perf_counter()
+    for i in range(calls):
+        dispatcher.submit(lambda i=i: seen.append(i))
+        if i % 100 == 0:
+            largest = max(largest, len(dispatcher._lanes))
+    while len(seen) < calls and time.perf_counter() - start < 30:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    # The last lane is retired right after its callback returned
+    time.sleep(0.05)
+    stats = dispatcher.stats()
+    dispatcher.shutdown()
+
+    counted = sum(lane["completed"] for lane in stats.values())
+    print(f"{calls} per-call lambdas in {elapsed * 1000:.1f} ms")
+    print(f"  live lanes                 {largest:>6d} most  {len(dispatcher._lanes):>6d} at the end")
+    print(f"  names in stats             {len(stats):>6d}")
+    checks = (
+        ("every callback ran", sorted(seen) == list(range(calls))),
+        ("drained lanes removed", not dispatcher._lanes),
+        ("counters kept after removal", counted == calls and len(stats) == 1),
+    )
+    ok = True
+    for name, passed in checks:
+        print(f"  {'PASS' if passed else 'FAIL'}: {name}")
+        ok = ok and passed
+    return ok
+
+
+def bench_realtime_cadence(seconds):
+    """
+    Adaptive realtime cadence against a simulated model that turns slow in
+    the middle of a session, with a streaming-size decode window: fast
+    phases hold the latency target, the slow phase the CPU share.
+    """
+    from cadence import CadenceController
+
+    window = 3.0
+    controller = CadenceController(0.1, target_latency=0.5, cpu_share=0.5)
+    clock = 0.0
+    phases = []
+    for name, rtf in (("fast", 0.02), ("slow", 0.3), ("fast again", 0.02)):
+        start_decode, start_wall = controller.decode_seconds, clock
+        passes = 0
+        # Virtual time, so long phases cost nothing and the transition
+        # between phases does not dominate
+        while clock - start_wall < max(seconds, 60) / 3:
+            decode = rtf * window
+            pause = controller.record(decode, window, clock)
+            clock += decode + pause
+            passes += 1
+        share = (controller.decode_seconds - start_decode) / (clock - start_wall)
+        phases.append((name, rtf, passes, pause, share, pause + decode))
+
+    print(f"{window:.0f} s window, target latency 0.5 s, CPU share 0.5")
+    for name, rtf, passes, pause, share, latency in phases:
+        print(f"  {name:<12} rtf {rtf:<5} {passes:>4d} passes  pause {pause:.3f} s  "
+              f"CPU share {share:.2f}  latency {latency:.3f} s")
+    fast, slow, recovered = phases
+    checks = (
+        ("fast model paced to the latency target", abs(fast[5] - 0.5) < 0.05),
+        ("slow model held to the CPU share", slow[4] <= 0.55),
+        ("cadence recovers when the model is fast again", abs(recovered[5] - 0.5) < 0.05),
+    )
+    ok = True
+    for name, passed in checks:
+        print(f"  {'PASS' if passed else 'FAIL'}: {name}")
+        ok = ok and passed
+    return ok
+
+
+def bench_transcription_server(seconds):
+    """
+    Shared transcription server with the stand-in backend: a bulk session
+    floods it while interactive sessions keep getting served, the bulk
+    session's queue stays bounded, and every request is answered.
+    """
+    import socket
+    import tempfile
+    import threading
+    from transcription_server import TranscriptionServer, StandInBackend
+    from transcription_protocol import RemoteTranscriptionChannel
+
+    if hasattr(socket, "AF_UNIX"):
+        address = "unix:" + os.path.join(tempfile.mkdtemp(), "transcription.sock")
+    else:
+        address = "tcp:127.0.0.1:43107"
+    session_max_pending = 4
+    server = TranscriptionServer(address, StandInBackend(realtime_factor=0.02, max_batch=4),
+                                 max_in_flight=4, session_max_pending=session_max_pending).start()
+    audio = np.zeros(2 * TARGET_RATE, dtype=np.float32)
+    bulk_requests = 48
+    interactive_sessions = 3
+    interactive_requests = 8
+    latencies = []
+    max_backlog = 0
+    ok = True
+
+    def bulk():
+        channel = RemoteTranscriptionChannel(address)
+        start = time.perf_counter()
+        futures = [channel.submit(audio, "en", False) for _ in range(bulk_requests)]
+        results = [future.result(timeout=60)[0] for future in futures]
+        bulk.elapsed = time.perf_counter() - start
+        bulk.correct = all(text == "final 2.00 seconds" for text in results)
+        channel.close()
+
+    def interactive():
+        channel = RemoteTranscriptionChannel(address)
+        for _ in range(interactive_requests):
+            start = time.perf_counter()
+            channel.submit(audio, "en", False, kind="realtime").result(timeout=60)
+            latencies.append(time.perf_counter() - start)
+        cancelled = channel.submit(audio, "en", False)
+        cancelled.cancel()
+        channel.close()
+
+    try:
+        threads = [threading.Thread(target=bulk)]
+        threads += [threading.Thread(target=interactive) for _ in range(interactive_sessions)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for stats in server.stats()["sessions"].values():
+                max_backlog = max(max_backlog, stats["queued"] + stats["running"])
+            time.sleep(0.005)
+        for thread in threads:
+            thread.join()
+
+        # A full session cancels everything: the cancels behind its parked
+        # requests must be read before those are decoded. Slots plus all
+        # but one parking place, so the socket is still being read.
+        long_audio = np.zeros(20 * TARGET_RATE, dtype=np.float32)
+        channel = RemoteTranscriptionChannel(address)
+        futures = [channel.submit(long_audio, "en", False) for _ in range(2 * session_max_pending - 1)]
+        time.sleep(0.05)
+        start = time.perf_counter()
+        for future in futures:
+            future.cancel()
+        while channel.in_flight and time.perf_counter() - start < 10:
+            time.sleep(0.005)
+        cancel_elapsed = time.perf_counter() - start
+        channel.close()
+    finally:
+        server.stop()
+
+    latencies.sort()
+    batch_time = 0.02 * 2
+    print(f"{bulk_requests} bulk requests and {interactive_sessions} x {interactive_requests} "
+          f"interactive requests, {batch_time * 1000:.0f} ms per batch")
+    print(f"  bulk session finished in {bulk.elapsed * 1000:>8.1f} ms")
+    print(f"  interactive latency     {latencies[len(latencies) // 2] * 1000:>8.1f} ms median  "
+          f"{latencies[-1] * 1000:.1f} ms max")
+    print(f"  largest session backlog {max_backlog:>8d} (limit {session_max_pending})")
+    print(f"  full session cancelled in {cancel_elapsed * 1000:>6.1f} ms (one batch {20 * 0.02 * 1000:.0f} ms)")
+    checks = (
+        ("bulk results complete and correct", bulk.correct),
+        ("interactive sessions not starved", latencies[-1] < bulk.elapsed / 4),
+        ("session backlog bounded", max_backlog <= session_max_pending),
+        ("cancels read while the session is full", cancel_elapsed < 1.5 * 20 * 0.02),
+    )
+    for name, passed in checks:
+        print(f"  {'PASS' if passed else 'FAIL'}: {name}")
+        ok = ok and passed
+    return ok
+
+
+def bench_energy_gate(seconds):
+    """
+    Energy gate on silence, then long quiet speech below the ceiling, then
+    silence. Speech is reported the way the recorder does once its VAD has
+    triggered, until a second of silence after it.
+    """
+    from energy_gate import EnergyGate
+
+    chunk = 512
+    rng = np.random.default_rng(0)
+    silence = (33 * rng.standard_normal(10 * TARGET_RATE)).astype(np.int16)
+    # About -45 dBFS: quieter than the gate's ceiling
+    speech = (_synthetic_pcm(TARGET_RATE, max(seconds, 30.0), seed=1) * 0.03).astype(np.int16)
+    parts = [(silence, False), (speech, True), (silence, False)]
+    print(f"10 s silence, {len(speech) / TARGET_RATE:.0f} s quiet speech, 10 s silence, "
+          f"{chunk}-sample chunks")
+
+    onset_chunks = 5
+    hangover_chunks = TARGET_RATE // chunk
+    ok = True
+    for name, report_speech in (("floor always tracked", False), ("floor held in speech", True)):
+        gate = EnergyGate()
+        gated = {False: 0, True: 0}
+        total = {False: 0, True: 0}
+        active = 0
+        hangover = 0
+        for pcm, is_speech in parts:
+            for start in range(0, len(pcm) - chunk + 1, chunk):
+                active = active + 1 if is_speech else 0
+                hangover = hangover_chunks if active > onset_chunks else max(hangover - 1, 0)
+                flagged = gate.is_silence(pcm[start:start + chunk],
+                                          speech=report_speech and hangover > 0)
+                gated[is_speech] += flagged
+                total[is_speech] += 1
+        silence_ratio = gated[False] / total[False]
+        print(f"  {name:<24} silence gated {silence_ratio:>6.1%}  "
+              f"speech chunks gated {gated[True]:>5d} of {total[True]}")
+    checks = (
+        ("silence gated", silence_ratio > 0.8),
+        ("speech never gated", gated[True] == 0),
+    )
+    for name, passed in checks:
+        print(f"  {'PASS' if passed else 'FAIL'}: {name}")
+        ok = ok and passed
+    return ok
+
+
+def bench_vad_segmentation(seconds):
+    """Offline WebRTC segmentation speed of a recording with pauses."""
+    from vad_segmenter import segment_speech
+
+    rng = np.random.default_rng(0)
+    parts = []
+    while sum(len(part) for part in parts) < seconds * TARGET_RATE:
+        parts.append(_synthetic_pcm(TARGET_RATE, rng.uniform(1, 8), seed=len(parts)))
+        parts.append((50 * rng.standard_normal(int(TARGET_RATE * rng.uniform(0.3, 2)))).astype(np.int16))
+    pcm = np.concatenate(parts)
+    audio_seconds = len(pcm) / TARGET_RATE
+    start = time.perf_counter()
+    segments = segment_speech(pcm)
+    elapsed = time.perf_counter() - start
+    print(f"{audio_seconds:.0f} s recording, {len(segments)} segments")
+    print(f"  {'segment_speech':<28} {elapsed * 1000:>10.1f} ms  "
+          f"{audio_seconds / elapsed:>8.0f}x realtime")
+
+    # The same recording as the stereo files bulk_transcribe reads
+    from bulk_transcribe import to_pcm16k
+    stereo = np.stack([pcm, pcm], axis=1)
+    variants = {
+        "stereo int16": stereo,
+        "stereo int32": stereo.astype(np.int32) << 16,
+        "stereo float32": stereo.astype(np.float32) / 32768.0,
+    }
+    ok = True
+    for name, samples in variants.items():
+        converted = to_pcm16k(samples, TARGET_RATE)
+        error = np.abs(converted.astype(np.int32) - pcm.astype(np.int32)[:len(converted)]).max()
+        passed = len(converted) == len(pcm) and error <= 2 \
+            and len(segment_speech(converted)) == len(segments)
+        print(f"  {'PASS' if passed else 'FAIL'}: {name} downmix matches mono (max error {error})")
+        ok = ok and passed
+    return ok
+
+
+# Modules the recorder, its client wrapper and the audio reader process
+# must not load at import time
+HEAVY_MODULES = ("torch", "faster_whisper", "ctranslate2", "scipy.signal", "soundfile",
+                 "webrtcvad", "halo", "openwakeword", "pvporcupine")
+IMPORT_TIME_BUDGET_MS = 400
+
+
+def bench_import_time(seconds):
+    """
+    `python -X importtime` of audio_recorder and audio_recorder_client in a
+    fresh interpreter, as a spawned reader process imports them: checks the
+    import time budget and that no model library gets imported.
+    """
+    import subprocess
+    import sys
+
+    code = ("import sys, audio_recorder, audio_recorder_client; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+        return False
+
+    # Lines are "import time: self | cumulative | <indent>module"; the
+    # indent grows by two spaces per nesting level
+    top_level = {}
+    nested = []
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        cumulative, name = int(fields[1]), fields[2]
+        if name.startswith("   "):
+            nested.append((cumulative, name.strip()))
+        else:
+            top_level[name.strip()] = cumulative
+    total_ms = sum(top_level.get(name, 0) for name in ("audio_recorder", "audio_recorder_client")) / 1000
+    heavy = [name for name in result.stdout.strip().split(",") if name]
+
+    for cumulative, name in sorted(nested, reverse=True)[:5]:
+        print(f"  {name:<28} {cumulative / 1000:>8.1f} ms")
+    print(f"  {'audio_recorder + client':<28} {total_ms:>8.1f} ms  (budget {IMPORT_TIME_BUDGET_MS} ms)")
+    checks = (
+        ("import time within budget", total_ms <= IMPORT_TIME_BUDGET_MS),
+        (f"no model libraries imported{': ' + ', '.join(heavy) if heavy else ''}", not heavy),
+    )
+    ok = True
+    for name, passed in checks:
+        print(f"  {'PASS' if passed else 'FAIL'}: {name}")
+        ok = ok and passed
+    return ok
+
+
+def _transcription_worker(**options):
+    """TranscriptionWorker with the tiny model on CPU, used without its process loop."""
+    import threading
+    from audio_recorder import TranscriptionWorker
+
+    settings = dict(conn=None, stdout_pipe=None, model_path="tiny", download_root=None,
+                    compute_type="default", gpu_device_index=0, device="cpu",
+                    ready_event=threading.Event(), shutdown_event=threading.Event(),
+                    interrupt_stop_event=threading.Event(), beam_size=5, initial_prompt=None,
+                    suppress_tokens=[-1], batch_size=0, faster_whisper_vad_filter=False,
+                    normalize_audio=False)
+    settings.update(options)
+    return TranscriptionWorker(**settings)
+
+
+def bench_long_form(seconds):
+    """
+    Single transcribe call vs the worker's long-form path, with parallel
+    model replicas and with the batched pipeline, on repeated warm-up
+    speech. Needs faster_whisper and the tiny model.
+    """
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        print("  skipped: faster_whisper is not installed")
+        return None
+    from scipy.io import wavfile
+    from long_form import plan_chunks
+
+    rate, speech = wavfile.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), "warmup_audio.wav"))
+    speech = speech.astype(np.float32) / (32768.0 if speech.dtype == np.int16 else 1.0)
+    pause = np.zeros(int(0.8 * TARGET_RATE), dtype=np.float32)
+    repeats = max(1, int(max(seconds, 120) / (len(speech) / TARGET_RATE + 0.8)))
+    audio = np.concatenate([np.concatenate((speech, pause)) for _ in range(repeats)])
+    audio_seconds = len(audio) / TARGET_RATE
+    workers = max(1, (os.cpu_count() or 2) // 2)
+    threshold = 30.0
+
+    # Each configuration goes through TranscriptionWorker._transcribe_one,
+    # the call the worker makes for a final request
+    configurations = (
+        ("single call", dict(long_form_threshold=0.0)),
+        ("long-form parallel replicas", dict(long_form_threshold=threshold, long_form_workers=workers)),
+        ("long-form batched pipeline", dict(long_form_threshold=threshold, batch_size=8)),
+    )
+    print(f"{audio_seconds:.0f} s recording, {len(plan_chunks(audio))} chunks, {workers} workers")
+    results = []
+    for name, options in configurations:
+        worker = _transcription_worker(**options)
+        model = worker.load_models()
+        start = time.perf_counter()
+        text, _ = worker._transcribe_one(model, audio, "en", False)
+        elapsed = time.perf_counter() - start
+        if worker.long_form_pool:
+            worker.long_form_pool.shutdown()
+        results.append((name, elapsed, text))
+
+    single_elapsed = results[0][1]
+    for name, elapsed, text in results:
+        print(f"  {name:<28} {elapsed:>8.2f} s  {audio_seconds / elapsed:>8.1f}x realtime  "
+              f"{len(text.split()):>6d} words  {single_elapsed / elapsed:>5.2f}x")
+
+
+BENCHMARKS = {
+    "audio_handoff": bench_audio_handoff,
+    "callback_dispatcher": bench_callback_dispatcher,
+    "energy_gate": bench_energy_gate,
+    "import_time": bench_import_time,
+    "long_form": bench_long_form,
+    "quality_policy": bench_quality_policy,
+    "realtime_cadence": bench_realtime_cadence,
+    "resampler": bench_resampler,
+    "stabilizer": bench_stabilizer,
+    "transcription_server": bench_transcription_server,
+    "vad_segmentation": bench_vad_segmentation,
+    "webrtc_vad": bench_webrtc_vad,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio pipeline micro-benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS) + ["all"])
+    parser.add_argument("--seconds", type=float, default=30.0,
+                        help="Seconds of synthetic audio per run")
+    args = parser.parse_args()
+
+    names = sorted(BENCHMARKS) if args.name == "all" else [args.name]
+    failed = []
+    for name in names:
+        print(f"== {name} ==")
+        # Benchmarks that double as checks return False on failure
+        if BENCHMARKS[name](args.seconds) is False:
+            failed.append(name)
+    if failed:
+        raise SystemExit(f"Failed checks: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
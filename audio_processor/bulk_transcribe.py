@@ -0,0 +1,383 @@
+# Offline bulk transcription of recorded audio files with a pool of model processes
+# Usage: python bulk_transcribe.py <directory or manifest> --output results.jsonl [--workers N]
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from collections import Counter
+import numpy as np
+import argparse
+import logging
+import json
+import time
+import os
+
+from audio_pool import SharedAudioPool, SharedAudioReader
+from resampler import StreamingResampler
+from vad_segmenter import segment_speech
+
+logger = logging.getLogger("realtimestt")
+
+SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = (".wav", ".flac")
+READ_BLOCK_SECONDS = 30
+INIT_BULK_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+PENDING_SEGMENTS_PER_WORKER = 4
+# Pool restarts in a row, without a segment finishing in between, before
+# the run gives up
+MAX_POOL_RESTARTS = 3
+
+
+def find_audio_files(source):
+    """
+    Audio files to transcribe: every WAV/FLAC file below a directory, or the
+    entries of a manifest file. Manifest lines are paths or JSON objects with
+    a "path" key; relative paths are relative to the manifest.
+    """
+    if os.path.isdir(source):
+        found = []
+        for root, _, names in os.walk(source):
+            found += [os.path.join(root, name) for name in names
+                      if name.lower().endswith(AUDIO_EXTENSIONS)]
+        return sorted(found)
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, encoding="utf-8") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if line.startswith("{") else line
+            paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+    return paths
+
+
+def read_audio(path):
+    """
+    Returns:
+        tuple: (samples, sample_rate). PCM WAV files are memory-mapped, so
+            only the blocks being converted are paged in.
+    """
+    if path.lower().endswith(".wav"):
+        from scipy.io import wavfile
+        try:
+            rate, samples = wavfile.read(path, mmap=True)
+            return samples, rate
+        except ValueError:
+            # e.g. 24-bit WAV, which cannot be mapped
+            pass
+    import soundfile as sf
+    samples, rate = sf.read(path, dtype="int16")
+    return samples, rate
+
+
+def _block_to_int16(block):
+    # Scale by the input dtype first, then downmix in a wider integer type
+    if block.dtype == np.uint8:
+        block = (block.astype(np.int16) - 128) << 8
+    elif np.issubdtype(block.dtype, np.integer) and block.dtype != np.int16:
+        block = (block >> (8 * block.dtype.itemsize - 16)).astype(np.int16)
+    elif not np.issubdtype(block.dtype, np.integer):
+        block = np.clip(block * 32767.0, -32768, 32767).astype(np.int16)
+    if block.ndim == 2:
+        block = (block.sum(axis=1, dtype=np.int32) // block.shape[1]).astype(np.int16)
+    return block
+
+
+def to_pcm16k(samples, sample_rate):
+    """Convert a recording to 16 kHz mono int16, one block at a time."""
+    resampler = StreamingResampler(sample_rate, SAMPLE_RATE)
+    block = READ_BLOCK_SECONDS * sample_rate
+    out = np.empty(resampler.output_length(len(samples)) + 1, dtype=np.int16)
+    written = 0
+    for start in range(0, len(samples), block):
+        chunk = _block_to_int16(np.asarray(samples[start:start + block]))
+        written += len(resampler.process(chunk, out=out[written:]))
+    return out[:written]
+
+
+# ---- worker processes -----------------------------------------------------
+
+_worker = None
+
+
+class _BulkWorker:
+    """Model and shared-audio reader of one pool process, created once."""
+    def __init__(self, model_path, device, compute_type, cpu_threads, beam_size, language, download_root):
+        import faster_whisper
+        from text_normalizer import TextNormalizer
+
+        self.model = faster_whisper.WhisperModel(
+            model_size_or_path=model_path,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            download_root=download_root,
+        )
+        self.beam_size = beam_size
+        self.language = language or None
+        self.reader = SharedAudioReader()
+        self.text_normalizer = TextNormalizer()
+
+    def transcribe(self, descriptor):
+        start = time.perf_counter()
+        audio = self.reader.view(descriptor)
+        segments, info = self.model.transcribe(
+            audio, language=self.language, beam_size=self.beam_size, vad_filter=False)
+        text = " ".join(segment.text for segment in segments).strip()
+        return (self.text_normalizer.normalize(text), info.language,
+                info.language_probability, time.perf_counter() - start)
+
+
+def _init_worker(*args):
+    global _worker
+    _worker = _BulkWorker(*args)
+
+
+def _transcribe_segment(descriptor):
+    return _worker.transcribe(descriptor)
+
+
+# ---- parent side ----------------------------------------------------------
+
+class _FileJob:
+    """Segments of one file and their results."""
+    def __init__(self, path):
+        self.path = path
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.prepare_seconds = 0.0
+        self.transcribe_seconds = 0.0
+        self.segments = []
+        self.texts = []
+        self.languages = Counter()
+        self.pending = 0
+        self.error = None
+
+    def record(self):
+        wall = time.perf_counter() - self.started
+        if self.error is not None:
+            return {"path": self.path, "error": self.error}
+        duration = self.duration or float("nan")
+        processing = self.prepare_seconds + self.transcribe_seconds
+        return {
+            "path": self.path,
+            "duration": round(self.duration, 3),
+            "language": self.languages.most_common(1)[0][0] if self.languages else None,
+            "text": " ".join(text for text in self.texts if text),
+            "segments": [
+                {"start": round(start / SAMPLE_RATE, 2), "end": round(end / SAMPLE_RATE, 2), "text": text}
+                for (start, end), text in zip(self.segments, self.texts)
+            ],
+            "vad_seconds": round(self.prepare_seconds, 3),
+            "transcribe_seconds": round(self.transcribe_seconds, 3),
+            "wall_seconds": round(wall, 3),
+            # Processing time per second of audio; below 1 is faster than realtime
+            "rtf": round(processing / duration, 4),
+            "wall_rtf": round(wall / duration, 4),
+        }
+
+
+def transcribe_files(paths, output_path, workers: int = INIT_BULK_WORKERS, model="tiny",
+                     device="cpu", compute_type="default", beam_size=5, language="",
+                     download_root=None, resume: bool = False):
+    """
+    Transcribe audio files into a JSONL file, one line per file.
+
+    The parent reads, resamples and VAD-segments each file while the pool
+    transcribes the segments of earlier files. Segment audio reaches the
+    workers through shared memory. A line is written as soon as all segments
+    of its file are done, so an interrupted run keeps its finished files and
+    `resume` skips them. Files whose line records an error are tried again
+    on resume, and their new line is appended after the old one. If a
+    worker process dies, the files it was working
+    on are recorded as errors and the pool is started again; when the run
+    stops, every file in progress still gets its line.
+
+    Returns:
+        dict: Totals of the run.
+    """
+    done = set()
+    if resume and os.path.exists(output_path):
+        with open(output_path, encoding="utf-8") as previous:
+            for line in previous:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                # Failed files, e.g. from a crashed worker, are retried
+                if "error" not in record:
+                    done.add(record["path"])
+        paths = [path for path in paths if path not in done]
+        logger.info(f"Skipping {len(done)} files already transcribed in {output_path}")
+
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    audio_pool = SharedAudioPool(max_idle=workers * PENDING_SEGMENTS_PER_WORKER)
+    max_pending = workers * PENDING_SEGMENTS_PER_WORKER
+    running = {}
+    open_jobs = {}
+    totals = {"files": 0, "failed": 0, "audio_seconds": 0.0, "segments": 0}
+    executor = None
+    restarts = 0
+    run_started = time.perf_counter()
+
+    def start_pool():
+        nonlocal executor
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(model, device, compute_type, cpu_threads, beam_size, language, download_root))
+
+    output = open(output_path, "a" if resume else "w", encoding="utf-8")
+
+    def finish(job):
+        open_jobs.pop(id(job), None)
+        output.write(json.dumps(job.record(), ensure_ascii=False) + "\n")
+        output.flush()
+        totals["files"] += 1
+        totals["failed"] += job.error is not None
+        totals["audio_seconds"] += job.duration
+
+    def settle(job):
+        job.pending -= 1
+        if job.pending == 0:
+            finish(job)
+
+    def restart_pool(error):
+        """
+        A worker process died, which breaks the whole pool: every segment
+        still running on it fails. Start a new pool unless it keeps dying.
+        """
+        nonlocal restarts
+        logger.error(f"Transcription worker process died: {error}")
+        for future, (job, index, descriptor) in list(running.items()):
+            running.pop(future)
+            audio_pool.release(descriptor)
+            job.error = job.error or f"worker process died: {error}"
+            settle(job)
+        executor.shutdown(wait=False, cancel_futures=True)
+        restarts += 1
+        if restarts > MAX_POOL_RESTARTS:
+            raise RuntimeError(f"Transcription pool died {restarts} times in a row: {error}")
+        start_pool()
+
+    def collect(block):
+        nonlocal restarts
+        finished, _ = wait(running, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        broken = None
+        for future in finished:
+            job, index, descriptor = running.pop(future)
+            audio_pool.release(descriptor)
+            try:
+                text, detected, probability, seconds = future.result()
+                job.texts[index] = text
+                job.transcribe_seconds += seconds
+                if probability > 0:
+                    job.languages[detected] += 1
+                restarts = 0
+            except BrokenProcessPool as e:
+                broken = e
+                job.error = job.error or f"worker process died: {e}"
+            except Exception as e:
+                logger.error(f"Segment {index} of {job.path} failed: {e}")
+                job.error = job.error or str(e)
+            settle(job)
+        if broken is not None:
+            restart_pool(broken)
+
+    def submit(job, index, segment):
+        descriptor = audio_pool.put(segment.astype(np.float32) / 32768.0)
+        try:
+            future = executor.submit(_transcribe_segment, descriptor)
+        except BrokenProcessPool as e:
+            audio_pool.release(descriptor)
+            job.error = job.error or f"worker process died: {e}"
+            settle(job)
+            restart_pool(e)
+            return
+        running[future] = (job, index, descriptor)
+
+    interrupted = None
+    try:
+        start_pool()
+        for path in paths:
+            job = _FileJob(path)
+            open_jobs[id(job)] = job
+            try:
+                samples, rate = read_audio(path)
+                pcm = to_pcm16k(samples, rate)
+                job.duration = len(pcm) / SAMPLE_RATE
+                job.segments = segment_speech(pcm)
+                job.texts = [""] * len(job.segments)
+                job.prepare_seconds = time.perf_counter() - job.started
+            except Exception as e:
+                logger.error(f"Could not read {path}: {e}")
+                job.error = str(e)
+                finish(job)
+                continue
+
+            logger.info(f"{path}: {job.duration:.1f} s, {len(job.segments)} segments")
+            if not job.segments:
+                finish(job)
+                continue
+            job.pending = len(job.segments)
+            totals["segments"] += len(job.segments)
+            for index, (start, end) in enumerate(job.segments):
+                while len(running) >= max_pending:
+                    collect(block=True)
+                if job.error is not None:
+                    # The file already failed, e.g. with a dead pool
+                    job.pending -= len(job.segments) - index - 1
+                    settle(job)
+                    break
+                submit(job, index, pcm[start:end])
+            collect(block=False)
+
+        while running:
+            collect(block=True)
+    except BaseException as e:
+        interrupted = e
+        raise
+    finally:
+        # Every file that was started gets its line, also when the run stops
+        for job in list(open_jobs.values()):
+            job.error = job.error or f"run stopped: {interrupted!r}"
+            finish(job)
+        if executor is not None:
+            executor.shutdown(wait=interrupted is None, cancel_futures=True)
+        output.close()
+        audio_pool.close()
+
+    totals["wall_seconds"] = time.perf_counter() - run_started
+    totals["rtf"] = totals["wall_seconds"] / totals["audio_seconds"] if totals["audio_seconds"] else 0.0
+    logger.info(f"Transcribed {totals['files']} files ({totals['audio_seconds'] / 3600:.2f} h of audio) "
+                f"in {totals['wall_seconds']:.1f} s, real-time factor {totals['rtf']:.4f}")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline bulk transcription of WAV/FLAC files")
+    parser.add_argument("source", help="directory to scan, or manifest file")
+    parser.add_argument("--output", default="transcripts.jsonl")
+    parser.add_argument("--workers", type=int, default=INIT_BULK_WORKERS)
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="default")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--language", default="", help="language code, empty to detect")
+    parser.add_argument("--download-root", default=None)
+    parser.add_argument("--resume", action="store_true",
+                        help="append to the output and skip files transcribed in it; "
+                             "files that failed are tried again")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="RealTimeSTT: %(name)s - %(levelname)s - %(message)s")
+    paths = find_audio_files(args.source)
+    logger.info(f"Found {len(paths)} audio files in {args.source}")
+    totals = transcribe_files(
+        paths, args.output, workers=args.workers, model=args.model, device=args.device,
+        compute_type=args.compute_type, beam_size=args.beam_size, language=args.language,
+        download_root=args.download_root, resume=args.resume)
+    if totals["failed"]:
+        raise SystemExit(f"{totals['failed']} files failed, see {args.output}")
+
+
+if __name__ == "__main__":
+    main()
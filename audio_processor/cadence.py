@@ -0,0 +1,104 @@
+# Adaptive pause between realtime transcription passes
+import threading
+
+INIT_REALTIME_TARGET_LATENCY = 0.5
+INIT_REALTIME_CPU_SHARE = 0.5
+INIT_REALTIME_MAX_PAUSE = 2.0
+RTF_SMOOTHING = 0.3
+
+
+class CadenceController:
+    """
+    Chooses the pause before the next realtime pass from measured decode
+    speed.
+
+    A partial reflects new audio about `pause + decode` seconds after it
+    was spoken. When decoding is fast, the pause fills that up to
+    `target_latency` instead of re-decoding nearly unchanged audio every
+    `min_pause`. When decoding is slow, the pause is stretched so decoding
+    takes at most `cpu_share` of the realtime thread's time
+    (`decode / (decode + pause)`), rather than running passes back to back.
+    The decode time of the next pass is predicted from the smoothed
+    real-time factor and the length of the audio window it will decode.
+
+    Args:
+        min_pause (float): Shortest pause, the fixed pause when not adaptive.
+        target_latency (float): Partial update latency to aim for.
+        cpu_share (float): Largest fraction of time spent decoding, 0 to 1.
+        max_pause (float): Longest pause, however slow decoding gets.
+        adaptive (bool): If False the pause stays at `min_pause` and only
+            the metrics are kept.
+    """
+    def __init__(self, min_pause: float, target_latency: float = INIT_REALTIME_TARGET_LATENCY,
+                 cpu_share: float = INIT_REALTIME_CPU_SHARE,
+                 max_pause: float = INIT_REALTIME_MAX_PAUSE, adaptive: bool = True):
+        if not 0 < cpu_share <= 1:
+            raise ValueError("cpu_share must be in (0, 1]")
+        self.min_pause = min_pause
+        self.target_latency = target_latency
+        self.cpu_share = cpu_share
+        self.max_pause = max(max_pause, min_pause)
+        self.adaptive = adaptive
+        self.pause = min_pause
+        self._lock = threading.Lock()
+        self.rtf = None
+        self.passes = 0
+        self.decode_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.latency = None
+        self._last_pass_end = None
+
+    def record(self, decode_seconds, window_seconds, started):
+        """
+        Account a finished pass and choose the pause before the next one.
+
+        Args:
+            decode_seconds (float): Time the pass took to decode.
+            window_seconds (float): Seconds of audio it decoded.
+            started (float): time.perf_counter() at the start of the pass.
+
+        Returns:
+            float: The new pause.
+        """
+        with self._lock:
+            self.passes += 1
+            self.decode_seconds += decode_seconds
+            if self._last_pass_end is not None:
+                self.wall_seconds += started + decode_seconds - self._last_pass_end
+            else:
+                self.wall_seconds += decode_seconds
+            self._last_pass_end = started + decode_seconds
+
+            if window_seconds > 0:
+                rtf = decode_seconds / window_seconds
+                self.rtf = rtf if self.rtf is None else (
+                    RTF_SMOOTHING * rtf + (1 - RTF_SMOOTHING) * self.rtf)
+            latency = self.pause + decode_seconds
+            self.latency = latency if self.latency is None else (
+                RTF_SMOOTHING * latency + (1 - RTF_SMOOTHING) * self.latency)
+
+            if not self.adaptive:
+                return self.pause
+
+            # The next pass decodes this window plus the audio of the pause
+            predicted = (self.rtf or 0.0) * (window_seconds + self.pause)
+            latency_pause = self.target_latency - predicted
+            cpu_pause = predicted * (1 - self.cpu_share) / self.cpu_share
+            self.pause = min(max(latency_pause, cpu_pause, self.min_pause), self.max_pause)
+            return self.pause
+
+    def reset(self):
+        """Forget the pass timing at the end of a recording; keep the speed."""
+        with self._lock:
+            self._last_pass_end = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pause": round(self.pause, 3),
+                "rtf": round(self.rtf, 4) if self.rtf is not None else None,
+                "partial_latency": round(self.latency, 3) if self.latency is not None else None,
+                # Share of the time between passes spent decoding
+                "cpu_share": round(self.decode_seconds / self.wall_seconds, 3) if self.wall_seconds else None,
+                "passes": self.passes,
+            }
@@ -0,0 +1,192 @@
+# Bounded executor for user callbacks with per-callback ordering
+from collections import deque
+import threading
+import logging
+import queue
+import time
+
+logger = logging.getLogger("realtimestt")
+
+INIT_CALLBACK_WORKERS = 4
+INIT_CALLBACK_QUEUE_SIZE = 32
+
+# Delivery policies
+POLICY_QUEUE = "queue"        # keep every invocation
+POLICY_DROP = "drop"          # drop the oldest pending invocation when full
+POLICY_COALESCE = "coalesce"  # keep only the newest pending invocation
+
+
+class _Lane:
+    """Pending invocations of one callback; run strictly one at a time."""
+    __slots__ = ("callback", "name", "pending", "scheduled", "submitted", "completed",
+                 "dropped", "coalesced", "failed", "max_depth", "total_latency",
+                 "max_latency")
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.name = getattr(callback, "__qualname__", None) or repr(callback)
+        self.pending = deque()
+        self.scheduled = False
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def absorb(self, other):
+        """Add the counters of another lane to this one."""
+        self.submitted += other.submitted
+        self.completed += other.completed
+        self.dropped += other.dropped
+        self.coalesced += other.coalesced
+        self.failed += other.failed
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.total_latency += other.total_latency
+        self.max_latency = max(self.max_latency, other.max_latency)
+
+
+class CallbackDispatcher:
+    """
+    Runs callbacks on a fixed pool of worker threads.
+
+    Every callback gets its own FIFO lane. A lane is handed to at most one
+    worker at a time, so invocations of the same callback run in order,
+    while different callbacks run in parallel. A lane is removed once it
+    drains and its counters are kept per callback name, so callbacks
+    created per call do not accumulate. The number of threads never
+    exceeds `max_workers`, however slow a consumer is.
+
+    High-rate callbacks are bounded by their policy: POLICY_DROP discards
+    the oldest pending invocation once `max_pending` are waiting,
+    POLICY_COALESCE replaces any pending invocation with the newest one.
+    POLICY_QUEUE keeps everything and is meant for low-rate events.
+
+    Args:
+        max_workers (int): Number of worker threads, started on demand.
+        max_pending (int): Pending invocations per POLICY_DROP lane.
+    """
+    def __init__(self, max_workers: int = INIT_CALLBACK_WORKERS,
+                 max_pending: int = INIT_CALLBACK_QUEUE_SIZE):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._lanes = {}
+        # Counters of drained lanes, by callback name
+        self._retired = {}
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._idle_workers = 0
+        self._shutdown = False
+
+    def submit(self, callback, *args, policy: str = POLICY_QUEUE, **kwargs):
+        """Schedule `callback(*args, **kwargs)` without blocking the caller."""
+        with self._lock:
+            if self._shutdown:
+                return
+            lane = self._lanes.get(callback)
+            if lane is None:
+                lane = self._lanes[callback] = _Lane(callback)
+            lane.submitted += 1
+            item = (time.perf_counter(), args, kwargs)
+            if policy == POLICY_COALESCE and lane.pending:
+                lane.pending.clear()
+                lane.coalesced += 1
+            elif policy == POLICY_DROP and len(lane.pending) >= self.max_pending:
+                lane.pending.popleft()
+                lane.dropped += 1
+            lane.pending.append(item)
+            lane.max_depth = max(lane.max_depth, len(lane.pending))
+            if lane.scheduled:
+                return
+            lane.scheduled = True
+            if self._idle_workers == 0 and len(self._workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._worker, name=f"CallbackWorker-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        self._ready.put(lane)
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                self._idle_workers += 1
+            lane = self._ready.get()
+            with self._lock:
+                self._idle_workers -= 1
+            if lane is None:
+                return
+
+            with self._lock:
+                enqueued, args, kwargs = lane.pending.popleft()
+            try:
+                lane.callback(*args, **kwargs)
+            except Exception as e:
+                lane.failed += 1
+                logger.error(f"Error in callback {lane.name}: {e}", exc_info=True)
+            latency = time.perf_counter() - enqueued
+
+            with self._lock:
+                lane.completed += 1
+                lane.total_latency += latency
+                lane.max_latency = max(lane.max_latency, latency)
+                if not lane.pending or self._shutdown:
+                    lane.scheduled = False
+                    if not lane.pending:
+                        self._retire(lane)
+                    continue
+            # More invocations of the same callback; back of the line so
+            # other callbacks get their turn
+            self._ready.put(lane)
+
+    def _retire(self, lane):
+        """Drop a drained lane, keeping its counters. Called with the lock held."""
+        if self._lanes.get(lane.callback) is lane:
+            del self._lanes[lane.callback]
+        retired = self._retired.get(lane.name)
+        if retired is None:
+            retired = self._retired[lane.name] = _Lane(lane.callback)
+        retired.absorb(lane)
+
+    def queue_depth(self):
+        """Total number of pending invocations over all callbacks."""
+        with self._lock:
+            return sum(len(lane.pending) for lane in self._lanes.values())
+
+    def stats(self):
+        """Per-callback counters and latencies (enqueue to completion)."""
+        with self._lock:
+            totals = {}
+            for lane in list(self._retired.values()) + list(self._lanes.values()):
+                total = totals.get(lane.name)
+                if total is None:
+                    total = totals[lane.name] = _Lane(lane.callback)
+                total.absorb(lane)
+                total.pending.extend(lane.pending)
+            return {
+                lane.name: {
+                    "submitted": lane.submitted,
+                    "completed": lane.completed,
+                    "pending": len(lane.pending),
+                    "dropped": lane.dropped,
+                    "coalesced": lane.coalesced,
+                    "failed": lane.failed,
+                    "max_depth": lane.max_depth,
+                    "mean_latency": lane.total_latency / lane.completed if lane.completed else 0.0,
+                    "max_latency": lane.max_latency,
+                }
+                for lane in totals.values()
+            }
+
+    def shutdown(self, timeout: float = 1.0):
+        """Stop accepting callbacks and let the workers exit."""
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._ready.put(None)
+        deadline = time.time() + timeout
+        for worker in workers:
+            worker.join(timeout=max(deadline - time.time(), 0))
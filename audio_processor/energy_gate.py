@@ -0,0 +1,94 @@
+# Cheap energy / zero-crossing pre-gate run ahead of the VAD models
+import numpy as np
+
+INIT_ENERGY_GATE_MARGIN_DB = 6.0
+INIT_ENERGY_GATE_CEILING_DB = -40.0
+NOISE_FLOOR_MIN_DB = -90.0
+NOISE_FLOOR_FALL_RATE = 0.2
+NOISE_FLOOR_RISE_DB = 0.02
+VOICED_ZCR_MAX = 0.1
+WARMUP_CHUNKS = 10
+
+
+class EnergyGate:
+    """
+    Flags chunks that are clearly silence so the VAD models can be skipped.
+
+    Tracks an adaptive noise floor (fast to fall, slow to rise) from the RMS
+    level of chunks outside speech; while the caller reports speech the
+    floor is held, so long quiet speech cannot raise it into gating range. A chunk is gated when its level stays within
+    `margin_db` of the floor. Low zero-crossing rates indicate voiced sound,
+    so such chunks must sit within half the margin to be gated. Chunks above
+    `ceiling_db` are never gated, however high the floor has drifted.
+
+    Args:
+        margin_db (float): Distance above the noise floor still counted as
+            silence.
+        ceiling_db (float): Level in dBFS above which chunks always pass.
+        warmup_chunks (int): Chunks passed through while the floor settles.
+    """
+    def __init__(self, margin_db: float = INIT_ENERGY_GATE_MARGIN_DB,
+                 ceiling_db: float = INIT_ENERGY_GATE_CEILING_DB,
+                 warmup_chunks: int = WARMUP_CHUNKS):
+        self.margin_db = margin_db
+        self.ceiling_db = ceiling_db
+        self.warmup_chunks = warmup_chunks
+        self.noise_floor_db = None
+        self.last_level_db = NOISE_FLOOR_MIN_DB
+        self.last_zcr = 0.0
+        self.chunks = 0
+        self.gated = 0
+
+    @staticmethod
+    def measure(pcm):
+        """Returns (level in dBFS, zero-crossing rate) of an int16 chunk."""
+        if len(pcm) == 0:
+            return NOISE_FLOOR_MIN_DB, 0.0
+        samples = pcm.astype(np.float32)
+        rms = float(np.sqrt(np.dot(samples, samples) / len(samples)))
+        level_db = 20.0 * float(np.log10(rms / 32768.0 + 1e-10))
+        signs = np.signbit(pcm)
+        zcr = float(np.count_nonzero(signs[1:] != signs[:-1])) / max(len(pcm) - 1, 1)
+        return max(level_db, NOISE_FLOOR_MIN_DB), zcr
+
+    def _update_floor(self, level_db):
+        if self.noise_floor_db is None:
+            self.noise_floor_db = level_db
+        elif level_db < self.noise_floor_db:
+            self.noise_floor_db += (level_db - self.noise_floor_db) * NOISE_FLOOR_FALL_RATE
+        else:
+            self.noise_floor_db += min(level_db - self.noise_floor_db, NOISE_FLOOR_RISE_DB)
+
+    def is_silence(self, pcm, speech: bool = False):
+        """
+        Args:
+            pcm (np.ndarray): int16 chunk at 16 kHz.
+            speech (bool): Speech is ongoing (recording, or the VAD reports
+                speech); the noise floor is not updated.
+
+        Returns:
+            bool: True if the chunk can skip voice activity detection.
+        """
+        level_db, zcr = self.measure(pcm)
+        self.last_level_db = level_db
+        self.last_zcr = zcr
+        self.chunks += 1
+        if not speech or self.noise_floor_db is None:
+            self._update_floor(level_db)
+
+        if self.chunks <= self.warmup_chunks or level_db > self.ceiling_db:
+            return False
+        margin = self.margin_db if zcr > VOICED_ZCR_MAX else self.margin_db / 2
+        gated = level_db < self.noise_floor_db + margin
+        if gated:
+            self.gated += 1
+        return gated
+
+    def stats(self):
+        return {
+            "chunks": self.chunks,
+            "gated": self.gated,
+            "gated_ratio": self.gated / self.chunks if self.chunks else 0.0,
+            "noise_floor_db": self.noise_floor_db,
+            "last_level_db": self.last_level_db,
+        }
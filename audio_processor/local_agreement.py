@@ -0,0 +1,166 @@
+# Committed-prefix bookkeeping for streaming realtime transcription
+from collections import namedtuple, deque
+import re
+
+INIT_REALTIME_WINDOW_SECONDS = 15.0
+PROMPT_MAX_CHARS = 200
+DEDUP_MAX_WORDS = 5
+INIT_UNSURE_WORD_PROBABILITY = 0.5
+
+# One decoded word with its position in the utterance, in seconds
+Word = namedtuple("Word", ["start", "end", "text", "probability"], defaults=(1.0,))
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+def _normalize(text):
+    return _NORMALIZE_RE.sub("", text.lower())
+
+
+class LocalAgreementTranscript:
+    """
+    Streaming transcript built with a local-agreement policy.
+
+    Every realtime pass decodes only the audio window that starts at the end
+    of the committed text and reports its words with timestamps. Words that
+    two consecutive passes agree on, in order, are committed together with
+    their end time. Committed text is final for the utterance, so later
+    passes never decode that audio again.
+
+    The window is moved up to the last committed word once it grows longer
+    than `window_seconds`. If passes keep disagreeing and the window reaches
+    twice that length, the older part of the current hypothesis is committed
+    as is, so the decode cost per pass stays bounded.
+
+    The committed prefix up to the first word decoded with a probability
+    below `unsure_probability` is tracked separately as the confident
+    prefix, which a final pass can keep instead of decoding again.
+
+    Args:
+        sample_rate (int): Sample rate of the utterance audio.
+        window_seconds (float): Window length that triggers trimming.
+        unsure_probability (float): Word probability below which committed
+            text no longer counts as confident.
+    """
+    def __init__(self, sample_rate: int = 16000,
+                 window_seconds: float = INIT_REALTIME_WINDOW_SECONDS,
+                 unsure_probability: float = INIT_UNSURE_WORD_PROBABILITY):
+        self.sample_rate = sample_rate
+        self.window_seconds = window_seconds
+        self.unsure_probability = unsure_probability
+        self.reset()
+
+    def reset(self):
+        """Forget the current utterance."""
+        self.committed_text = ""
+        self.committed_end = 0.0
+        self.confident_text = ""
+        self.confident_end = 0.0
+        self._unsure_committed = False
+        self.window_start = 0
+        self.passes = 0
+        self._recent = deque(maxlen=DEDUP_MAX_WORDS)
+        self._hypothesis = []
+        self._window_prompt = ""
+
+    @property
+    def unstable_text(self):
+        return "".join(word.text for word in self._hypothesis).strip()
+
+    @property
+    def text(self):
+        """Committed text followed by the current unconfirmed words."""
+        return (self.committed_text + "".join(word.text for word in self._hypothesis)).strip()
+
+    @property
+    def committed_samples(self):
+        """Number of utterance samples covered by the committed text."""
+        return int(self.committed_end * self.sample_rate)
+
+    @property
+    def confident_samples(self):
+        """Number of utterance samples covered by the confident prefix."""
+        return int(self.confident_end * self.sample_rate)
+
+    def window(self, audio):
+        """Returns the part of the utterance audio the next pass decodes."""
+        return audio[min(self.window_start, len(audio)):]
+
+    def prompt(self):
+        """
+        Tail of the committed text spoken before the window, used as decoder
+        prompt. Empty while the window still starts at the utterance start.
+        """
+        return self._window_prompt
+
+    def _commit(self, words):
+        for word in words:
+            self.committed_text += word.text
+            self.committed_end = max(self.committed_end, word.end)
+            self._recent.append(_normalize(word.text))
+            if word.probability < self.unsure_probability:
+                self._unsure_committed = True
+            if not self._unsure_committed:
+                self.confident_text += word.text
+                self.confident_end = self.committed_end
+
+    def _drop_committed_overlap(self, words):
+        # Words that end before the committed audio were decoded already
+        words = [word for word in words if word.start > self.committed_end - 0.1]
+        if not words or not self._recent or abs(words[0].start - self.committed_end) > 1.0:
+            return words
+        # A window starting mid-word can repeat the last committed words
+        recent = list(self._recent)
+        for n in range(min(len(recent), len(words)), 0, -1):
+            if recent[-n:] == [_normalize(word.text) for word in words[:n]]:
+                return words[n:]
+        return words
+
+    def update(self, words, window_offset: float, window_duration: float):
+        """
+        Feed the words of one realtime pass.
+
+        Args:
+            words (list of tuple): (start, end, text) or (start, end, text,
+                probability) per word, with times relative to the start of
+                the decoded window.
+            window_offset (float): Start of the window in the utterance,
+                in seconds.
+            window_duration (float): Length of the decoded window in seconds.
+
+        Returns:
+            list of Word: Words committed by this pass.
+        """
+        self.passes += 1
+        words = [Word(start + window_offset, end + window_offset, *rest)
+                 for start, end, *rest in words]
+        words = self._drop_committed_overlap(words)
+
+        agreed = 0
+        for previous, current in zip(self._hypothesis, words):
+            if _normalize(previous.text) != _normalize(current.text):
+                break
+            agreed += 1
+        committed = words[:agreed]
+        self._commit(committed)
+        self._hypothesis = words[agreed:]
+
+        window_end = window_offset + window_duration
+        if window_end - self.window_start / self.sample_rate > 2 * self.window_seconds:
+            # No agreement for too long; accept the older part of the hypothesis
+            cutoff = window_end - self.window_seconds
+            forced = []
+            for word in self._hypothesis:
+                if word.end > cutoff:
+                    break
+                forced.append(word)
+            self._commit(forced)
+            self._hypothesis = self._hypothesis[len(forced):]
+            committed += forced
+
+        if window_end - self.window_start / self.sample_rate > self.window_seconds \
+                and self.committed_samples > self.window_start:
+            self.window_start = self.committed_samples
+            self._window_prompt = self.committed_text[-PROMPT_MAX_CHARS:].strip()
+
+        return committed
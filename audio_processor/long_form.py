@@ -0,0 +1,85 @@
+# Chunking and stitching for parallel transcription of long recordings
+import numpy as np
+import re
+from vad_segmenter import segment_speech
+
+SAMPLE_RATE = 16000
+INIT_LONG_FORM_CHUNK_SECONDS = 30.0
+INIT_LONG_FORM_OVERLAP = 1.0
+OVERLAP_MAX_WORDS = 8
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+def _normalize(word):
+    return _NORMALIZE_RE.sub("", word.lower())
+
+
+def plan_chunks(audio, chunk_seconds: float = INIT_LONG_FORM_CHUNK_SECONDS,
+                overlap: float = INIT_LONG_FORM_OVERLAP):
+    """
+    Split a long recording into independently decodable chunks.
+
+    Speech segments from the WebRTC VAD are grouped into chunks of at most
+    `chunk_seconds`, so chunks normally begin and end in silence and the
+    silence between them is never decoded. Where a segment had to be cut
+    inside speech, the chunk before the cut is extended by `overlap`
+    seconds, and `stitch_texts` removes the words decoded twice.
+
+    Args:
+        audio (np.ndarray): 16 kHz float32 or int16 samples.
+        chunk_seconds (float): Longest chunk, at most Whisper's 30 s window.
+        overlap (float): Seconds decoded twice across cuts inside speech.
+
+    Returns:
+        list of tuple: (start, end) sample ranges in recording order.
+    """
+    if audio.dtype != np.int16:
+        pcm = np.clip(audio * 32768.0, -32768, 32767).astype(np.int16)
+    else:
+        pcm = audio
+    overlap_samples = int(overlap * SAMPLE_RATE)
+    limit = int(chunk_seconds * SAMPLE_RATE) - overlap_samples
+    segments = segment_speech(pcm, max_seconds=limit / SAMPLE_RATE)
+
+    chunks = []
+    for start, end in segments:
+        if chunks and end - chunks[-1][0] <= limit:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+
+    planned = []
+    for index, (start, end) in enumerate(chunks):
+        cut_in_speech = index + 1 < len(chunks) and chunks[index + 1][0] == end
+        if cut_in_speech:
+            end = min(end + overlap_samples, len(audio))
+        planned.append((start, end))
+    return planned
+
+
+def stitch_texts(texts, chunks=None, max_words: int = OVERLAP_MAX_WORDS):
+    """
+    Join chunk transcriptions, dropping words repeated across an overlapping
+    chunk boundary: the longest run of up to `max_words` words that ends one
+    chunk and starts the next is kept only once.
+
+    Args:
+        texts (list of str): Transcription of every chunk, in order.
+        chunks (list of tuple, optional): The chunks from `plan_chunks`;
+            boundaries between chunks that do not overlap are joined as
+            they are. Without chunks every boundary is de-duplicated.
+    """
+    words = []
+    for index, text in enumerate(texts):
+        chunk_words = text.split()
+        overlapped = chunks is None or (index > 0 and chunks[index - 1][1] > chunks[index][0])
+        if overlapped and words and chunk_words:
+            tail = [_normalize(word) for word in words[-max_words:]]
+            head = [_normalize(word) for word in chunk_words[:max_words]]
+            for n in range(min(len(tail), len(head)), 0, -1):
+                if tail[-n:] == head[:n]:
+                    chunk_words = chunk_words[n:]
+                    break
+        words += chunk_words
+    return " ".join(words)
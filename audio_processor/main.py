@@ -1,6 +1,7 @@
 # Main entry point for audio recording and transcription
 import os
 import time
+import asyncio
 from datetime import datetime
 from audio_recorder import AudioToTextRecorder
 from transcript_manager import TranscriptManager
@@ -20,7 +21,7 @@ def save_session_transcript(transcripts: list, filename: str = TRANSCRIPT_FILE):
         file.write("---------------------------\n")
 
 
-def main():
+async def main():
     """Initialize and run the audio transcription recorder."""
     if not os.path.exists(TRANSCRIPT_FILE):
         with open(TRANSCRIPT_FILE, "w", encoding="utf-8") as file:
@@ -30,6 +31,7 @@ def main():
     recorder = AudioToTextRecorder(
         model="tiny",
         device="cpu",
+        resource_plan="auto",
         input_device_index=None,
         sample_rate=16000,
         buffer_size=512,
@@ -54,14 +56,14 @@ def main():
     print("Recorder started. Listening for speech... Press Ctrl-C to stop.")
 
     try:
-        while True:
-            transcribed_text = recorder.text()
+        async for event in recorder.stream(partials=False):
+            transcribed_text = event.text
             if transcribed_text:
                 print(f"Transcribed: {transcribed_text}")
                 session_transcripts.append(transcribed_text)
                 transcript_manager.save_transcript(transcribed_text, session_start_time)
-            
-    except KeyboardInterrupt:
+
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("Stopping recorder...")
 
     finally:
@@ -71,4 +73,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
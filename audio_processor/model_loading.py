@@ -0,0 +1,122 @@
+# Concurrent model initialization with per-component startup timing
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
+import logging
+import time
+import os
+
+logger = logging.getLogger("realtimestt")
+
+SILERO_HUB_REPO = "snakers4/silero-vad"
+SILERO_HUB_CACHE_DIR = "snakers4_silero-vad_master"
+
+
+class StartupTimer:
+    """
+    Runs initialization steps concurrently and records how long each took.
+
+    `submit(name, fn)` starts a step on its own thread; `wait()` blocks until
+    all submitted steps are done and re-raises the first failure. Steps that
+    run on the caller's thread can be timed with `measure(name)`.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.details = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._futures = []
+
+    def _timed(self, name, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.timings[name] = time.perf_counter() - start
+
+    def submit(self, name, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="ModelInit")
+        future = self._executor.submit(self._timed, name, fn, *args)
+        self._futures.append((name, future))
+        return future
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.timings[name] = time.perf_counter() - start
+
+    def wait(self, *names):
+        """
+        Wait for the named steps, or for every submitted step if no names
+        are given; raises the first failed step's error.
+        """
+        error = None
+        waiting = [(name, future) for name, future in self._futures if not names or name in names]
+        for name, future in waiting:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Initialization of {name} failed: {e}")
+                error = error or e
+        self._futures = [item for item in self._futures if item not in waiting]
+        if not self._futures and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if error is not None:
+            raise error
+
+    def report(self):
+        """One-line summary, slowest component first."""
+        total = time.perf_counter() - self.started
+        parts = []
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            detail = f" ({self.details[name]})" if name in self.details else ""
+            parts.append(f"{name} {seconds:.2f}s{detail}")
+        return f"{total:.2f}s to listening: " + ", ".join(parts)
+
+
+def load_silero_vad(use_onnx: bool = False, model_dir: str = None):
+    """
+    Load the Silero VAD model without touching the network when possible.
+
+    Sources, in order:
+    1. `model_dir`, a local checkout of the silero-vad repository.
+    2. The `silero_vad` pip package, which bundles the model files.
+    3. The torch hub cache from an earlier `torch.hub.load`, loaded as a
+       local repository so no update check goes to GitHub.
+    4. torch hub over the network, as before.
+
+    Returns:
+        tuple: (model, source description)
+    """
+    import torch
+
+    if model_dir:
+        model, _ = torch.hub.load(repo_or_dir=model_dir, model="silero_vad", source="local",
+                                  verbose=False, onnx=use_onnx)
+        return model, f"local {model_dir}"
+
+    try:
+        from silero_vad import load_silero_vad as load_packaged
+    except ImportError:
+        load_packaged = None
+    if load_packaged is not None:
+        return load_packaged(onnx=use_onnx), "silero_vad package"
+
+    cached = os.path.join(torch.hub.get_dir(), SILERO_HUB_CACHE_DIR)
+    if os.path.isdir(cached):
+        model, _ = torch.hub.load(repo_or_dir=cached, model="silero_vad", source="local",
+                                  verbose=False, onnx=use_onnx)
+        return model, "hub cache"
+
+    logger.info("Silero VAD not found locally, downloading it through torch hub")
+    model, _ = torch.hub.load(repo_or_dir=SILERO_HUB_REPO, model="silero_vad",
+                              verbose=False, onnx=use_onnx)
+    return model, "downloaded"
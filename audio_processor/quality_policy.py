@@ -0,0 +1,141 @@
+# Load-aware beam size and model degradation for the main transcription model
+from collections import namedtuple, deque
+
+INIT_FINAL_LATENCY_TARGET = 0.0
+LATENCY_SMOOTHING = 0.3
+RECOVER_HEADROOM = 0.5
+RECOVER_SECONDS = 3.0
+RECOVER_SECONDS_MAX = 60.0
+DECISION_HISTORY = 64
+
+# beam_size: beam of this level. fallback: decode with the smaller model.
+QualityLevel = namedtuple("QualityLevel", ["beam_size", "fallback"])
+QualityDecision = namedtuple("QualityDecision", ["time", "previous", "level", "reason"])
+
+
+def quality_levels(beam_size: int, fallback: bool = False):
+    """
+    Levels from best to cheapest: the configured beam, halved down to greedy
+    decoding, then the fallback model with greedy decoding if there is one.
+    """
+    levels = [QualityLevel(beam_size, False)]
+    while levels[-1].beam_size > 1:
+        levels.append(QualityLevel(max(1, levels[-1].beam_size // 2), False))
+    if fallback:
+        levels.append(QualityLevel(1, True))
+    return levels
+
+
+class QualityPolicy:
+    """
+    Steps decoding quality down when the latency target would be missed and
+    back up when load clears.
+
+    Before every batch the policy looks at the smoothed latency of recent
+    requests (arrival to answer) and at the time the queue needs to drain at
+    the current speed. If either exceeds `latency_target` it steps one level
+    down; a new step down waits until a batch has run at the current level.
+    It steps one level up once both have stayed below `RECOVER_HEADROOM` of
+    the target with nothing queued for `recover_seconds`. A step up that
+    has to be taken back soon after doubles that time, so sustained load
+    does not make the quality flap; every later step up halves it again.
+
+    Args:
+        beam_size (int): Configured beam size, the top level.
+        latency_target (float): Seconds a request may take, queueing included.
+        fallback (bool): Whether a smaller fallback model is available as
+            the lowest level.
+        recover_seconds (float): Calm time needed before stepping up.
+    """
+    def __init__(self, beam_size: int, latency_target: float, fallback: bool = False,
+                 recover_seconds: float = RECOVER_SECONDS):
+        self.levels = quality_levels(beam_size, fallback)
+        self.latency_target = latency_target
+        self.recover_seconds = recover_seconds
+        self.index = 0
+        self.latency = None
+        self.service_time = None
+        self.decisions = deque(maxlen=DECISION_HISTORY)
+        self._calm_since = None
+        self._batches_at_level = 0
+        self._level_since = None
+        self._recover_after = recover_seconds
+        self._stepped_up = False
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def choose(self, queue_depth: int, oldest_wait: float, now: float):
+        """
+        Level for the next batch.
+
+        Args:
+            queue_depth (int): Requests waiting behind this batch.
+            oldest_wait (float): Seconds the oldest request of the batch
+                has already waited.
+            now (float): Current time, recorded with decisions.
+
+        Returns:
+            QualityDecision or None: The change made, if any.
+        """
+        drain = oldest_wait + (queue_depth + 1) * (self.service_time or 0.0)
+        latency = self.latency or 0.0
+        reason = None
+        previous = self.index
+
+        if (latency > self.latency_target or drain > self.latency_target) \
+                and self.index + 1 < len(self.levels) and self._batches_at_level > 0:
+            if latency > self.latency_target:
+                reason = f"recent latency {latency:.2f}s over target {self.latency_target:.2f}s"
+            else:
+                reason = (f"{queue_depth} queued, draining takes {drain:.2f}s, "
+                          f"over target {self.latency_target:.2f}s")
+            if self._stepped_up and now - self._level_since < 2 * self._recover_after:
+                self._recover_after = min(2 * self._recover_after, RECOVER_SECONDS_MAX)
+            self.index += 1
+        elif self.index > 0 and queue_depth == 0 \
+                and latency < self.latency_target * RECOVER_HEADROOM \
+                and drain < self.latency_target * RECOVER_HEADROOM:
+            if self._calm_since is None:
+                self._calm_since = now
+            if now - self._calm_since >= self._recover_after:
+                reason = (f"load cleared: latency {latency:.2f}s, queue empty for "
+                          f"{now - self._calm_since:.1f}s")
+                self.index -= 1
+                self._recover_after = max(self._recover_after / 2, self.recover_seconds)
+        else:
+            self._calm_since = None
+
+        if self.index == previous:
+            return None
+        self._stepped_up = self.index < previous
+        self._calm_since = None
+        self._level_since = now
+        self._batches_at_level = 0
+        # Timings of the old level say little about the new one
+        self.latency = None
+        decision = QualityDecision(now, self.levels[previous], self.level, reason)
+        self.decisions.append(decision)
+        return decision
+
+    def record(self, latencies, batch_seconds: float):
+        """Account a finished batch: per-request latencies and decode time."""
+        self._batches_at_level += 1
+        if not latencies:
+            return
+        service = batch_seconds / len(latencies)
+        self.service_time = service if self.service_time is None else (
+            LATENCY_SMOOTHING * service + (1 - LATENCY_SMOOTHING) * self.service_time)
+        for latency in latencies:
+            self.latency = latency if self.latency is None else (
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency)
+
+    def stats(self):
+        return {
+            "beam_size": self.level.beam_size,
+            "fallback": self.level.fallback,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "service_time": round(self.service_time, 3) if self.service_time is not None else None,
+            "changes": len(self.decisions),
+        }
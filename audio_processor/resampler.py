@@ -0,0 +1,129 @@
+# Streaming polyphase resampler for chunked audio input
+from functools import lru_cache
+from math import gcd
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def design_polyphase_taps(input_rate: int, output_rate: int):
+    """
+    Design the anti-aliasing filter for an (input_rate, output_rate) pair.
+
+    Uses the same Kaiser-windowed FIR as scipy's resample_poly so the
+    frequency response matches the previous per-chunk path. The result is
+    cached, so every stream at the same device rate shares one filter.
+
+    Returns:
+        tuple: (up, down, taps) with the reduced rate ratio and the
+        prototype filter taps at the upsampled rate.
+    """
+    divisor = gcd(int(input_rate), int(output_rate))
+    up = int(output_rate) // divisor
+    down = int(input_rate) // divisor
+    if up == down:
+        taps = np.ones(1, dtype=np.float32)
+    else:
+        # scipy.signal is only imported by streams that actually resample
+        from scipy.signal import firwin
+        max_rate = max(up, down)
+        half_len = 10 * max_rate
+        taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * up
+        taps = taps.astype(np.float32)
+    taps.setflags(write=False)
+    return up, down, taps
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase resampler for a continuous stream of chunks.
+
+    Filter history and output phase are carried between calls, so chunk
+    boundaries do not produce edge artifacts and the filter is never
+    redesigned. The polyphase filtering itself runs in scipy's upfirdn.
+    """
+    def __init__(self, input_rate: int, output_rate: int = 16000):
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        self.up, self.down, self._taps = design_polyphase_taps(self.input_rate, self.output_rate)
+        # Input samples needed before the first output of a chunk
+        self._taps_per_phase = -(-len(self._taps) // self.up)
+        self._up_inverse = pow(self.up, -1, self.down) if self.down > 1 else 0
+        self._history = np.zeros(self._taps_per_phase - 1 + self.down, dtype=np.float32)
+        self._signal = np.zeros(0, dtype=np.float32)
+        self._phase_time = 0  # upsampled time of next output, relative to the current chunk
+        self._upfirdn = None
+        if not self.passthrough:
+            from scipy.signal import upfirdn
+            self._upfirdn = upfirdn
+
+    @property
+    def passthrough(self):
+        return self.up == self.down
+
+    def reset(self):
+        """Forget the stream history, e.g. after the input device changed."""
+        self._history[:] = 0
+        self._phase_time = 0
+
+    def output_length(self, input_length: int):
+        """Number of output samples the next call with `input_length` yields."""
+        span = input_length * self.up - self._phase_time
+        return max(-(-span // self.down), 0)
+
+    def process(self, chunk, out: np.ndarray = None):
+        """
+        Resample the next chunk of the stream.
+
+        Args:
+            chunk: int16/float samples as numpy array or raw int16 bytes.
+            out (np.ndarray, optional): Buffer to write into. Must hold at
+                least `output_length(len(chunk))` samples. Integer buffers
+                receive rounded and clipped values.
+
+        Returns:
+            np.ndarray: View of the written output samples.
+        """
+        if not isinstance(chunk, np.ndarray):
+            chunk = np.frombuffer(chunk, dtype=np.int16)
+        if chunk.ndim == 2:
+            chunk = chunk.mean(axis=1)
+
+        input_length = len(chunk)
+        output_length = self.output_length(input_length)
+        if out is None:
+            out = np.empty(output_length, dtype=np.float32)
+        elif len(out) < output_length:
+            raise ValueError(f"Output buffer too small: {len(out)} < {output_length}")
+        target = out[:output_length]
+
+        if self.passthrough:
+            self._write(target, chunk)
+            return target
+
+        # Prepend just enough history that the first output of this chunk
+        # falls on an output sample of upfirdn (upsampled time divisible by down)
+        lead = self._taps_per_phase - 1
+        lead += (-self._phase_time * self._up_inverse - lead) % self.down
+        history_len = len(self._history)
+        if len(self._signal) < history_len + input_length:
+            self._signal = np.zeros(history_len + input_length, dtype=np.float32)
+        signal = self._signal[:history_len + input_length]
+        signal[:history_len] = self._history
+        signal[history_len:] = chunk
+
+        if output_length:
+            first = (self._phase_time + lead * self.up) // self.down
+            filtered = self._upfirdn(self._taps, signal[history_len - lead:], self.up, self.down)
+            self._write(target, filtered[first:first + output_length])
+
+        self._phase_time += output_length * self.down - input_length * self.up
+        self._history[:] = signal[len(signal) - history_len:]
+        return target
+
+    @staticmethod
+    def _write(target, values):
+        if np.issubdtype(target.dtype, np.integer):
+            info = np.iinfo(target.dtype)
+            np.copyto(target, np.clip(np.rint(values), info.min, info.max), casting='unsafe')
+        else:
+            np.copyto(target, values, casting='unsafe')
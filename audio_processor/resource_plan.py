@@ -0,0 +1,188 @@
+# CPU thread budget and core pinning for the recorder's components
+from collections import namedtuple
+from contextlib import contextmanager
+import threading
+import logging
+import os
+
+logger = logging.getLogger("realtimestt")
+
+COMPONENT_READER = "reader"
+COMPONENT_VAD = "silero_vad"
+COMPONENT_REALTIME = "realtime_model"
+COMPONENT_MAIN = "main_model"
+COMPONENT_RESAMPLING = "resampling"
+COMPONENTS = (COMPONENT_READER, COMPONENT_VAD, COMPONENT_REALTIME, COMPONENT_MAIN)
+
+# threads: intra-op threads of the component's model, 0 for the library
+# default. cores: CPU ids its threads are pinned to, None for no pinning.
+Allocation = namedtuple("Allocation", ["threads", "cores"])
+UNPLANNED = Allocation(0, None)
+
+
+def available_cores():
+    """CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def set_thread_affinity(cores):
+    """
+    Pin the calling thread to `cores`. Threads it starts afterwards, such as
+    the thread pools of CTranslate2 and torch, inherit the pinning.
+
+    Returns:
+        set: The previous core set, or None if nothing was changed because
+            `cores` is empty or the platform has no affinity control.
+    """
+    if not cores:
+        return None
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("CPU affinity is not supported on this platform, cores are not pinned")
+        return None
+    previous = os.sched_getaffinity(0)
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError as e:
+        logger.warning(f"Could not pin thread to cores {sorted(cores)}: {e}")
+        return None
+    return previous
+
+
+@contextmanager
+def pinned(cores):
+    """Pin the calling thread while a component starts its thread pools."""
+    previous = set_thread_affinity(cores)
+    try:
+        yield
+    finally:
+        if previous is not None:
+            os.sched_setaffinity(0, previous)
+
+
+class ResourcePlan:
+    """
+    Thread count and optional core set for each component of the recorder.
+
+    Components are the audio reader, Silero VAD (torch intra-op threads),
+    the realtime model and the main model (CTranslate2 `cpu_threads`).
+    Resampling has no thread pool of its own; it runs on the reader and
+    recording threads. Components missing from the plan keep the library
+    defaults and are not pinned.
+
+    Args:
+        allocations (dict): Component name to Allocation, or to a dict with
+            "threads" and "cores" keys.
+    """
+    def __init__(self, allocations=None):
+        self.allocations = {}
+        for component, allocation in (allocations or {}).items():
+            if component not in COMPONENTS:
+                raise ValueError(f"Unknown component {component!r}, expected one of {COMPONENTS}")
+            if isinstance(allocation, dict):
+                allocation = Allocation(int(allocation.get("threads", 0)), allocation.get("cores"))
+            cores = sorted(allocation.cores) if allocation.cores else None
+            self.allocations[component] = Allocation(allocation.threads, cores)
+
+    @classmethod
+    def auto(cls, realtime: bool = True, pin: bool = False, cores=None):
+        """
+        Split the cores between the components without oversubscribing them.
+
+        The reader and Silero VAD share one core and Silero gets a single
+        thread. With a separate realtime model, a third of the remaining
+        cores goes to it and the rest to the main model; otherwise the main
+        model gets all remaining cores. On two cores or fewer nothing is
+        split, only the thread counts are capped.
+
+        Args:
+            realtime (bool): Whether a separate realtime model runs.
+            pin (bool): Also pin every component to its cores.
+            cores (list of int, optional): Cores to plan for; defaults to
+                the cores this process may use.
+        """
+        cores = list(cores) if cores is not None else available_cores()
+        if len(cores) <= 2:
+            allocations = {
+                COMPONENT_READER: Allocation(1, cores),
+                COMPONENT_VAD: Allocation(1, cores),
+                COMPONENT_MAIN: Allocation(len(cores), cores),
+            }
+            if realtime:
+                allocations[COMPONENT_REALTIME] = Allocation(1, cores)
+        else:
+            io_cores, rest = cores[:1], cores[1:]
+            realtime_count = max(1, len(rest) // 3) if realtime else 0
+            main_cores = rest[realtime_count:]
+            allocations = {
+                COMPONENT_READER: Allocation(1, io_cores),
+                COMPONENT_VAD: Allocation(1, io_cores),
+                COMPONENT_MAIN: Allocation(len(main_cores), main_cores),
+            }
+            if realtime:
+                allocations[COMPONENT_REALTIME] = Allocation(realtime_count, rest[:realtime_count])
+        if not pin:
+            allocations = {name: Allocation(allocation.threads, None)
+                           for name, allocation in allocations.items()}
+        return cls(allocations)
+
+    @classmethod
+    def from_option(cls, option, realtime: bool = True):
+        """Plan for the recorder's `resource_plan` option."""
+        if option is None:
+            return cls()
+        if isinstance(option, ResourcePlan):
+            return option
+        if option == "auto":
+            return cls.auto(realtime=realtime)
+        if isinstance(option, dict):
+            return cls(option)
+        raise ValueError(f"Invalid resource_plan {option!r}: expected None, 'auto', "
+                         "a dict or a ResourcePlan")
+
+    def get(self, component):
+        return self.allocations.get(component, UNPLANNED)
+
+    def threads(self, component):
+        return self.get(component).threads
+
+    def cores(self, component):
+        return self.get(component).cores
+
+    def describe(self):
+        if not self.allocations:
+            return "library defaults"
+        parts = []
+        for component, (threads, cores) in self.allocations.items():
+            pinning = f" on cores {','.join(map(str, cores))}" if cores else ""
+            parts.append(f"{component} {threads or 'default'} threads{pinning}")
+        return ", ".join(parts)
+
+
+class ComponentMeter:
+    """
+    Real-time factor of every component: processing seconds per second of
+    audio processed. Below 1 the component keeps up with live audio.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, component, processing_seconds, audio_seconds):
+        with self._lock:
+            calls, processing, audio = self._totals.get(component, (0, 0.0, 0.0))
+            self._totals[component] = (calls + 1, processing + processing_seconds, audio + audio_seconds)
+
+    def report(self):
+        with self._lock:
+            totals = dict(self._totals)
+        return {
+            component: {
+                "calls": calls,
+                "processing_seconds": round(processing, 3),
+                "audio_seconds": round(audio, 3),
+                "rtf": round(processing / audio, 4) if audio else None,
+            }
+            for component, (calls, processing, audio) in totals.items()
+        }
@@ -0,0 +1,219 @@
+# Shared-memory ring buffer for passing PCM audio chunks between processes
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import logging
+import numpy as np
+
+logger = logging.getLogger("realtimestt")
+
+# Header layout (int64 slots at the start of the shared segment)
+_HEADER_WRITE_SEQ = 0
+_HEADER_READ_SEQ = 1
+_HEADER_OVERRUNS = 2
+_HEADER_DROPPED = 3
+_HEADER_FIELDS = 8
+
+# Marker stored in a slot's sequence number while the producer rewrites it
+_SLOT_BUSY = -1
+
+
+class SharedRingBuffer:
+    """
+    Lock-free single-producer/single-consumer ring buffer for int16 PCM.
+
+    The buffer lives in a `multiprocessing.shared_memory` segment, so the
+    audio reader (thread or process) writes chunks directly into memory the
+    recording worker reads from. No chunk is pickled on the way.
+
+    Every written chunk gets a monotonically increasing sequence number. The
+    producer never blocks: when the consumer falls more than `slots` chunks
+    behind, the oldest chunks are overwritten and counted as overruns the
+    next time the consumer reads.
+    """
+    def __init__(self, slot_samples: int, slots: int = 256, name: str = None):
+        self.slot_samples = int(slot_samples)
+        self.slots = int(slots)
+        self._owner = name is None
+        size = self._segment_size(self.slot_samples, self.slots)
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._data_event = mp.Event() if self._owner else None
+        self._map_views()
+
+    @staticmethod
+    def _segment_size(slot_samples, slots):
+        header = _HEADER_FIELDS * 8
+        slot_meta = slots * 8 * 2  # sequence number + length per slot
+        payload = slots * slot_samples * 2
+        return header + slot_meta + payload
+
+    def _map_views(self):
+        buf = self._shm.buf
+        offset = 0
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += _HEADER_FIELDS * 8
+        self._slot_seq = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += self.slots * 8
+        self._slot_len = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += self.slots * 8
+        self._payload = np.ndarray((self.slots, self.slot_samples), dtype=np.int16, buffer=buf, offset=offset)
+        if self._owner:
+            self._header[:] = 0
+            self._slot_seq[:] = _SLOT_BUSY
+
+    def __getstate__(self):
+        # Child processes attach to the existing segment by name
+        return {
+            "name": self._shm.name,
+            "slot_samples": self.slot_samples,
+            "slots": self.slots,
+            "data_event": self._data_event,
+        }
+
+    def __setstate__(self, state):
+        self.slot_samples = state["slot_samples"]
+        self.slots = state["slots"]
+        self._owner = False
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._data_event = state["data_event"]
+        self._map_views()
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def written(self):
+        """Total number of chunks written by the producer."""
+        return int(self._header[_HEADER_WRITE_SEQ])
+
+    @property
+    def overruns(self):
+        """Chunks overwritten by the producer before the consumer read them."""
+        return int(self._header[_HEADER_OVERRUNS])
+
+    @property
+    def dropped(self):
+        """Chunks discarded by the consumer to stay within a latency limit."""
+        return int(self._header[_HEADER_DROPPED])
+
+    def pending(self):
+        """Number of chunks written but not yet consumed."""
+        pending = int(self._header[_HEADER_WRITE_SEQ] - self._header[_HEADER_READ_SEQ])
+        return min(pending, self.slots)
+
+    # ---------------------------------------------------------------- producer
+
+    def write(self, data):
+        """
+        Append PCM audio to the ring. Accepts bytes-like objects or int16
+        arrays; data longer than one slot is split over consecutive slots.
+        """
+        if isinstance(data, np.ndarray):
+            samples = data.astype(np.int16, copy=False).reshape(-1)
+        else:
+            samples = np.frombuffer(data, dtype=np.int16)
+
+        for start in range(0, len(samples), self.slot_samples):
+            piece = samples[start:start + self.slot_samples]
+            seq = int(self._header[_HEADER_WRITE_SEQ])
+            idx = seq % self.slots
+            self._slot_seq[idx] = _SLOT_BUSY
+            self._payload[idx, :len(piece)] = piece
+            self._slot_len[idx] = len(piece)
+            self._slot_seq[idx] = seq
+            self._header[_HEADER_WRITE_SEQ] = seq + 1
+
+        if self._data_event is not None and len(samples):
+            self._data_event.set()
+
+    # ---------------------------------------------------------------- consumer
+
+    def _skip_overrun(self):
+        write_seq = int(self._header[_HEADER_WRITE_SEQ])
+        read_seq = int(self._header[_HEADER_READ_SEQ])
+        lag = write_seq - read_seq
+        if lag > self.slots:
+            self._header[_HEADER_OVERRUNS] += lag - self.slots
+            self._header[_HEADER_READ_SEQ] = write_seq - self.slots
+        return write_seq
+
+    def read(self, timeout: float = None):
+        """
+        Read the next chunk.
+
+        Returns a tuple (sequence_number, int16 array) or None if no chunk
+        arrived within `timeout` seconds.
+        """
+        while True:
+            write_seq = self._skip_overrun()
+            read_seq = int(self._header[_HEADER_READ_SEQ])
+
+            if read_seq >= write_seq:
+                if timeout is None or timeout <= 0 or self._data_event is None:
+                    return None
+                self._data_event.clear()
+                # Re-check after clearing so a write in between is not missed
+                if int(self._header[_HEADER_WRITE_SEQ]) > read_seq:
+                    continue
+                if not self._data_event.wait(timeout):
+                    return None
+                timeout = 0
+                continue
+
+            idx = read_seq % self.slots
+            seq_before = int(self._slot_seq[idx])
+            length = int(self._slot_len[idx])
+            chunk = self._payload[idx, :length].copy()
+            seq_after = int(self._slot_seq[idx])
+
+            if seq_before != read_seq or seq_after != read_seq:
+                # The producer lapped us while copying; count it and resync
+                self._header[_HEADER_OVERRUNS] += 1
+                self._header[_HEADER_READ_SEQ] = read_seq + 1
+                continue
+
+            self._header[_HEADER_READ_SEQ] = read_seq + 1
+            return read_seq, chunk
+
+    def discard(self, keep: int = 0):
+        """
+        Drop the oldest pending chunks so that at most `keep` remain.
+
+        Returns the number of discarded chunks.
+        """
+        write_seq = self._skip_overrun()
+        read_seq = int(self._header[_HEADER_READ_SEQ])
+        excess = (write_seq - read_seq) - max(keep, 0)
+        if excess <= 0:
+            return 0
+        self._header[_HEADER_READ_SEQ] = read_seq + excess
+        self._header[_HEADER_DROPPED] += excess
+        return excess
+
+    def clear(self):
+        """Drop all pending chunks without counting them as dropped."""
+        self._header[_HEADER_READ_SEQ] = self._header[_HEADER_WRITE_SEQ]
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "pending": self.pending(),
+            "overruns": self.overruns,
+            "dropped": self.dropped,
+        }
+
+    def close(self):
+        """Detach from the segment; the creating side also unlinks it."""
+        self._header = self._slot_seq = self._slot_len = self._payload = None
+        try:
+            self._shm.close()
+        except Exception as error:
+            logger.debug(f"Error closing shared ring buffer: {error}")
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
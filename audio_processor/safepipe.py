@@ -1,5 +1,6 @@
 # Thread-safe pipe wrapper for inter-process communication
 import multiprocessing as mp
+from multiprocessing.connection import wait
 import queue
 import threading
 import logging
@@ -23,6 +24,12 @@ class ParentPipe:
     """
     Thread-safe wrapper for pipe operations.
     All operations are funneled through a single worker thread to prevent race conditions.
+
+    The worker sleeps in a selector (`multiprocessing.connection.wait`) over
+    the pipe and an internal wakeup pipe, so it uses no CPU while idle and
+    reacts to requests and incoming data immediately. With a receive
+    handler installed, incoming messages are delivered to the handler as
+    soon as they arrive instead of being polled for.
     """
     def __init__(self, parent_synthesize_pipe, worker_join_timeout: float = 2.0):
         self.name = "ParentPipe"
@@ -31,64 +38,125 @@ class ParentPipe:
         self._request_queue = queue.Queue()
         self._stop_event = threading.Event()
         self._worker_join_timeout = worker_join_timeout
+        self._receive_handler = None
+        self._wake_reader, self._wake_writer = mp.Pipe(duplex=False)
+        self._wake_lock = threading.Lock()
         self._worker_thread = threading.Thread(
             target=self._pipe_worker, name=f"{self.name}_Worker", daemon=True
         )
         self._worker_thread.start()
 
-    def _pipe_worker(self):
-        """Worker thread that processes all pipe operations sequentially."""
-        while not self._stop_event.is_set():
+    def _enqueue(self, request):
+        self._request_queue.put(request)
+        with self._wake_lock:
             try:
-                request = self._request_queue.get(timeout=0.1)
-            except queue.Empty:
-                continue
+                self._wake_writer.send_bytes(b"\0")
+            except (OSError, ValueError):
+                pass
 
-            if request.get("type") == "CLOSE":
-                result_queue = request.get("result_queue")
-                if result_queue:
-                    try:
-                        result_queue.put(True, timeout=0.5)
-                    except Exception:
-                        pass
-                break
+    def set_receive_handler(self, handler):
+        """
+        Deliver every incoming message to `handler(message)` on the worker
+        thread. If the pipe fails, the handler receives the exception and
+        the worker stops. `recv` and `poll` must not be used afterwards.
+        """
+        self._receive_handler = handler
+        self._enqueue({"type": "NOOP"})
 
+    def _handle_request(self, request):
+        """Runs one request. Returns False when the worker should stop."""
+        if request.get("type") == "CLOSE":
             result_queue = request.get("result_queue")
-            try:
-                request_type = request["type"]
-                
-                if request_type == "SEND":
-                    data = request["data"]
-                    self._pipe.send(data)
-                    if result_queue:
-                        result_queue.put(None)
-                        
-                elif request_type == "RECV":
-                    data = self._pipe.recv()
-                    if result_queue:
-                        result_queue.put(data)
-                        
-                elif request_type == "POLL":
-                    timeout = request.get("timeout", 0.0)
-                    result = self._pipe.poll(timeout)
-                    if result_queue:
-                        result_queue.put(result)
-                else:
-                    logger.debug(f"[{self.name}] Unknown request type: {request_type}")
-                    if result_queue:
-                        result_queue.put(None)
-                        
-            except (EOFError, BrokenPipeError, OSError) as error:
-                logger.debug(f"[{self.name}] Pipe closed or error: {error}")
+            if result_queue:
+                try:
+                    result_queue.put(True, timeout=0.5)
+                except Exception:
+                    pass
+            return False
+
+        result_queue = request.get("result_queue")
+        try:
+            request_type = request["type"]
+            
+            if request_type == "SEND":
+                data = request["data"]
+                self._pipe.send(data)
                 if result_queue:
-                    result_queue.put(error)
-                break
-            except Exception as error:
-                logger.exception(f"[{self.name}] Unexpected error in worker")
+                    result_queue.put(None)
+                    
+            elif request_type == "RECV":
+                data = self._pipe.recv()
+                if result_queue:
+                    result_queue.put(data)
+                    
+            elif request_type == "POLL":
+                timeout = request.get("timeout", 0.0)
+                result = self._pipe.poll(timeout)
                 if result_queue:
-                    result_queue.put(error)
+                    result_queue.put(result)
+            elif request_type == "NOOP":
+                pass
+            else:
+                logger.debug(f"[{self.name}] Unknown request type: {request_type}")
+                if result_queue:
+                    result_queue.put(None)
+                    
+        except (EOFError, BrokenPipeError, OSError) as error:
+            logger.debug(f"[{self.name}] Pipe closed or error: {error}")
+            if result_queue:
+                result_queue.put(error)
+            return False
+        except Exception as error:
+            logger.exception(f"[{self.name}] Unexpected error in worker")
+            if result_queue:
+                result_queue.put(error)
+            return False
+        return True
+
+    def _deliver_incoming(self):
+        """Receives one message for the receive handler."""
+        handler = self._receive_handler
+        try:
+            message = self._pipe.recv()
+        except (EOFError, BrokenPipeError, OSError) as error:
+            logger.debug(f"[{self.name}] Pipe closed or error: {error}")
+            handler(error)
+            return False
+        try:
+            handler(message)
+        except Exception:
+            logger.exception(f"[{self.name}] Error in receive handler")
+        return True
+
+    def _pipe_worker(self):
+        """Worker thread that processes all pipe operations sequentially."""
+        running = True
+        while running and not self._stop_event.is_set():
+            watched = [self._wake_reader]
+            if self._receive_handler is not None:
+                watched.append(self._pipe)
+            try:
+                ready = wait(watched)
+            except OSError as error:
+                logger.debug(f"[{self.name}] Wait failed: {error}")
                 break
 
+            if self._wake_reader in ready:
+                try:
+                    while self._wake_reader.poll():
+                        self._wake_reader.recv_bytes()
+                except (EOFError, OSError):
+                    break
+                while running:
+                    try:
+                        request = self._request_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    running = self._handle_request(request)
+
+            if running and self._pipe in ready and self._receive_handler is not None:
+                running = self._deliver_incoming()
+
         try:
             self._pipe.close()
         except Exception as error:
@@ -100,18 +168,24 @@ class ParentPipe:
         if self._closed:
             raise RuntimeError("ParentPipe already closed")
         result_queue = queue.Queue()
-        self._request_queue.put({"type": "SEND", "data": data, "result_queue": result_queue})
+        self._enqueue({"type": "SEND", "data": data, "result_queue": result_queue})
         try:
             return result_queue.get(timeout=timeout)
         except queue.Empty:
             raise TimeoutError("Send operation timed out")
 
+    def post(self, data):
+        """Queue data for sending without waiting for the send to happen."""
+        if self._closed:
+            raise RuntimeError("ParentPipe already closed")
+        self._enqueue({"type": "SEND", "data": data, "result_queue": None})
+
     def recv(self, timeout: float = None):
         """Receive data from the pipe."""
         if self._closed:
             raise RuntimeError("ParentPipe already closed")
         result_queue = queue.Queue()
-        self._request_queue.put({"type": "RECV", "result_queue": result_queue})
+        self._enqueue({"type": "RECV", "result_queue": result_queue})
         try:
             data = result_queue.get(timeout=timeout)
             return data
@@ -123,7 +197,7 @@ class ParentPipe:
         if self._closed:
             return False
         result_queue = queue.Queue()
-        self._request_queue.put({"type": "POLL", "timeout": timeout, "result_queue": result_queue})
+        self._enqueue({"type": "POLL", "timeout": timeout, "result_queue": result_queue})
         try:
             return result_queue.get(timeout=timeout + 0.1)
         except queue.Empty:
@@ -135,11 +209,16 @@ class ParentPipe:
             return
         self._closed = True
         result_queue = queue.Queue()
-        self._request_queue.put({"type": "CLOSE", "result_queue": result_queue})
+        self._enqueue({"type": "CLOSE", "result_queue": result_queue})
         self._stop_event.set()
         self._worker_thread.join(timeout=self._worker_join_timeout)
         if self._worker_thread.is_alive():
             logger.warning(f"[{self.name}] Worker thread did not exit within timeout")
+        for connection in (self._wake_reader, self._wake_writer):
+            try:
+                connection.close()
+            except Exception:
+                pass
 
 
 def SafePipe():
@@ -0,0 +1,136 @@
+# Incremental stabilization of successive realtime transcriptions
+from collections import namedtuple
+import os
+
+INIT_TAIL_MATCH_LENGTH = 10
+INIT_STABLE_HISTORY_CHARS = 200
+
+# Result of one stabilizer update:
+# - stable_delta: text written to the stable span at stable_start
+# - stable_reset: True if part of the stable span was replaced, stable_delta
+#   then holds the span from stable_start on
+# - unstable: text after the stable span that may still change
+# - text: stable span plus fresh text, as sent to the stabilized callback
+# - stable_start: position in the stable span where stable_delta goes;
+#   the span is cut there first
+StabilizerUpdate = namedtuple("StabilizerUpdate",
+                              ["stable_delta", "stable_reset", "unstable", "text", "stable_start"])
+
+
+class TextStabilizer:
+    """
+    Derives stable text from successive realtime transcriptions of the same
+    utterance.
+
+    Text that two consecutive transcriptions start with identically becomes
+    stable; the stable span only ever grows or has its end replaced.
+
+    History is bounded: the stabilizer keeps the length of the stable span
+    (the cursor), its last `history_chars` characters and the previous
+    transcription from that point on. Transcriptions are compared from the
+    cursor's history window onwards only, so memory and work per update do
+    not grow with the length of the utterance. The part of the stable span
+    before the window is taken from the newest transcription.
+
+    Args:
+        tail_match_length (int): Characters of the stable span searched for
+            in a transcription that does not continue it at the cursor.
+        history_chars (int): Characters of the stable span kept and
+            compared, at least `tail_match_length`.
+    """
+    def __init__(self, tail_match_length: int = INIT_TAIL_MATCH_LENGTH,
+                 history_chars: int = INIT_STABLE_HISTORY_CHARS):
+        self.tail_match_length = tail_match_length
+        self.history_chars = max(history_chars, tail_match_length)
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance."""
+        self.stable_length = 0
+        self.stable_tail = ""
+        self.previous_window = None
+        self.updates = 0
+
+    def _window_start(self):
+        return self.stable_length - len(self.stable_tail)
+
+    def _extend_stable(self, window):
+        """
+        Extend the stable span with the common prefix of the previous and
+        the current transcription, both given from the window start.
+
+        Returns:
+            tuple: (extension, reset) or None if the transcriptions
+                disagree inside the window.
+        """
+        previous = self.previous_window
+        known = len(self.stable_tail)
+        if len(previous) < known or len(window) < known:
+            return None
+        if previous[:known] != window[:known]:
+            return None
+        extension = os.path.commonprefix([previous[known:], window[known:]])
+        # Both agree on the window, but not with the remembered tail
+        reset = window[:known] != self.stable_tail
+        self.stable_tail = (window[:known] + extension)[-self.history_chars:]
+        self.stable_length += len(extension)
+        return extension, reset
+
+    def find_tail_match(self, text):
+        """
+        Position in `text` right after the last occurrence of the stable
+        span's last `tail_match_length` characters at or after the history
+        window, or -1 if it does not occur there.
+        """
+        length = self.tail_match_length
+        if len(self.stable_tail) < length or len(text) < length:
+            return -1
+        position = text.rfind(self.stable_tail[-length:], self._window_start())
+        return -1 if position < 0 else position + length
+
+    def update(self, text):
+        """
+        Feed the newest transcription of the utterance.
+
+        Args:
+            text (str): Full realtime transcription, stripped.
+
+        Returns:
+            StabilizerUpdate: Changes of the stable and unstable spans.
+        """
+        self.updates += 1
+        window_start = self._window_start()
+        window = text[window_start:]
+        tail_length = len(self.stable_tail)
+        stable_delta = ""
+        stable_start = self.stable_length
+        reset = False
+        if self.previous_window is not None:
+            extended = self._extend_stable(window)
+            if extended is not None:
+                stable_delta, reset = extended
+                if reset:
+                    # Only the window can differ from the remembered span
+                    stable_start = window_start
+                    stable_delta = window[:tail_length] + stable_delta
+
+        start = self._window_start()
+        self.previous_window = text[start:]
+
+        known = self.stable_length
+        if text[start:known] == self.stable_tail:
+            # The transcription continues the stable span at the cursor
+            return StabilizerUpdate(stable_delta, reset, text[known:], text, stable_start)
+
+        # The stable span is not empty here, else the text would continue it
+        head = text[:start]
+        matching_pos = self.find_tail_match(text)
+        if matching_pos < 0:
+            unstable = ""
+            output = head + self.stable_tail
+        else:
+            # Stable span plus the freshly transcribed part after it, built
+            # with a single copy of the text
+            unstable = text[matching_pos:]
+            output = "".join((head, self.stable_tail, unstable))
+        return StabilizerUpdate(stable_delta, reset, unstable, output, stable_start)
@@ -0,0 +1,148 @@
+# asyncio fan-out of recorder transcripts to any number of consumers
+from collections import namedtuple
+import threading
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("realtimestt")
+
+INIT_STREAM_QUEUE_SIZE = 64
+
+# Kinds of transcript events
+EVENT_REALTIME = "realtime"
+EVENT_STABILIZED = "stabilized"
+EVENT_FINAL = "final"
+
+# One transcript delivered to async consumers; timestamp is wall clock time
+TranscriptEvent = namedtuple("TranscriptEvent", ["kind", "text", "timestamp"])
+
+
+class _Subscription:
+    """
+    asyncio queue of one consumer, fed from recorder threads. Partials are
+    bounded by `max_queue`; finals and the end of stream are always queued.
+    """
+    def __init__(self, loop, partials, max_queue):
+        self.loop = loop
+        self.partials = partials
+        self.max_queue = max_queue
+        self.queue = asyncio.Queue()
+        self.dropped = 0
+
+    def offer(self, event):
+        # Runs on the consumer's event loop
+        if event is not None and event.kind != EVENT_FINAL \
+                and self.queue.qsize() >= self.max_queue:
+            # A slow consumer skips partials, newer ones will follow
+            self.dropped += 1
+            return
+        self.queue.put_nowait(event)
+
+
+class TranscriptHub:
+    """
+    Delivers transcripts of one recorder to asyncio consumers.
+
+    A single driver thread runs the recorder's blocking `text()` loop while
+    at least one consumer is subscribed, and realtime partials are published
+    from the realtime worker. Events reach each consumer's event loop with
+    `call_soon_threadsafe`, so consumers never block a thread of their own
+    and one process can serve many recorders.
+
+    Args:
+        recorder (AudioToTextRecorder): The recorder to drive.
+        max_queue (int): Pending events per consumer before partials are
+            dropped. Finals are never dropped; they are queued even when
+            this many events are pending.
+    """
+    def __init__(self, recorder, max_queue: int = INIT_STREAM_QUEUE_SIZE):
+        self.recorder = recorder
+        self.max_queue = max_queue
+        self._subscriptions = []
+        self._partial_subscribers = 0
+        self._lock = threading.Lock()
+        self._driver = None
+        self._closed = False
+        # Final produced while nobody listened, e.g. between two awaits of
+        # text_async; handed to the next consumer instead of being lost
+        self._pending_final = None
+
+    @property
+    def has_partial_subscribers(self):
+        """Whether any consumer wants partials; lets the recorder skip publishing them."""
+        return self._partial_subscribers > 0
+
+    def subscribe(self, loop, partials: bool = True):
+        subscription = _Subscription(loop, partials, self.max_queue)
+        with self._lock:
+            if self._closed:
+                loop.call_soon(subscription.offer, None)
+                return subscription
+            self._subscriptions.append(subscription)
+            self._partial_subscribers += partials
+            if self._pending_final is not None:
+                loop.call_soon(subscription.offer, self._pending_final)
+                self._pending_final = None
+            if self._driver is None or not self._driver.is_alive():
+                self._driver = threading.Thread(
+                    target=self._drive, name="TranscriptDriver", daemon=True)
+                self._driver.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+                self._partial_subscribers -= subscription.partials
+        if subscription.dropped:
+            logger.debug(f"Transcript consumer dropped {subscription.dropped} events")
+
+    def publish(self, kind, text):
+        """Hand an event to every interested consumer; safe from any thread."""
+        event = TranscriptEvent(kind, text, time.time())
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            if kind == EVENT_FINAL and not subscriptions:
+                self._pending_final = event
+                return
+        for subscription in subscriptions:
+            if kind != EVENT_FINAL and not subscription.partials:
+                continue
+            self._deliver(subscription, event)
+
+    @staticmethod
+    def _deliver(subscription, event):
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.offer, event)
+        except RuntimeError:
+            # The consumer's event loop is closed
+            pass
+
+    def _drive(self):
+        recorder = self.recorder
+        while True:
+            with self._lock:
+                if self._closed or not self._subscriptions:
+                    self._driver = None
+                    return
+            try:
+                text = recorder.text()
+            except Exception as e:
+                logger.error(f"Error in transcript driver: {e}", exc_info=True)
+                break
+            if recorder.is_shut_down:
+                break
+            if text:
+                self.publish(EVENT_FINAL, text)
+        self.close()
+
+    def close(self):
+        """End every consumer's stream."""
+        with self._lock:
+            self._closed = True
+            subscriptions = list(self._subscriptions)
+            self._subscriptions = []
+            self._partial_subscribers = 0
+        for subscription in subscriptions:
+            self._deliver(subscription, None)
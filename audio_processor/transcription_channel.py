@@ -0,0 +1,189 @@
+# Request-id multiplexed client side of the transcription worker pipe
+from concurrent.futures import Future
+import itertools
+import threading
+import logging
+
+logger = logging.getLogger("realtimestt")
+
+# Message kinds sent to the transcription worker
+REQUEST_TRANSCRIBE = "transcribe"
+REQUEST_CANCEL = "cancel"
+
+
+class TranscriptionChannel:
+    """
+    Tagged request/response protocol over the transcription worker pipe.
+
+    Every request gets a unique id and a `concurrent.futures.Future`.
+    Responses arrive as `(request_id, status, result)` through the pipe's
+    receive handler, which resolves the matching future as soon as the
+    response is readable. Any number of requests can be in flight and
+    callers only ever see their own response.
+
+    Cancelling a future tells the worker to drop the request if it has not
+    been transcribed yet; a response that still arrives for it is discarded.
+    `cancel(future)` asks the same but leaves the future pending until the
+    worker answers, for callers that need to know when the worker is done
+    with the request.
+
+    With an audio pool, the audio is placed in shared memory and only its
+    descriptor crosses the pipe. The worker answers every request exactly
+    once (cancelled ones with status 'cancelled'), and the segment goes back
+    to the pool when that answer arrives.
+
+    Args:
+        pipe: Parent end of the transcription pipe (a `SafePipe`).
+        audio_pool (SharedAudioPool): Pool for audio payloads, or None to
+            send arrays through the pipe.
+    """
+    def __init__(self, pipe, audio_pool=None):
+        self._pipe = pipe
+        self._audio_pool = audio_pool
+        self._leases = {}
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.completed = 0
+        self.cancelled = 0
+        self.discarded = 0
+        self._pipe.set_receive_handler(self._on_message)
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, audio, language, use_prompt, kind: str = "final", **options):
+        """
+        Send a transcription request.
+
+        Args:
+            audio (np.ndarray): float32 audio at 16 kHz.
+            language (str): Language code or empty for auto detection.
+            use_prompt (bool): Whether the initial prompt is used.
+            kind (str): Label used in log messages ("final", "early",
+                "realtime").
+            **options: Per-request decoding options for the worker:
+                `word_timestamps` (bool) returns a list of
+                (start, end, word, probability) tuples instead of text,
+                `initial_prompt` (str) replaces the configured prompt,
+                `text_prefix` (str) is prepended to the text before it is
+                normalized.
+
+        Returns:
+            Future: Resolves to `(transcription, info)`. Its `request_id`
+            attribute holds the id of the request.
+        """
+        request_id = next(self._ids)
+        future = Future()
+        future.request_id = request_id
+        future.kind = kind
+        payload = audio
+        if self._audio_pool is not None and audio is not None:
+            try:
+                payload = self._audio_pool.put(audio)
+            except Exception as e:
+                logger.warning(f"Shared audio handoff failed, sending audio through the pipe: {e}")
+        with self._lock:
+            self._pending[request_id] = future
+            if payload is not audio:
+                self._leases[request_id] = payload
+        future.add_done_callback(self._on_done)
+        try:
+            self._pipe.send((REQUEST_TRANSCRIBE, request_id, (payload, language, use_prompt, options)))
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            self._release(request_id)
+            future.set_exception(e)
+        return future
+
+    def _release(self, request_id):
+        with self._lock:
+            descriptor = self._leases.pop(request_id, None)
+        if descriptor is not None:
+            self._audio_pool.release(descriptor)
+
+    def _on_done(self, future):
+        if not future.cancelled():
+            return
+        with self._lock:
+            if self._pending.pop(future.request_id, None) is None:
+                return
+            self.cancelled += 1
+        logger.debug(f"Cancelling {future.kind} transcription request {future.request_id}")
+        try:
+            # Cancellation may happen on the pipe's own thread, never wait here
+            self._pipe.post((REQUEST_CANCEL, future.request_id, None))
+        except Exception as e:
+            logger.debug(f"Could not send cancellation for request {future.request_id}: {e}")
+
+    def cancel(self, future):
+        """
+        Ask the worker to drop a request. The future is resolved by the
+        worker's answer: cancelled if the request was dropped, with the
+        result if it had already been transcribed.
+        """
+        with self._lock:
+            if future.request_id not in self._pending:
+                return
+        try:
+            self._pipe.post((REQUEST_CANCEL, future.request_id, None))
+        except Exception as e:
+            logger.debug(f"Could not send cancellation for request {future.request_id}: {e}")
+
+    def _on_message(self, message):
+        if isinstance(message, Exception):
+            # SafePipe hands back pipe errors instead of raising
+            if not self._closed:
+                logger.debug(f"Transcription channel receive stopped: {message}")
+            self._fail_pending(ConnectionError("Transcription channel closed"))
+            return
+
+        request_id, status, result = message
+        self._release(request_id)
+        with self._lock:
+            future = self._pending.pop(request_id, None)
+        if future is None:
+            self.discarded += 1
+            return
+        if status == 'cancelled':
+            # Dropped after cancel(); the future was left pending until now
+            self.cancelled += 1
+            future.cancel()
+            return
+        if not future.set_running_or_notify_cancel():
+            self.discarded += 1
+            return
+        self.completed += 1
+        if status == 'success':
+            future.set_result(result)
+        else:
+            future.set_exception(Exception(result))
+
+    def _fail_pending(self, error):
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+        # The worker is gone, nobody reads the leased segments anymore
+        with self._lock:
+            request_ids = list(self._leases)
+        for request_id in request_ids:
+            self._release(request_id)
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "discarded": self.discarded,
+        }
+
+    def close(self):
+        self._closed = True
+        self._fail_pending(ConnectionError("Transcription channel closed"))
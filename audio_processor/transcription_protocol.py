@@ -0,0 +1,307 @@
+# Framed binary protocol of the shared transcription server, and its client
+from collections import namedtuple
+from concurrent.futures import Future
+import numpy as np
+import itertools
+import threading
+import logging
+import socket
+import struct
+import queue
+import json
+import os
+
+logger = logging.getLogger("realtimestt")
+
+INIT_CLIENT_MAX_IN_FLIGHT = 16
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+# Every frame: body length, message type, request id, then the body
+FRAME_HEADER = struct.Struct("!IBQ")
+JSON_LENGTH = struct.Struct("!I")
+
+# Message types
+MSG_TRANSCRIBE = 1  # client -> server: JSON header + float32 little-endian audio
+MSG_CANCEL = 2      # client -> server: empty body
+MSG_RESULT = 3      # server -> client: JSON {"status", "result"}
+
+# Stands in for faster_whisper's TranscriptionInfo on the client side; only
+# the fields the recorder reads cross the wire
+RemoteTranscriptionInfo = namedtuple("RemoteTranscriptionInfo", ["language", "language_probability"])
+
+
+def parse_address(address):
+    """
+    Split a server address into a socket family and a bind/connect address.
+
+    Accepted forms: "unix:/path/to/socket", "tcp:host:port" and "host:port".
+    """
+    if address.startswith("unix:"):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not supported on this platform")
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("tcp:"):
+        address = address[len("tcp:"):]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid transcription server address: {address!r}")
+    return socket.AF_INET, (host, int(port))
+
+
+def connect(address, timeout: float = 10.0):
+    family, target = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(target)
+    sock.settimeout(None)
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def listen(address, backlog: int = 64):
+    family, target = parse_address(address)
+    if family != socket.AF_INET and os.path.exists(target):
+        # Stale socket file of a previous server
+        os.unlink(target)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(target)
+    sock.listen(backlog)
+    return sock
+
+
+def send_frame(sock, message_type, request_id, body=b""):
+    sock.sendall(FRAME_HEADER.pack(len(body), message_type, request_id) + body)
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(min(size - len(data), 1 << 20))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def read_frame(sock):
+    """
+    Returns:
+        tuple: (message_type, request_id, body), or None once the peer has
+            closed the connection.
+    """
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    length, message_type, request_id = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes exceeds the limit of {MAX_FRAME_BYTES}")
+    body = _recv_exact(sock, length) if length else b""
+    if body is None:
+        return None
+    return message_type, request_id, body
+
+
+def encode_request(audio, language, use_prompt, kind, options):
+    header = json.dumps({
+        "language": language or "",
+        "use_prompt": bool(use_prompt),
+        "kind": kind,
+        "options": options,
+    }).encode("utf-8")
+    samples = np.ascontiguousarray(audio, dtype="<f4")
+    return JSON_LENGTH.pack(len(header)) + header + samples.tobytes()
+
+
+def decode_request(body):
+    """
+    Returns:
+        tuple: (audio, language, use_prompt, kind, options)
+    """
+    (length,) = JSON_LENGTH.unpack_from(body)
+    header = json.loads(body[JSON_LENGTH.size:JSON_LENGTH.size + length])
+    audio = np.frombuffer(body, dtype="<f4", offset=JSON_LENGTH.size + length).astype(np.float32)
+    return audio, header["language"], header["use_prompt"], header["kind"], header["options"]
+
+
+def encode_result(status, result):
+    if status == "success":
+        transcription, info = result
+        result = {
+            "transcription": transcription,
+            "language": getattr(info, "language", None),
+            "language_probability": getattr(info, "language_probability", 0.0),
+        }
+    return json.dumps({"status": status, "result": result}).encode("utf-8")
+
+
+def decode_result(body):
+    """
+    Returns:
+        tuple: (status, result) where a successful result is
+            `(transcription, RemoteTranscriptionInfo)`, as from the worker.
+    """
+    message = json.loads(body)
+    status, result = message["status"], message["result"]
+    if status == "success":
+        transcription = result["transcription"]
+        if isinstance(transcription, list):
+            # Word timestamps arrive as lists
+            transcription = [tuple(word) for word in transcription]
+        info = RemoteTranscriptionInfo(result["language"], result["language_probability"])
+        result = (transcription, info)
+    return status, result
+
+
+class RemoteTranscriptionChannel:
+    """
+    `TranscriptionChannel` counterpart that sends requests to a shared
+    transcription server instead of a worker owned by this recorder.
+
+    Requests are written by a sender thread and answered through a receiver
+    thread, so neither `submit` nor cancelling a future ever waits on the
+    socket. At most `max_in_flight` requests are outstanding; `submit`
+    blocks beyond that, which passes the server's backpressure on to the
+    caller.
+
+    Args:
+        address (str): Server address, see `parse_address`.
+        max_in_flight (int): Outstanding requests before `submit` blocks.
+        connect_timeout (float): Seconds to wait for the connection.
+    """
+    def __init__(self, address, max_in_flight: int = INIT_CLIENT_MAX_IN_FLIGHT,
+                 connect_timeout: float = 10.0):
+        self.address = address
+        self._sock = connect(address, timeout=connect_timeout)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._outgoing = queue.Queue()
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.completed = 0
+        self.cancelled = 0
+        self.discarded = 0
+        self._sender = threading.Thread(target=self._send_loop, name="RemoteTranscriptionSender", daemon=True)
+        self._receiver = threading.Thread(target=self._receive_loop, name="RemoteTranscriptionReceiver", daemon=True)
+        self._sender.start()
+        self._receiver.start()
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, audio, language, use_prompt, kind: str = "final", **options):
+        """
+        Send a transcription request; same contract as
+        `TranscriptionChannel.submit`.
+
+        Returns:
+            Future: Resolves to `(transcription, RemoteTranscriptionInfo)`.
+        """
+        request_id = next(self._ids)
+        future = Future()
+        future.request_id = request_id
+        future.kind = kind
+        if audio is None or self._closed:
+            future.set_exception(ConnectionError("Transcription server connection closed")
+                                 if self._closed else ValueError("No audio to transcribe"))
+            return future
+        while not self._slots.acquire(timeout=0.5):
+            if self._closed:
+                future.set_exception(ConnectionError("Transcription server connection closed"))
+                return future
+        with self._lock:
+            self._pending[request_id] = future
+        future.add_done_callback(self._on_done)
+        self._outgoing.put((MSG_TRANSCRIBE, request_id,
+                            encode_request(audio, language, use_prompt, kind, options)))
+        return future
+
+    def _on_done(self, future):
+        if not future.cancelled():
+            return
+        with self._lock:
+            if future.request_id not in self._pending:
+                return
+            self.cancelled += 1
+        logger.debug(f"Cancelling {future.kind} transcription request {future.request_id}")
+        # The server answers the cancelled request, which frees its slot
+        self._outgoing.put((MSG_CANCEL, future.request_id, b""))
+
+    def _send_loop(self):
+        while True:
+            frame = self._outgoing.get()
+            if frame is None:
+                return
+            try:
+                send_frame(self._sock, *frame)
+            except OSError as e:
+                if not self._closed:
+                    logger.error(f"Transcription server send failed: {e}")
+                self._fail_pending(ConnectionError("Transcription server connection lost"))
+                return
+
+    def _receive_loop(self):
+        try:
+            while True:
+                frame = read_frame(self._sock)
+                if frame is None:
+                    break
+                message_type, request_id, body = frame
+                if message_type != MSG_RESULT:
+                    continue
+                status, result = decode_result(body)
+                self._resolve(request_id, status, result)
+        except (OSError, ValueError) as e:
+            if not self._closed:
+                logger.error(f"Transcription server receive failed: {e}")
+        if not self._closed:
+            logger.warning(f"Transcription server {self.address} closed the connection")
+        self._fail_pending(ConnectionError("Transcription server connection lost"))
+
+    def _resolve(self, request_id, status, result):
+        with self._lock:
+            future = self._pending.pop(request_id, None)
+        if future is None:
+            return
+        self._slots.release()
+        if status == 'cancelled' or not future.set_running_or_notify_cancel():
+            self.discarded += 1
+            return
+        self.completed += 1
+        if status == 'success':
+            future.set_result(result)
+        else:
+            future.set_exception(Exception(result))
+
+    def _fail_pending(self, error):
+        self._closed = True
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            self._slots.release()
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "discarded": self.discarded,
+        }
+
+    def close(self):
+        self._closed = True
+        self._outgoing.put(None)
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._fail_pending(ConnectionError("Transcription server connection closed"))
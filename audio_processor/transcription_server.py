@@ -0,0 +1,519 @@
+# Host-level transcription service: one resident model shared by many recorders
+# Usage: python transcription_server.py --listen unix:/tmp/realtimestt.sock --model tiny
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+import threading
+import argparse
+import logging
+import queue
+import time
+
+from transcription_protocol import (
+    MSG_TRANSCRIBE, MSG_CANCEL, MSG_RESULT, RemoteTranscriptionInfo,
+    listen, send_frame, read_frame, decode_request, encode_result,
+)
+
+logger = logging.getLogger("realtimestt")
+
+SAMPLE_RATE = 16000
+INIT_SERVER_ADDRESS = "tcp:127.0.0.1:43007"
+INIT_SERVER_MAX_IN_FLIGHT = 8
+INIT_SESSION_MAX_PENDING = 4
+INIT_STAND_IN_REALTIME_FACTOR = 0.05
+
+
+class WorkerBackend:
+    """
+    Runs the recorder's `TranscriptionWorker` in a child process and submits
+    requests through a `TranscriptionChannel`, so every session shares the
+    worker's model, batching and shared-memory audio handoff.
+
+    Keyword arguments match the recorder's transcription options.
+    """
+    def __init__(self, model="tiny", download_root=None, compute_type="default",
+                 gpu_device_index=0, device="cuda", beam_size=5, initial_prompt=None,
+                 suppress_tokens=[-1], batch_size=16, faster_whisper_vad_filter=True,
+                 normalize_audio=False, batch_window=0.02, long_form_threshold=0.0,
+                 latency_target=0.0, fallback_model=None):
+        # The worker pulls in torch and faster_whisper; stand-in servers
+        # never need them
+        import torch
+        import torch.multiprocessing as mp
+        from safepipe import SafePipe
+        from audio_pool import SharedAudioPool
+        from transcription_channel import TranscriptionChannel
+        from audio_recorder import AudioToTextRecorder
+
+        device = "cuda" if device == "cuda" and torch.cuda.is_available() else "cpu"
+        self.ready_event = mp.Event()
+        self.shutdown_event = mp.Event()
+        self.interrupt_stop_event = mp.Event()
+        self.pipe, child_pipe = SafePipe()
+        self.stdout_pipe, child_stdout_pipe = SafePipe()
+        self.audio_pool = SharedAudioPool()
+        self.channel = TranscriptionChannel(self.pipe, audio_pool=self.audio_pool)
+        self.process = mp.Process(
+            target=AudioToTextRecorder._transcription_worker,
+            args=(child_pipe, child_stdout_pipe, model, download_root, compute_type,
+                  gpu_device_index, device, self.ready_event, self.shutdown_event,
+                  self.interrupt_stop_event, beam_size, initial_prompt, suppress_tokens,
+                  batch_size, faster_whisper_vad_filter, normalize_audio, batch_window,
+                  long_form_threshold),
+            kwargs=dict(latency_target=latency_target, fallback_model_path=fallback_model),
+        )
+        self.process.start()
+        self.stdout_pipe.set_receive_handler(self._on_stdout_message)
+        logger.info(f"Waiting for transcription model {model} on {device}")
+        self.ready_event.wait()
+        logger.info("Transcription model ready")
+
+    @staticmethod
+    def _on_stdout_message(message):
+        if not isinstance(message, Exception):
+            logger.info(f"Transcription worker: {message}")
+
+    def submit(self, audio, language, use_prompt, kind="final", **options):
+        return self.channel.submit(audio, language, use_prompt, kind=kind, **options)
+
+    def cancel(self, future):
+        self.channel.cancel(future)
+
+    def stats(self):
+        return {"channel": self.channel.stats(), "audio_pool": self.audio_pool.stats()}
+
+    def close(self):
+        self.shutdown_event.set()
+        self.process.join(timeout=10)
+        if self.process.is_alive():
+            logger.warning("Transcription worker did not terminate in time. Terminating forcefully.")
+            self.process.terminate()
+        self.channel.close()
+        self.audio_pool.close()
+        self.pipe.close()
+        self.stdout_pipe.close()
+
+
+class StandInBackend:
+    """
+    Model-free backend for tests and load experiments.
+
+    Pending requests are taken up to `max_batch` at a time, like the worker
+    batches them, and one batch takes `realtime_factor` times the duration
+    of its longest utterance. The transcription describes the audio, e.g.
+    "final 1.50 seconds", with word timestamps it is a single word.
+
+    Args:
+        realtime_factor (float): Decode time per second of audio.
+        max_batch (int): Requests decoded together.
+    """
+    def __init__(self, realtime_factor: float = INIT_STAND_IN_REALTIME_FACTOR,
+                 max_batch: int = INIT_SERVER_MAX_IN_FLIGHT):
+        self.realtime_factor = realtime_factor
+        self.max_batch = max_batch
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.batches_run = 0
+        self.requests_served = 0
+        self._thread = threading.Thread(target=self._run, name="StandInTranscriber", daemon=True)
+        self._thread.start()
+
+    def submit(self, audio, language, use_prompt, kind="final", **options):
+        future = Future()
+        future.kind = kind
+        with self._condition:
+            self._pending.append((future, audio, language, kind, options))
+            self._condition.notify()
+        return future
+
+    def cancel(self, future):
+        """Drop a request that is still waiting; a running one is answered."""
+        with self._condition:
+            for request in self._pending:
+                if request[0] is future:
+                    self._pending.remove(request)
+                    break
+            else:
+                return
+        future.cancel()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    break
+                batch = [self._pending.popleft()
+                         for _ in range(min(self.max_batch, len(self._pending)))]
+            batch = [request for request in batch if request[0].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            longest = max(len(audio) for _, audio, _, _, _ in batch) / SAMPLE_RATE
+            time.sleep(self.realtime_factor * longest)
+            self.batches_run += 1
+            self.requests_served += len(batch)
+            for future, audio, language, kind, options in batch:
+                duration = len(audio) / SAMPLE_RATE
+                info = RemoteTranscriptionInfo(language or "en", 1.0)
+                if options.get("word_timestamps"):
+                    future.set_result(([(0.0, duration, " stand-in", 1.0)], info))
+                else:
+                    future.set_result((f"{kind} {duration:.2f} seconds", info))
+        with self._condition:
+            pending, self._pending = list(self._pending), deque()
+        for future, *_ in pending:
+            future.cancel()
+
+    def stats(self):
+        return {"batches_run": self.batches_run, "requests_served": self.requests_served}
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=1.0)
+
+
+class _Session:
+    """One connected recorder: its socket, queued requests and counters."""
+    def __init__(self, session_id, sock, max_pending):
+        self.session_id = session_id
+        self.sock = sock
+        # Answers waiting for the session's sender thread
+        self.outbox = queue.Queue()
+        self.max_pending = max_pending
+        # Requests queued or running, at most max_pending
+        self.admitted = 0
+        # Requests read while the session was full, admitted as slots free
+        self.parked = deque()
+        self.queued = deque()
+        self.running = {}
+        self.closed = False
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+
+    def stats(self):
+        answered = self.completed + self.failed
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "parked": len(self.parked),
+            "queued": len(self.queued),
+            "running": len(self.running),
+            "mean_queue_delay": self.total_queue_delay / answered if answered else 0.0,
+            "max_queue_delay": self.max_queue_delay,
+        }
+
+
+class TranscriptionServer:
+    """
+    Serves transcription requests of many recorder sessions with one backend.
+
+    Every connection is a session. Its requests wait in a per-session queue,
+    and the scheduler hands them to the backend round-robin, one request per
+    session per turn, so a session with a long backlog cannot starve the
+    others. At most `max_in_flight` requests are at the backend at a time,
+    enough to fill the worker's batches.
+
+    Backpressure: a session may have `session_max_pending` requests queued
+    or running. Further requests are parked until a slot frees, and once
+    as many are parked the server stops reading its socket, so the client's
+    sends stall instead of the server buffering without bound. Cancels sent
+    while the session is full are still read and can free slots.
+
+    Every request is answered exactly once, with status 'success', 'error'
+    or 'cancelled'. Answers are sent by a sender thread per session, so a
+    slow client never holds up the scheduler or other sessions.
+
+    A request being decoded keeps its backend slot until the backend
+    answers it, also when it was cancelled.
+
+    Args:
+        address (str): "unix:/path" or "tcp:host:port" to listen on.
+        backend: `WorkerBackend`, `StandInBackend` or any object with
+            `submit(audio, language, use_prompt, kind, **options)` returning
+            a Future, `cancel(future)` that resolves the future once the
+            request is dropped or answered, `stats()` and `close()`.
+        max_in_flight (int): Requests handed to the backend at a time.
+        session_max_pending (int): Requests queued or running per session,
+            and requests parked before its socket is no longer read.
+    """
+    def __init__(self, address, backend, max_in_flight: int = INIT_SERVER_MAX_IN_FLIGHT,
+                 session_max_pending: int = INIT_SESSION_MAX_PENDING):
+        self.address = address
+        self.backend = backend
+        self.max_in_flight = max_in_flight
+        self.session_max_pending = session_max_pending
+        self._condition = threading.Condition()
+        self._ready = deque()
+        self._sessions = {}
+        self._next_session_id = 1
+        self._in_flight = 0
+        self._stopped = False
+        self._stop_event = threading.Event()
+        self._listener = None
+        self._threads = []
+
+    def start(self):
+        self._listener = listen(self.address)
+        for target, name in ((self._accept_loop, "TranscriptionServerAccept"),
+                             (self._schedule_loop, "TranscriptionServerScheduler")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Transcription server listening on {self.address}")
+        return self
+
+    def serve_forever(self):
+        self.start()
+        try:
+            self._stop_event.wait()
+        except KeyboardInterrupt:
+            logger.info("KeyboardInterrupt in transcription server")
+        finally:
+            self.stop()
+
+    def _accept_loop(self):
+        while not self._stopped:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                break
+            with self._condition:
+                session = _Session(self._next_session_id, sock, self.session_max_pending)
+                self._next_session_id += 1
+                self._sessions[session.session_id] = session
+            logger.info(f"Transcription session {session.session_id} connected")
+            threading.Thread(target=self._session_loop, args=(session,),
+                             name=f"TranscriptionSession-{session.session_id}", daemon=True).start()
+            threading.Thread(target=self._send_loop, args=(session,),
+                             name=f"TranscriptionSender-{session.session_id}", daemon=True).start()
+
+    def _session_loop(self, session):
+        try:
+            while not self._stopped:
+                with self._condition:
+                    # Backpressure: no further reads while too many are parked
+                    while len(session.parked) >= session.max_pending and not self._stopped:
+                        self._condition.wait(0.5)
+                if self._stopped:
+                    return
+                frame = read_frame(session.sock)
+                if frame is None:
+                    break
+                message_type, request_id, body = frame
+                if message_type == MSG_TRANSCRIBE:
+                    self._enqueue(session, request_id, decode_request(body))
+                elif message_type == MSG_CANCEL:
+                    self._cancel(session, request_id)
+                else:
+                    logger.warning(f"Session {session.session_id} sent unknown message type {message_type}")
+        except (OSError, ValueError) as e:
+            logger.info(f"Transcription session {session.session_id} failed: {e}")
+        finally:
+            self._close_session(session)
+
+    def _enqueue(self, session, request_id, request):
+        with self._condition:
+            session.submitted += 1
+            if session.admitted < session.max_pending:
+                session.admitted += 1
+                self._admit(session, (request_id, request, time.time()))
+            else:
+                session.parked.append((request_id, request, time.time()))
+
+    def _admit(self, session, queued):
+        """Queue a request for the scheduler. Called with the condition held."""
+        if not session.queued:
+            self._ready.append(session)
+        session.queued.append(queued)
+        self._condition.notify_all()
+
+    def _release_slot(self, session):
+        """Hand a freed slot to the next parked request. Called with the condition held."""
+        if session.parked and not session.closed:
+            self._admit(session, session.parked.popleft())
+        else:
+            session.admitted -= 1
+            self._condition.notify_all()
+
+    def _cancel(self, session, request_id):
+        future = None
+        with self._condition:
+            for waiting in (session.queued, session.parked):
+                found = next((queued for queued in waiting if queued[0] == request_id), None)
+                if found is not None:
+                    waiting.remove(found)
+                    session.cancelled += 1
+                    if waiting is session.queued:
+                        self._release_slot(session)
+                    else:
+                        # Lets the reader go on if it waits for parking room
+                        self._condition.notify_all()
+                    break
+            else:
+                future = session.running.get(request_id)
+        if found is None:
+            if future is not None:
+                # Answered from the future's done callback, once the backend
+                # has dropped or finished the request
+                self.backend.cancel(future)
+            return
+        self._reply(session, request_id, 'cancelled', None)
+
+    def _schedule_loop(self):
+        while True:
+            with self._condition:
+                while not self._stopped and (not self._ready or self._in_flight >= self.max_in_flight):
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                session = self._ready.popleft()
+                if session.closed or not session.queued:
+                    continue
+                request_id, request, received_at = session.queued.popleft()
+                if session.queued:
+                    # Back of the line, the next session gets the next turn
+                    self._ready.append(session)
+                self._in_flight += 1
+                delay = time.time() - received_at
+                session.total_queue_delay += delay
+                session.max_queue_delay = max(session.max_queue_delay, delay)
+
+            audio, language, use_prompt, kind, options = request
+            try:
+                future = self.backend.submit(audio, language, use_prompt, kind=kind, **options)
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+            with self._condition:
+                session.running[request_id] = future
+            future.add_done_callback(partial(self._on_done, session, request_id))
+
+    def _on_done(self, session, request_id, future):
+        with self._condition:
+            session.running.pop(request_id, None)
+            self._in_flight -= 1
+            self._condition.notify_all()
+            if future.cancelled():
+                session.cancelled += 1
+            elif future.exception() is not None:
+                session.failed += 1
+            else:
+                session.completed += 1
+            self._release_slot(session)
+        if future.cancelled():
+            self._reply(session, request_id, 'cancelled', None)
+        elif future.exception() is not None:
+            self._reply(session, request_id, 'error', str(future.exception()))
+        else:
+            self._reply(session, request_id, 'success', future.result())
+
+    def _reply(self, session, request_id, status, result):
+        if not session.closed:
+            session.outbox.put((request_id, status, result))
+
+    def _send_loop(self, session):
+        while True:
+            answer = session.outbox.get()
+            if answer is None:
+                return
+            request_id, status, result = answer
+            try:
+                send_frame(session.sock, MSG_RESULT, request_id, encode_result(status, result))
+            except (OSError, TypeError, ValueError) as e:
+                logger.debug(f"Could not answer request {request_id} of session {session.session_id}: {e}")
+
+    def _close_session(self, session):
+        with self._condition:
+            if session.closed:
+                return
+            session.closed = True
+            session.queued.clear()
+            session.parked.clear()
+            running = list(session.running.values())
+            self._sessions.pop(session.session_id, None)
+        session.outbox.put(None)
+        for future in running:
+            self.backend.cancel(future)
+        try:
+            session.sock.close()
+        except OSError:
+            pass
+        logger.info(f"Transcription session {session.session_id} closed: {session.stats()}")
+
+    def stats(self):
+        with self._condition:
+            return {
+                "in_flight": self._in_flight,
+                "sessions": {session_id: session.stats() for session_id, session in self._sessions.items()},
+                "backend": self.backend.stats(),
+            }
+
+    def stop(self):
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._stop_event.set()
+            self._condition.notify_all()
+            sessions = list(self._sessions.values())
+        if self._listener is not None:
+            self._listener.close()
+        for session in sessions:
+            try:
+                session.sock.shutdown(2)
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        logger.info(f"Transcription server stopped: {self.stats()}")
+        self.backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared transcription server")
+    parser.add_argument("--listen", default=INIT_SERVER_ADDRESS,
+                        help='"unix:/path/to/socket" or "tcp:host:port"')
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--compute-type", default="default")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batch-window", type=float, default=0.02,
+                        help="seconds the worker waits to fill a batch")
+    parser.add_argument("--long-form-threshold", type=float, default=0.0,
+                        help="seconds above which recordings are split and decoded in parallel")
+    parser.add_argument("--final-latency-target", type=float, default=0.0,
+                        help="seconds per request before beam size and model are degraded, 0 to disable")
+    parser.add_argument("--fallback-model", default=None,
+                        help="smaller model used at the lowest quality level")
+    parser.add_argument("--max-in-flight", type=int, default=INIT_SERVER_MAX_IN_FLIGHT)
+    parser.add_argument("--session-max-pending", type=int, default=INIT_SESSION_MAX_PENDING)
+    parser.add_argument("--stand-in", action="store_true",
+                        help="serve fake transcriptions without loading a model")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="RealTimeSTT: %(name)s - %(levelname)s - %(message)s")
+    if args.stand_in:
+        backend = StandInBackend(max_batch=args.max_in_flight)
+    else:
+        backend = WorkerBackend(
+            model=args.model, device=args.device, compute_type=args.compute_type,
+            beam_size=args.beam_size, batch_size=args.batch_size, batch_window=args.batch_window,
+            long_form_threshold=args.long_form_threshold,
+            latency_target=args.final_latency_target, fallback_model=args.fallback_model)
+    TranscriptionServer(args.listen, backend, max_in_flight=args.max_in_flight,
+                        session_max_pending=args.session_max_pending).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# Growable int16 buffer holding the audio of the utterance being recorded
+import threading
+import numpy as np
+
+INT16_MAX_ABS_VALUE = 32768.0
+INIT_CAPACITY_SECONDS = 10
+
+
+class UtteranceBuffer:
+    """
+    Preallocated, amortized-growth int16 buffer for recorded audio.
+
+    Replaces a list of byte chunks that had to be joined and converted to
+    float32 on every read. A float32 mirror is kept up to date as chunks are
+    appended, so readers get zero-copy views of the whole utterance in
+    either format.
+
+    Views returned by `pcm()` and `audio()` stay valid until the next
+    `clear()`: storage that has been handed out is never written over, a
+    relocation or clear moves to fresh arrays instead.
+    """
+    def __init__(self, sample_rate: int = 16000, initial_capacity: int = None):
+        self.sample_rate = sample_rate
+        if initial_capacity is None:
+            initial_capacity = sample_rate * INIT_CAPACITY_SECONDS
+        self._lock = threading.Lock()
+        self._allocate(max(int(initial_capacity), 1))
+
+    def _allocate(self, capacity):
+        self._pcm = np.zeros(capacity, dtype=np.int16)
+        self._float = np.zeros(capacity, dtype=np.float32)
+        self._start = 0
+        self._end = 0
+        self._exported = False
+
+    def _reserve(self, samples):
+        """Make room for `samples` more samples after the current end."""
+        length = self._end - self._start
+        capacity = len(self._pcm)
+        if self._end + samples <= capacity:
+            return
+        new_capacity = capacity
+        while length + samples > new_capacity:
+            new_capacity *= 2
+        pcm = self._pcm[self._start:self._end]
+        audio = self._float[self._start:self._end]
+        if new_capacity == capacity and not self._exported:
+            # Enough room once the trimmed head is dropped; compact in place
+            self._pcm[:length] = pcm
+            self._float[:length] = audio
+        else:
+            self._pcm = np.zeros(new_capacity, dtype=np.int16)
+            self._float = np.zeros(new_capacity, dtype=np.float32)
+            self._pcm[:length] = pcm
+            self._float[:length] = audio
+            self._exported = False
+        self._start = 0
+        self._end = length
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __bool__(self):
+        return self._end > self._start
+
+    @property
+    def duration(self):
+        """Length of the buffered audio in seconds."""
+        return len(self) / self.sample_rate
+
+    def append(self, data):
+        """Append a chunk given as raw int16 bytes or an int16 array."""
+        if isinstance(data, np.ndarray):
+            samples = data.astype(np.int16, copy=False).reshape(-1)
+        else:
+            samples = np.frombuffer(data, dtype=np.int16)
+        count = len(samples)
+        if not count:
+            return
+        with self._lock:
+            self._reserve(count)
+            end = self._end + count
+            self._pcm[self._end:end] = samples
+            np.multiply(samples, 1.0 / INT16_MAX_ABS_VALUE, out=self._float[self._end:end],
+                        casting='unsafe')
+            self._end = end
+
+    def extend(self, chunks):
+        """Append several chunks in order."""
+        for chunk in chunks:
+            self.append(chunk)
+
+    def pcm(self):
+        """Zero-copy int16 view of the buffered audio."""
+        with self._lock:
+            self._exported = True
+            return self._pcm[self._start:self._end]
+
+    def audio(self):
+        """Zero-copy float32 view of the buffered audio, scaled to [-1, 1)."""
+        with self._lock:
+            self._exported = True
+            return self._float[self._start:self._end]
+
+    def tobytes(self):
+        with self._lock:
+            return self._pcm[self._start:self._end].tobytes()
+
+    def trim_start(self, samples: int):
+        """Drop `samples` samples from the beginning in O(1)."""
+        with self._lock:
+            self._start = min(self._start + max(int(samples), 0), self._end)
+
+    def keep_last(self, samples: int):
+        """Keep only the last `samples` samples in O(1)."""
+        with self._lock:
+            self._start = max(self._end - max(int(samples), 0), self._start)
+
+    def clear(self):
+        with self._lock:
+            if self._exported:
+                self._allocate(len(self._pcm))
+            else:
+                self._start = self._end = 0
+
+    def copy(self):
+        """Independent buffer holding a copy of the buffered audio."""
+        with self._lock:
+            length = self._end - self._start
+            duplicate = UtteranceBuffer(self.sample_rate, initial_capacity=max(length, 1))
+            duplicate._pcm[:length] = self._pcm[self._start:self._end]
+            duplicate._float[:length] = self._float[self._start:self._end]
+            duplicate._end = length
+            return duplicate
@@ -0,0 +1,95 @@
+# Single-pass conversion of recorded chunks into 16 kHz VAD input
+import numpy as np
+from resampler import StreamingResampler
+
+VAD_SAMPLE_RATE = 16000
+WEBRTC_FRAME_LENGTH = VAD_SAMPLE_RATE // 100  # 10 ms frames
+WEBRTC_FRAME_BYTES = 2 * WEBRTC_FRAME_LENGTH
+
+
+class VADChunk:
+    """
+    One recorded chunk as 16 kHz int16 PCM, with its bytes converted at most
+    once and shared by WebRTC and Silero.
+    """
+    __slots__ = ("seq", "pcm", "_bytes")
+
+    def __init__(self, seq, pcm, data=None):
+        self.seq = seq
+        self.pcm = pcm
+        self._bytes = data
+
+    @property
+    def num_frames(self):
+        return len(self.pcm) // WEBRTC_FRAME_LENGTH
+
+    @property
+    def bytes(self):
+        """Raw int16 bytes of the 16 kHz chunk, converted once."""
+        if self._bytes is None:
+            self._bytes = self.pcm.tobytes()
+        return self._bytes
+
+
+class VADIngest:
+    """
+    Converts every chunk of the recorded stream to 16 kHz int16 exactly
+    once. At 16 kHz input the chunk is passed through: a zero-copy view of
+    its bytes, which are kept for WebRTC. Other rates go through a
+    streaming resampler, so every chunk must be passed in stream order.
+    """
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._resampler = None
+        if sample_rate != VAD_SAMPLE_RATE:
+            self._resampler = StreamingResampler(sample_rate, VAD_SAMPLE_RATE)
+
+    def process(self, seq, chunk):
+        """
+        Args:
+            seq (int): Sequence number of the chunk.
+            chunk (np.ndarray or bytes): int16 PCM at the recorder rate.
+                Pass bytes if the caller has them anyway, so a 16 kHz chunk
+                is never converted back to bytes for WebRTC.
+
+        Returns:
+            VADChunk: The 16 kHz chunk.
+        """
+        data = None
+        if not isinstance(chunk, np.ndarray):
+            data = chunk
+            chunk = np.frombuffer(chunk, dtype=np.int16)
+        if self._resampler is None:
+            return VADChunk(seq, chunk, data)
+        out = np.empty(self._resampler.output_length(len(chunk)), dtype=np.int16)
+        return VADChunk(seq, self._resampler.process(chunk, out=out))
+
+
+def webrtc_frame_decisions(vad_model, chunk: VADChunk, stop_at_first: bool = False):
+    """
+    Classify every 10 ms frame of a chunk with a WebRTC VAD model.
+
+    Frames are zero-copy slices of a memoryview over the chunk's bytes.
+
+    Args:
+        vad_model: A `webrtcvad.Vad` instance.
+        chunk (VADChunk): The 16 kHz chunk.
+        stop_at_first (bool): Stop at the first speech frame; the frames
+            after it are left out.
+
+    Returns:
+        list of bool: Speech decision per frame.
+    """
+    data = memoryview(chunk.bytes)
+    is_speech = vad_model.is_speech
+    end = chunk.num_frames * WEBRTC_FRAME_BYTES
+    if not stop_at_first:
+        return [is_speech(data[start:start + WEBRTC_FRAME_BYTES], VAD_SAMPLE_RATE)
+                for start in range(0, end, WEBRTC_FRAME_BYTES)]
+    decisions = []
+    for start in range(0, end, WEBRTC_FRAME_BYTES):
+        speech = is_speech(data[start:start + WEBRTC_FRAME_BYTES], VAD_SAMPLE_RATE)
+        decisions.append(speech)
+        if speech:
+            break
+    return decisions
@@ -0,0 +1,114 @@
+# Offline speech segmentation of complete recordings at silence boundaries
+from collections import namedtuple
+import numpy as np
+from vad_ingest import VADChunk, webrtc_frame_decisions, VAD_SAMPLE_RATE, WEBRTC_FRAME_LENGTH
+
+INIT_SEGMENT_SENSITIVITY = 3
+INIT_SEGMENT_MIN_SILENCE = 0.5
+INIT_SEGMENT_MIN_SPEECH = 0.25
+INIT_SEGMENT_PADDING = 0.2
+INIT_SEGMENT_MAX_SECONDS = 30.0
+DECISION_BLOCK_SECONDS = 10
+
+# Speech region of a 16 kHz recording, in samples
+Segment = namedtuple("Segment", ["start", "end"])
+
+
+def speech_frames(pcm, sensitivity: int = INIT_SEGMENT_SENSITIVITY):
+    """
+    WebRTC speech decision for every 10 ms frame of a 16 kHz int16 recording.
+
+    The recording is classified block by block, so arbitrarily long (or
+    memory-mapped) input never gets converted to bytes in one piece.
+    """
+    import webrtcvad
+
+    vad_model = webrtcvad.Vad(sensitivity)
+    block = DECISION_BLOCK_SECONDS * VAD_SAMPLE_RATE
+    decisions = [
+        np.array(webrtc_frame_decisions(vad_model, VADChunk(seq, np.ascontiguousarray(pcm[start:start + block]))),
+                 dtype=bool)
+        for seq, start in enumerate(range(0, len(pcm), block))
+    ]
+    return np.concatenate(decisions) if decisions else np.zeros(0, dtype=bool)
+
+
+def _runs(mask):
+    """(start, end) frame index pairs of the True runs of a boolean array."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _split_long(start, end, speech, max_frames):
+    """
+    Split a region longer than `max_frames` at the longest pause within the
+    second half of each window, or at the window end if there is none.
+    """
+    pieces = []
+    while end - start > max_frames:
+        window_start = start + max_frames // 2
+        window_end = start + max_frames
+        pauses = _runs(~speech[window_start:window_end])
+        if pauses:
+            pause_start, pause_end = max(pauses, key=lambda run: run[1] - run[0])
+            cut = window_start + (pause_start + pause_end) // 2
+        else:
+            cut = window_end
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def segment_speech(pcm, sensitivity: int = INIT_SEGMENT_SENSITIVITY,
+                   min_silence: float = INIT_SEGMENT_MIN_SILENCE,
+                   min_speech: float = INIT_SEGMENT_MIN_SPEECH,
+                   padding: float = INIT_SEGMENT_PADDING,
+                   max_seconds: float = INIT_SEGMENT_MAX_SECONDS):
+    """
+    Cut a recording into speech segments at silence boundaries.
+
+    Pauses shorter than `min_silence` stay inside a segment and speech
+    shorter than `min_speech` is dropped. Every segment is widened by
+    `padding` on both sides, without reaching into its neighbours, and
+    segments longer than `max_seconds` are split at their longest pause,
+    so each one fits a single Whisper window.
+
+    Args:
+        pcm (np.ndarray): 16 kHz mono int16 samples.
+        sensitivity (int): WebRTC VAD aggressiveness, 0 (least) to 3.
+        min_silence (float): Shortest pause in seconds that separates
+            segments.
+        min_speech (float): Shortest speech in seconds that is kept.
+        padding (float): Seconds of context kept around speech.
+        max_seconds (float): Longest segment in seconds.
+
+    Returns:
+        list of Segment: Sorted, non-overlapping sample ranges.
+    """
+    frames_per_second = VAD_SAMPLE_RATE // WEBRTC_FRAME_LENGTH
+    speech = speech_frames(pcm, sensitivity)
+
+    regions = []
+    for start, end in _runs(speech):
+        if regions and start - regions[-1][1] < min_silence * frames_per_second:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    regions = [(start, end) for start, end in regions
+               if end - start >= min_speech * frames_per_second]
+
+    max_frames = max(int(max_seconds * frames_per_second), 2)
+    pad = int(padding * frames_per_second)
+    total_frames = len(speech)
+    segments = []
+    for index, (start, end) in enumerate(regions):
+        # Padding never crosses the middle of the pause to a neighbour
+        low = (regions[index - 1][1] + start) // 2 if index else 0
+        high = (end + regions[index + 1][0]) // 2 if index + 1 < len(regions) else total_frames
+        start, end = max(start - pad, low), min(end + pad, high)
+        for piece_start, piece_end in _split_long(start, end, speech, max_frames):
+            segments.append(Segment(int(piece_start) * WEBRTC_FRAME_LENGTH,
+                                    min(int(piece_end) * WEBRTC_FRAME_LENGTH, len(pcm))))
+    return segments
@@ -0,0 +1,151 @@
+# Long-lived worker thread running voice activity inference
+from collections import namedtuple
+import threading
+import logging
+import queue
+import time
+
+logger = logging.getLogger("realtimestt")
+
+INIT_VAD_QUEUE_SIZE = 16
+
+VADResult = namedtuple("VADResult", ["seq", "probability", "latency"])
+
+
+class VADWorker:
+    """
+    Runs VAD model inference on a single persistent thread.
+
+    Chunks are submitted through a bounded queue together with their
+    sequence number. Whenever the worker wakes up it takes every pending
+    chunk and hands them to `infer_batch` in one call, then publishes one
+    result per chunk through `on_result` in sequence order.
+
+    When the queue is full the oldest pending chunk is dropped, so a slow
+    model never blocks the recording loop.
+
+    Args:
+        infer_batch (callable): Receives a list of chunks and returns a list
+            of speech probabilities of the same length.
+        on_result (callable): Called with a VADResult for each chunk.
+        max_pending (int): Capacity of the input queue.
+        name (str): Name of the worker thread.
+        on_start (callable, optional): Called on the worker thread before
+            the first chunk, e.g. to pin it to cores.
+    """
+    def __init__(self, infer_batch, on_result, max_pending: int = INIT_VAD_QUEUE_SIZE,
+                 name: str = "VADWorker", on_start=None):
+        self.infer_batch = infer_batch
+        self.on_result = on_result
+        self.on_start = on_start
+        self.model_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._reset_counters()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _reset_counters(self):
+        self.submitted = 0
+        self.dropped = 0
+        self.batches = 0
+        self.inferences = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = 0.0
+        self.max_batch_size = 0
+
+    @property
+    def busy(self):
+        return not self._queue.empty()
+
+    def submit(self, seq: int, chunk):
+        """Queue a chunk for inference without blocking the caller."""
+        item = (seq, chunk)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                break
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    with self._stats_lock:
+                        self.dropped += 1
+                except queue.Empty:
+                    pass
+        with self._stats_lock:
+            self.submitted += 1
+
+    def infer_now(self, chunk):
+        """Run inference on one chunk in the calling thread."""
+        start = time.perf_counter()
+        with self.model_lock:
+            probability = self.infer_batch([chunk])[0]
+        self._record_latency(time.perf_counter() - start, 1)
+        return probability
+
+    def _record_latency(self, elapsed, batch_size):
+        per_inference = elapsed / batch_size
+        with self._stats_lock:
+            self.batches += 1
+            self.inferences += batch_size
+            self.total_latency += elapsed
+            self.last_latency = per_inference
+            self.max_latency = max(self.max_latency, per_inference)
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+
+    def _run(self):
+        if self.on_start is not None:
+            self.on_start()
+        while not self._stop_event.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            # Coalesce everything that piled up while the last batch ran
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            seqs = [seq for seq, _ in batch]
+            chunks = [chunk for _, chunk in batch]
+            try:
+                start = time.perf_counter()
+                with self.model_lock:
+                    probabilities = self.infer_batch(chunks)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                logger.error(f"Error in VAD worker inference: {e}", exc_info=True)
+                continue
+
+            self._record_latency(elapsed, len(batch))
+            latency = elapsed / len(batch)
+            for seq, probability in zip(seqs, probabilities):
+                try:
+                    self.on_result(VADResult(seq, probability, latency))
+                except Exception as e:
+                    logger.error(f"Error publishing VAD result: {e}", exc_info=True)
+
+    def stats(self):
+        with self._stats_lock:
+            mean_latency = self.total_latency / self.inferences if self.inferences else 0.0
+            return {
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "pending": self._queue.qsize(),
+                "batches": self.batches,
+                "inferences": self.inferences,
+                "max_batch_size": self.max_batch_size,
+                "mean_latency": mean_latency,
+                "max_latency": self.max_latency,
+                "last_latency": self.last_latency,
+            }
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.warning("VAD worker thread did not exit within timeout")
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
@@ -12,6 +12,7 @@ import json
 import time
 
 from browser_client.pipeline import generate_code_from_raw_text
+from browser_client.speech_ingest import SpeechSessionManager
 
 app = FastAPI()
 
@@ -44,6 +45,21 @@ def api_generate(req: GenerateRequest):
     }
 
 
+# ==== SPEECH INGEST ====
+
+speech_sessions = SpeechSessionManager()
+
+
+@app.websocket("/ws/speech")
+async def ws_speech(websocket: WebSocket):
+    await speech_sessions.handle(websocket)
+
+
+@app.get("/api/speech/sessions")
+def api_speech_sessions():
+    return speech_sessions.stats()
+
+
 # ==== RUNNER CONSTANTS ====
 
 RUNNER_CONFIG = {
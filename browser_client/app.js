@@ -113,6 +113,102 @@ async function runGeneratedCode() {
     }
 }
 
+// ==== SPEECH INPUT ====
+// Streams 16-bit PCM from the microphone to /ws/speech and shows realtime
+// partials after the typed text until the final transcription arrives.
+
+// Render quanta are only 128 samples; the worklet collects about 30 ms
+// per message so the server handles a few dozen messages a second, not
+// several hundred.
+const PCM_MESSAGE_SECONDS = 0.03;
+
+const PCM_WORKLET = `
+class PcmForwarder extends AudioWorkletProcessor {
+    constructor() {
+        super();
+        this.pcm = new Int16Array(Math.round(sampleRate * ${PCM_MESSAGE_SECONDS}));
+        this.filled = 0;
+    }
+
+    process(inputs) {
+        const input = inputs[0][0];
+        if (input) {
+            for (let i = 0; i < input.length; i++) {
+                this.pcm[this.filled++] = Math.max(-32768, Math.min(32767, input[i] * 32768));
+                if (this.filled === this.pcm.length) {
+                    this.port.postMessage(this.pcm.buffer, [this.pcm.buffer]);
+                    this.pcm = new Int16Array(this.pcm.length);
+                    this.filled = 0;
+                }
+            }
+        }
+        return true;
+    }
+}
+registerProcessor("pcm-forwarder", PcmForwarder);
+`;
+
+let speech = null;
+
+async function startSpeech(descriptionInput, onStopped) {
+    const stream = await navigator.mediaDevices.getUserMedia({ audio: { channelCount: 1 } });
+    const context = new AudioContext();
+    const moduleUrl = URL.createObjectURL(new Blob([PCM_WORKLET], { type: "application/javascript" }));
+    await context.audioWorklet.addModule(moduleUrl);
+    const source = context.createMediaStreamSource(stream);
+    const forwarder = new AudioWorkletNode(context, "pcm-forwarder");
+    source.connect(forwarder);
+
+    const protocol = location.protocol === "https:" ? "wss:" : "ws:";
+    const socket = new WebSocket(`${protocol}//${location.host}/ws/speech`);
+    socket.binaryType = "arraybuffer";
+    const committed = descriptionInput.value;
+    let finals = "";
+
+    const show = (partial) => {
+        descriptionInput.value = [committed, finals, partial].filter(Boolean).join(" ");
+        autoResize(descriptionInput);
+    };
+
+    socket.onopen = () => {
+        socket.send(JSON.stringify({ type: "config", format: "pcm16", sample_rate: context.sampleRate }));
+    };
+    socket.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (event.type === "ready") {
+            forwarder.port.onmessage = (e) => {
+                if (socket.readyState === WebSocket.OPEN) socket.send(e.data);
+            };
+        } else if (event.type === "realtime") {
+            show(event.text);
+        } else if (event.type === "final") {
+            finals = [finals, event.text].filter(Boolean).join(" ");
+            show("");
+        } else if (event.type === "error") {
+            console.error("Speech error:", event.message);
+        }
+    };
+    socket.onclose = () => {
+        stopSpeech();
+        show("");
+        onStopped();
+    };
+
+    speech = { stream, context, socket };
+}
+
+function stopSpeech() {
+    if (!speech) return;
+    const { stream, context, socket } = speech;
+    speech = null;
+    stream.getTracks().forEach((track) => track.stop());
+    context.close();
+    if (socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({ type: "stop" }));
+        socket.close();
+    }
+}
+
 function init() {
     const micBtn = document.getElementById('mic-btn');
     const descriptionInput = document.getElementById('description-input');
@@ -123,19 +219,18 @@ function init() {
     }
 
     if (micBtn) {
-        micBtn.addEventListener('click', () => {
-            console.log('Mic button clicked. Voice connection logic is deferred.');
-
+        micBtn.addEventListener('click', async () => {
             micBtn.classList.toggle('listening');
 
             if (micBtn.classList.contains('listening')) {
-                setTimeout(() => {
-                    descriptionInput.value += " [Listening...]";
-                    autoResize(descriptionInput);
-                }, 500);
+                try {
+                    await startSpeech(descriptionInput, () => micBtn.classList.remove('listening'));
+                } catch (err) {
+                    console.error('Could not start speech input:', err);
+                    micBtn.classList.remove('listening');
+                }
             } else {
-                descriptionInput.value = descriptionInput.value.replace(" [Listening...]", "");
-                autoResize(descriptionInput);
+                stopSpeech();
             }
         });
     }
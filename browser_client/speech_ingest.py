@@ -0,0 +1,366 @@
+"""
+Browser speech ingest: one AudioToTextRecorder per WebSocket connection.
+
+Protocol of /ws/speech:
+
+  client -> server
+    text   {"type": "config", "format": "pcm16" | "opus", "sample_rate": 48000}
+           optional, before the first audio frame (default: pcm16 at 16 kHz)
+    binary pcm16: little-endian mono int16 samples
+           opus:  one raw Opus packet per message (e.g. from WebCodecs)
+    text   {"type": "stop"}
+
+  server -> client
+    {"type": "ready"}
+    {"type": "realtime" | "stabilized" | "final", "text": ..., "timestamp": ...}
+    {"type": "stats", "audio_seconds": ..., "cpu_seconds": ..., "cpu_load": ...}
+           cpu_seconds is an estimate, see CpuMeter; CPU that cannot be
+           tied to one connection is reported by /api/speech/sessions
+    {"type": "error", "message": ...}
+
+Recorders run with use_microphone=False and are fed through feed_audio().
+Set SPEECH_TRANSCRIPTION_SERVER to the address of a running
+audio_processor/transcription_server.py so that all connections share one
+model instead of loading one per connection.
+"""
+import threading
+import asyncio
+import logging
+import json
+import time
+import sys
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AUDIO_PROCESSOR_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "audio_processor")
+
+MAX_SPEECH_SESSIONS = int(os.environ.get("SPEECH_MAX_SESSIONS", "4"))
+TRANSCRIPTION_SERVER = os.environ.get("SPEECH_TRANSCRIPTION_SERVER") or None
+STATS_INTERVAL = 2.0
+OPUS_SAMPLE_RATE = 16000
+OPUS_MAX_FRAME_SAMPLES = 1920  # 120 ms at 16 kHz, the longest Opus frame
+
+# WebSocket close code for "try again later"
+CLOSE_TRY_AGAIN_LATER = 1013
+
+RECORDER_CONFIG = {
+    "model": "tiny",
+    "device": "cpu",
+    "use_microphone": False,
+    "spinner": False,
+    "no_log_file": True,
+    "enable_realtime_transcription": True,
+    "realtime_model_type": "tiny",
+    "post_speech_silence_duration": 0.75,
+    "min_length_of_recording": 0.25,
+    "silero_sensitivity": 0.6,
+    "webrtc_sensitivity": 0,
+}
+
+
+PROC_TASKS = "/proc/self/task"
+HAVE_PROC_TASKS = os.path.isdir(PROC_TASKS)
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if HAVE_PROC_TASKS else 100
+
+
+def _process_threads():
+    """
+    Ids of the threads of this process: OS thread ids from /proc, which
+    include native threads such as the CTranslate2 and torch pools, or the
+    idents of the Python threads where /proc is not available.
+    """
+    if HAVE_PROC_TASKS:
+        return {int(tid) for tid in os.listdir(PROC_TASKS)}
+    return {thread.ident for thread in threading.enumerate()}
+
+
+def _thread_cpu_time(thread_id):
+    """CPU seconds used by a thread from _process_threads(), None if unknown."""
+    if HAVE_PROC_TASKS:
+        try:
+            with open(f"{PROC_TASKS}/{thread_id}/stat", "rb") as stat:
+                # Fields after the command name, which may contain spaces;
+                # utime and stime are fields 14 and 15
+                fields = stat.read().rsplit(b")", 1)[1].split()
+        except OSError:
+            # The thread has exited
+            return None
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+    except (AttributeError, OSError):
+        # Not available on this platform, or the thread has exited
+        return None
+
+
+def _threads_cpu_time(thread_ids, last_seen):
+    """Sum of the threads' CPU time; exited threads keep their last value."""
+    for thread_id in thread_ids:
+        cpu = _thread_cpu_time(thread_id)
+        if cpu is not None:
+            last_seen[thread_id] = cpu
+    return sum(last_seen.values())
+
+
+class CpuMeter:
+    """
+    Estimated CPU time of one connection: the threads attributed to it plus
+    the time spent decoding and feeding audio on the event loop.
+
+    Threads are attributed by OS thread id, so the native decoder threads
+    of CTranslate2 and torch count as well as Python threads. A connection
+    owns the threads that appeared while its recorder was created (creation
+    is serialized), and threads that appear later while it is the only
+    connection. Threads started later while several connections are open,
+    and pools shared by all recorders such as torch's intra-op threads
+    created by an earlier connection, cannot be attributed; they are counted
+    by SpeechSessionManager as unattributed. A thread another connection
+    starts during a creation is still attributed to the new connection.
+    """
+    def __init__(self):
+        self.thread_ids = set()
+        self._last_thread_cpu = {}
+        self.ingest_seconds = 0.0
+
+    def attribute_threads(self, thread_ids):
+        self.thread_ids.update(thread_ids)
+
+    def thread_seconds(self):
+        return _threads_cpu_time(self.thread_ids, self._last_thread_cpu)
+
+    @property
+    def total_seconds(self):
+        return self.thread_seconds() + self.ingest_seconds
+
+
+class _OpusDecoder:
+    """Decodes raw Opus packets straight to 16 kHz mono int16."""
+    def __init__(self):
+        try:
+            import opuslib
+        except ImportError as e:
+            raise RuntimeError("Opus input needs the 'opuslib' package; send pcm16 instead") from e
+        self._decoder = opuslib.Decoder(OPUS_SAMPLE_RATE, 1)
+
+    def decode(self, packet):
+        pcm = self._decoder.decode(packet, OPUS_MAX_FRAME_SAMPLES)
+        return np.frombuffer(pcm, dtype=np.int16)
+
+
+class SpeechSession:
+    """State of one WebSocket connection."""
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.recorder = None
+        self.cpu = CpuMeter()
+        self.started = time.time()
+        self.format = "pcm16"
+        self.sample_rate = 16000
+        self.decoder = None
+        self.audio_samples = 0
+        self.partials_sent = 0
+        self.finals_sent = 0
+
+    def configure(self, message):
+        self.format = message.get("format", "pcm16")
+        self.sample_rate = int(message.get("sample_rate", 16000))
+        if self.format == "opus":
+            self.decoder = _OpusDecoder()
+            self.sample_rate = OPUS_SAMPLE_RATE
+        elif self.format != "pcm16":
+            raise ValueError(f"Unsupported audio format {self.format!r}")
+
+    def feed(self, frame):
+        start = time.thread_time()
+        if self.decoder is not None:
+            samples = self.decoder.decode(frame)
+        else:
+            samples = np.frombuffer(frame, dtype="<i2")
+        self.audio_samples += len(samples)
+        self.recorder.feed_audio(samples, original_sample_rate=self.sample_rate)
+        self.cpu.ingest_seconds += time.thread_time() - start
+
+    def stats(self):
+        audio_seconds = self.audio_samples / self.sample_rate
+        cpu_seconds = self.cpu.total_seconds
+        return {
+            "session": self.session_id,
+            "format": self.format,
+            "connected_seconds": round(time.time() - self.started, 1),
+            "audio_seconds": round(audio_seconds, 2),
+            "cpu_seconds": round(cpu_seconds, 3),
+            # CPU seconds per second of audio; above 1 the speaker costs
+            # more than a core
+            "cpu_load": round(cpu_seconds / audio_seconds, 3) if audio_seconds else 0.0,
+            "partials_sent": self.partials_sent,
+            "finals_sent": self.finals_sent,
+        }
+
+
+class SpeechSessionManager:
+    """Caps concurrent speech sessions and keeps their accounting."""
+    def __init__(self, max_sessions=MAX_SPEECH_SESSIONS, recorder_config=None,
+                 transcription_server=TRANSCRIPTION_SERVER):
+        self.max_sessions = max_sessions
+        self.recorder_config = dict(recorder_config or RECORDER_CONFIG)
+        if transcription_server:
+            self.recorder_config["transcription_server"] = transcription_server
+        self.sessions = {}
+        self.rejected = 0
+        self._next_id = 1
+        self._create_lock = asyncio.Lock()
+        self._known_threads = _process_threads()
+        self._creating = False
+        self._unattributed_threads = set()
+        self._unattributed_cpu = {}
+
+    def _scan_threads(self):
+        """
+        Attribute threads started since the last scan: to the only open
+        connection, or to nobody while several are open. Skipped while a
+        recorder is being created, its threads go to its own connection.
+        """
+        if self._creating:
+            return
+        current = _process_threads()
+        new = current - self._known_threads
+        self._known_threads = current
+        if not new:
+            return
+        owners = [session for session in self.sessions.values() if session.recorder is not None]
+        if len(owners) == 1:
+            owners[0].cpu.attribute_threads(new)
+        else:
+            self._unattributed_threads.update(new)
+
+    def stats(self):
+        self._scan_threads()
+        return {
+            "max_sessions": self.max_sessions,
+            "active": len(self.sessions),
+            "rejected": self.rejected,
+            "sessions": [session.stats() for session in self.sessions.values()],
+            # The whole process, and threads no connection could be charged with
+            "process_cpu_seconds": round(time.process_time(), 3),
+            "unattributed_cpu_seconds": round(
+                _threads_cpu_time(self._unattributed_threads, self._unattributed_cpu), 3),
+        }
+
+    def _create_recorder(self):
+        if AUDIO_PROCESSOR_DIR not in sys.path:
+            # audio_processor modules import each other by bare module name
+            sys.path.insert(0, AUDIO_PROCESSOR_DIR)
+        from audio_recorder import AudioToTextRecorder
+
+        return AudioToTextRecorder(**self.recorder_config)
+
+    async def _open(self, session):
+        loop = asyncio.get_running_loop()
+        async with self._create_lock:
+            # Threads started before this recorder belong to someone else
+            self._scan_threads()
+            self._creating = True
+            try:
+                recorder = await loop.run_in_executor(None, self._create_recorder)
+                session.recorder = recorder
+                events = recorder.stream()
+                first_event = asyncio.ensure_future(events.__anext__())
+                # Let the stream subscribe so its driver thread exists before
+                # the recorder's threads are collected
+                await asyncio.sleep(0)
+                current = _process_threads()
+                session.cpu.attribute_threads(current - self._known_threads)
+                self._known_threads = current
+            finally:
+                self._creating = False
+        return events, first_event
+
+    async def handle(self, websocket):
+        """Serve one /ws/speech connection until either side closes it."""
+        await websocket.accept()
+        if len(self.sessions) >= self.max_sessions:
+            self.rejected += 1
+            await websocket.send_text(json.dumps(
+                {"type": "error", "message": "Too many speakers, try again later"}))
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+            return
+
+        session = SpeechSession(self._next_id)
+        self._next_id += 1
+        self.sessions[session.session_id] = session
+        events = first_event = None
+        tasks = []
+        try:
+            events, first_event = await self._open(session)
+            await websocket.send_text(json.dumps({"type": "ready"}))
+            tasks = [
+                asyncio.ensure_future(self._receive_audio(websocket, session)),
+                asyncio.ensure_future(self._send_transcripts(websocket, session, events, first_event)),
+                asyncio.ensure_future(self._send_stats(websocket, session)),
+            ]
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        except Exception as e:
+            logger.info(f"Speech session {session.session_id} ended: {e}")
+            try:
+                await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+            except Exception:
+                pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            if first_event is not None:
+                first_event.cancel()
+            self.sessions.pop(session.session_id, None)
+            logger.info(f"Speech session closed: {session.stats()}")
+            if session.recorder is not None:
+                await asyncio.get_running_loop().run_in_executor(None, session.recorder.shutdown)
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+
+    async def _receive_audio(self, websocket, session):
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                session.feed(message["bytes"])
+            elif message.get("text") is not None:
+                control = json.loads(message["text"])
+                if control.get("type") == "config":
+                    session.configure(control)
+                elif control.get("type") == "stop":
+                    return
+
+    async def _send_transcripts(self, websocket, session, events, first_event):
+        try:
+            event = await first_event
+            while True:
+                if event.kind == "final":
+                    session.finals_sent += 1
+                else:
+                    session.partials_sent += 1
+                await websocket.send_text(json.dumps(
+                    {"type": event.kind, "text": event.text, "timestamp": event.timestamp}))
+                event = await events.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            try:
+                await events.aclose()
+            except RuntimeError:
+                # Still running on a cancelled __anext__, which closes it
+                pass
+
+    async def _send_stats(self, websocket, session):
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            self._scan_threads()
+            await websocket.send_text(json.dumps({"type": "stats", **session.stats()}))